@@ -0,0 +1,284 @@
+import struct
+
+# Synthetic ELF files for the benchmarks. The files are structurally valid
+# (headers, string tables, symbol tables, segments covering the sections)
+# but contain no real code.
+
+SHT_PROGBITS = 1
+SHT_SYMTAB = 2
+SHT_STRTAB = 3
+SHT_RELA = 4
+SHT_HASH = 5
+SHT_DYNAMIC = 6
+SHT_NOTE = 7
+SHT_DYNSYM = 11
+SHT_RELR = 0x13
+SHT_GNU_HASH = 0x6ffffff6
+PT_LOAD = 1
+PT_DYNAMIC = 2
+PT_NOTE = 4
+NT_GNU_BUILD_ID = 3
+SHN_LORESERVE = 0xff00
+DT_STRTAB = 5
+DT_STRSZ = 10
+
+def _layouts(elf_class, byteorder):
+    if elf_class == 1:
+        return {
+            "ehdr": struct.Struct(byteorder + "16sHHIIIIIHHHHHH"),
+            "phdr": struct.Struct(byteorder + "IIIIIIII"),
+            "shdr": struct.Struct(byteorder + "IIIIIIIIII"),
+            "sym": struct.Struct(byteorder + "IIIBBH"),
+            "rela": struct.Struct(byteorder + "IIi"),
+            "dyn": struct.Struct(byteorder + "iI"),
+        }
+    return {
+        "ehdr": struct.Struct(byteorder + "16sHHIQQQIHHHHHH"),
+        "phdr": struct.Struct(byteorder + "IIQQQQQQ"),
+        "shdr": struct.Struct(byteorder + "IIQQQQIIQQ"),
+        "sym": struct.Struct(byteorder + "IBBHQQ"),
+        "rela": struct.Struct(byteorder + "QQq"),
+        "dyn": struct.Struct(byteorder + "qQ"),
+    }
+
+class _StrTab:
+    def __init__(self) -> None:
+        self.data = bytearray(b"\0")
+
+    def add(self, name) -> int:
+        offset = len(self.data)
+        self.data += name.encode() + b"\0"
+        return offset
+
+def gnu_hash(name) -> int:
+    h = 5381
+    for c in name.encode():
+        h = (h * 33 + c) & 0xffffffff
+    return h
+
+def sysv_hash(name) -> int:
+    h = 0
+    for c in name.encode():
+        h = (h << 4) + c
+        h ^= (h & 0xf0000000) >> 24
+        h &= 0x0fffffff
+    return h
+
+def encode_relr(offsets, wordsize) -> list:
+    # The SHT_RELR encoding of a set of word-aligned offsets: an address
+    # entry, then bitmaps whose bit n + 1 relocates the nth word after it.
+    offsets = sorted(offsets)
+    bits = wordsize * 8 - 1
+    entries = []
+    i = 0
+    while i < len(offsets):
+        entries.append(offsets[i])
+        base = offsets[i] + wordsize
+        i += 1
+        while True:
+            bitmap = 0
+            while i < len(offsets) and offsets[i] - base < bits * wordsize:
+                bitmap |= 1 << ((offsets[i] - base) // wordsize)
+                i += 1
+            if not bitmap:
+                break
+            entries.append(bitmap << 1 | 1)
+            base += bits * wordsize
+    return entries
+
+def generate_elf(elf_class=2, sections=16, segments=4, symbols=1000, byteorder="<", base=0x400000,
+                 imports=(), hash_style=None, relocations=(), relr=(), build_id=None, extra=(), dynamic=()) -> bytes:
+    # sections counts the PROGBITS sections; .symtab, .strtab, .dynsym,
+    # .dynstr and .shstrtab are added on top. Extended section numbering
+    # is not generated, so the total must stay below SHN_LORESERVE.
+    #
+    # The rest adds what the tests need: imports names undefined .dynsym
+    # entries (indices 1..len(imports)); hash_style "gnu", "sysv" or
+    # "both" adds .gnu.hash and/or .hash over .dynsym (sorting the
+    # defined entries by GNU hash bucket); relocations adds .rela.dyn
+    # from (offset, type, .dynsym index, addend) tuples; relr adds
+    # .relr.dyn relocating the given offsets; build_id (bytes) adds a
+    # .note.gnu.build-id section and a PT_NOTE segment after the PT_LOADs;
+    # extra adds (name, sh_type, sh_flags, data) sections as given;
+    # dynamic adds .dynamic from (tag, value) pairs, string values going
+    # to .dynstr, with DT_STRTAB, DT_STRSZ and DT_NULL appended, and a
+    # PT_LOAD covering .dynstr and .dynamic followed by PT_DYNAMIC.
+    if sections + 6 >= SHN_LORESERVE:
+        raise ValueError("at most %d sections are supported" % (SHN_LORESERVE - 7))
+    L = _layouts(elf_class, byteorder)
+    word = "I" if elf_class == 1 else "Q"
+    ehsize = L["ehdr"].size
+    segments = max(segments, 1)
+    phnum = segments + (build_id is not None) + 2 * bool(dynamic)
+    phoff = ehsize
+    out = bytearray(ehsize + phnum * L["phdr"].size)
+
+    shstrtab = _StrTab()
+    shdrs = [(0, 0, 0, 0, 0, 0, 0, 0, 0, 0)]
+
+    # PROGBITS sections of 64 bytes each, laid out at increasing addresses.
+    text_start = len(out)
+    for i in range(sections):
+        offset = len(out)
+        out += bytes(range(64))
+        shdrs.append((shstrtab.add(".sec%d" % i), SHT_PROGBITS, 0x6, base + offset, offset, 64, 0, 0, 16, 0))
+    text_end = len(out)
+
+    # Symbols are FUNC/OBJECT globals spread over the PROGBITS sections.
+    strtab = _StrTab()
+    sym = L["sym"]
+    span = max(text_end - text_start, 1)
+    syms = [sym.pack(*((0,) * 6))]
+    for i in range(1, symbols):
+        name = strtab.add("sym_%d" % i)
+        value = base + text_start + (i * 16) % span
+        info = (1 << 4) | (2 if i & 1 else 1)
+        shndx = 1 + ((i * 16) % span) // 64 if sections else 0xfff1
+        if elf_class == 1:
+            syms.append(sym.pack(name, value, 16, info, 0, shndx))
+        else:
+            syms.append(sym.pack(name, info, 0, shndx, value, 16))
+    symdata = b"".join(syms)
+
+    def add_section(name, sh_type, data, link=0, info=0, entsize=0, align=1, flags=0) -> int:
+        offset = len(out)
+        out.extend(data)
+        shdrs.append((shstrtab.add(name), sh_type, flags, 0, offset, len(data), link, info, align, entsize))
+        return len(shdrs) - 1
+
+    # Every tenth symbol is also exported through .dynsym/.dynstr, after
+    # the imports.
+    dynstr = _StrTab()
+    dynsyms = [sym.pack(*((0,) * 6))]
+    names = list(imports)
+    for name in imports:
+        if elf_class == 1:
+            dynsyms.append(sym.pack(dynstr.add(name), 0, 0, (1 << 4) | 2, 0, 0))
+        else:
+            dynsyms.append(sym.pack(dynstr.add(name), (1 << 4) | 2, 0, 0, 0, 0))
+    exported = [(("sym_%d" % i), list(sym.unpack_from(symdata, i * sym.size))) for i in range(1, symbols, 10)]
+    nbuckets = max(len(exported) // 2, 1)
+    if hash_style in ("gnu", "both"):
+        exported.sort(key=lambda e: gnu_hash(e[0]) % nbuckets)
+    for name, fields in exported:
+        fields[0] = dynstr.add(name)
+        dynsyms.append(sym.pack(*fields))
+        names.append(name)
+    dynamic = [(tag, dynstr.add(value) if isinstance(value, str) else value) for tag, value in dynamic]
+    dynsym_index = len(shdrs)
+    dynstr_index = len(shdrs) + 1
+    add_section(".dynsym", SHT_DYNSYM, b"".join(dynsyms), link=dynstr_index, info=1, entsize=sym.size, align=8)
+    add_section(".dynstr", SHT_STRTAB, dynstr.data)
+    addr = struct.Struct(byteorder + word)
+    if dynamic:
+        dynstr_offset = shdrs[dynstr_index][4]
+        dynamic += [(DT_STRTAB, base + dynstr_offset), (DT_STRSZ, len(dynstr.data)), (0, 0)]
+        while len(out) % addr.size:
+            out.append(0)
+        dynamic_index = add_section(".dynamic", SHT_DYNAMIC, b"".join(L["dyn"].pack(*e) for e in dynamic),
+                                    link=dynstr_index, entsize=L["dyn"].size, align=8)
+    u32 = byteorder + "%dI"
+    if hash_style in ("gnu", "both"):
+        symoffset = 1 + len(imports)
+        bloom_shift = 6
+        bloom_bits = addr.size * 8
+        bloom = [0]
+        buckets = [0] * nbuckets
+        chain = []
+        for i, name in enumerate(names[len(imports):], symoffset):
+            h = gnu_hash(name)
+            bloom[0] |= 1 << (h % bloom_bits) | 1 << ((h >> bloom_shift) % bloom_bits)
+            if not buckets[h % nbuckets]:
+                buckets[h % nbuckets] = i
+            if chain and gnu_hash(names[i - 2]) % nbuckets != h % nbuckets:
+                chain[-1] |= 1
+            chain.append(h & ~1)
+        if chain:
+            chain[-1] |= 1
+        data = struct.pack(byteorder + "4I", nbuckets, symoffset, len(bloom), bloom_shift)
+        data += b"".join(addr.pack(w) for w in bloom)
+        data += struct.pack(u32 % nbuckets, *buckets) + struct.pack(u32 % len(chain), *chain)
+        add_section(".gnu.hash", SHT_GNU_HASH, data, link=dynsym_index, align=8)
+    if hash_style in ("sysv", "both"):
+        # Chains run in ascending index order, so an import shadows a
+        # definition of the same name until the lookup skips it.
+        nchain = len(names) + 1
+        buckets = [0] * nbuckets
+        chain = [0] * nchain
+        for i in range(nchain - 1, 0, -1):
+            b = sysv_hash(names[i - 1]) % nbuckets
+            chain[i] = buckets[b]
+            buckets[b] = i
+        data = struct.pack(byteorder + "2I", nbuckets, nchain) + struct.pack(u32 % nbuckets, *buckets) + struct.pack(u32 % nchain, *chain)
+        add_section(".hash", SHT_HASH, data, link=dynsym_index, align=4)
+    if relocations:
+        rela = L["rela"]
+        shift = 8 if elf_class == 1 else 32
+        data = b"".join(rela.pack(offset, r_sym << shift | r_type, addend) for offset, r_type, r_sym, addend in relocations)
+        add_section(".rela.dyn", SHT_RELA, data, link=dynsym_index, entsize=rela.size, align=8)
+    if relr:
+        data = b"".join(addr.pack(e) for e in encode_relr(relr, addr.size))
+        add_section(".relr.dyn", SHT_RELR, data, entsize=addr.size, align=8)
+    if build_id is not None:
+        while len(out) % 4:
+            out.append(0)
+        desc = bytes(build_id) + bytes(-len(build_id) % 4)
+        data = struct.pack(byteorder + "3I", 4, len(build_id), NT_GNU_BUILD_ID) + b"GNU\0" + desc
+        note_index = add_section(".note.gnu.build-id", SHT_NOTE, data, align=4)
+    for name, sh_type, flags, data in extra:
+        add_section(name, sh_type, data, flags=flags)
+    strtab_index = len(shdrs) + 1
+    add_section(".symtab", SHT_SYMTAB, symdata, link=strtab_index, info=1, entsize=sym.size, align=8)
+    add_section(".strtab", SHT_STRTAB, strtab.data)
+    shstrndx = len(shdrs)
+    name = shstrtab.add(".shstrtab")
+    offset = len(out)
+    out += shstrtab.data
+    shdrs.append((name, SHT_STRTAB, 0, 0, offset, len(shstrtab.data), 0, 0, 1, 0))
+
+    # Section headers at the end, as linkers place them.
+    while len(out) % 8:
+        out.append(0)
+    shoff = len(out)
+    shdr = L["shdr"]
+    out += b"".join(shdr.pack(*h) for h in shdrs)
+
+    # One PT_LOAD covering the PROGBITS sections, split into equal parts.
+    phdr = L["phdr"]
+    chunk = max(span // segments, 1)
+    for i in range(segments):
+        start = text_start + i * chunk
+        size = chunk if i < segments - 1 else max(text_end - start, 0)
+        if elf_class == 1:
+            fields = (PT_LOAD, start, base + start, base + start, size, size, 0x5, 0x1000)
+        else:
+            fields = (PT_LOAD, 0x5, start, base + start, base + start, size, size, 0x1000)
+        phdr.pack_into(out, phoff + i * phdr.size, *fields)
+    if build_id is not None:
+        offset, size = shdrs[note_index][4], shdrs[note_index][5]
+        if elf_class == 1:
+            fields = (PT_NOTE, offset, base + offset, base + offset, size, size, 0x4, 4)
+        else:
+            fields = (PT_NOTE, 0x4, offset, base + offset, base + offset, size, size, 4)
+        phdr.pack_into(out, phoff + segments * phdr.size, *fields)
+    if dynamic:
+        offset, size = shdrs[dynamic_index][4], shdrs[dynamic_index][5]
+        regions = [(PT_LOAD, dynstr_offset, offset + size - dynstr_offset, 0x6, 0x1000), (PT_DYNAMIC, offset, size, 0x6, 8)]
+        for i, (p_type, start, size, flags, align) in enumerate(regions, phnum - 2):
+            if elf_class == 1:
+                fields = (p_type, start, base + start, base + start, size, size, flags, align)
+            else:
+                fields = (p_type, flags, start, base + start, base + start, size, size, align)
+            phdr.pack_into(out, phoff + i * phdr.size, *fields)
+
+    ident = bytes([0x7f, 0x45, 0x4c, 0x46, elf_class, 1 if byteorder == "<" else 2, 1, 0]) + bytes(8)
+    machine = 3 if elf_class == 1 else 62
+    L["ehdr"].pack_into(out, 0, ident, 2, machine, 1, base + text_start, phoff, shoff, 0,
+                        ehsize, phdr.size, phnum, shdr.size, len(shdrs), shstrndx)
+    return bytes(out)
+
+def write_elf(path, **kwargs) -> int:
+    data = generate_elf(**kwargs)
+    with open(path, "wb") as f:
+        f.write(data)
+    return len(data)
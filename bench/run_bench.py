@@ -0,0 +1,238 @@
+import argparse
+import io
+import json
+import os
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC)
+
+from elfgen import write_elf
+from readelf_py.elffile import ELFFile
+from readelf_py.elfheader import ELFHeader
+from readelf_py.elfreader import ELFReader
+from readelf_py.sectionheader import SectionHeader
+from readelf_py.symboltable import SymbolTable
+
+# name: (PROGBITS sections, segments, symbols)
+SIZES = {
+    "tiny": (10, 4, 10),
+    "small": (100, 8, 10_000),
+    "medium": (1_000, 16, 100_000),
+    "large": (10_000, 64, 1_000_000),
+    "huge": (60_000, 256, 4_000_000),
+}
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+def _stages(path):
+    # Each stage is (name, setup, run, items). setup builds whatever the
+    # stage needs from the previous stages and is not timed; items is the
+    # number of symbols the stage handles (0 when not symbol-bound).
+    def reader():
+        # The mapping outlives the file object.
+        with open(path, "rb") as f:
+            return ELFReader(f)
+
+    def header():
+        r = reader()
+        return r, ELFHeader(r)
+
+    def sections():
+        r, eh = header()
+        return r, eh, SectionHeader(r, eh)
+
+    def symbols():
+        r, eh, sh = sections()
+        st = SymbolTable(r, sh, eh)
+        for k in st.sym_sections:
+            st.get_table(k)
+        return st
+
+    def elffile():
+        f = ELFFile(reader())
+        f.load_all()
+        return f
+
+    def quiet(fn):
+        def run(arg):
+            with redirect_stdout(io.StringIO()):
+                fn(arg)
+        return run
+
+    def count(st):
+        return sum(len(st.get_table(k)) for k in st.sym_sections)
+
+    def resolve_names(st):
+        # Fresh string table caches, so the names are really decoded.
+        st.sectionHeader._string_tables = {}
+        st.resolve_names()
+
+    return [
+        ("elf header parse", reader, ELFHeader, None),
+        ("section header parse", header, lambda a: SectionHeader(*a), None),
+        ("symbol table parse", sections, lambda a: [SymbolTable(a[0], a[2], a[1]).get_table(k) for k in (".symtab", ".dynsym")], "symbols"),
+        ("name resolution", symbols, resolve_names, "symbols"),
+        ("print elf header", elffile, quiet(lambda f: f.elfHeader.print_elf_header()), None),
+        ("print program headers", elffile, quiet(lambda f: f.programHeader.print_program_header(f.sectionHeader)), None),
+        ("print section headers", elffile, quiet(lambda f: f.sectionHeader.print_section_header()), None),
+        ("print symbol table", elffile, quiet(lambda f: f.symbolTable.print_symbol_table()), "symbols"),
+        ("export json", elffile, lambda f: json.dump(f.export(), io.StringIO(), indent=4), "symbols"),
+        ("export jsonl", elffile, lambda f: f.export_json_lines(io.StringIO()), "symbols"),
+    ], lambda: count(symbols())
+
+# name: code run in a fresh interpreter ({path} is a tiny ELF file)
+STARTUP = {
+    "import readelf_py": "import readelf_py",
+    "open_elf header": "import readelf_py; readelf_py.open_elf({path!r}).elfHeader",
+    "cli -eh": "import sys; sys.argv = ['readelf', '-eh', {path!r}]; from readelf_py.cli import main; main()",
+}
+
+def calibrate(repeat=25) -> float:
+    # Seconds the fastest of repeat runs of a fixed workload takes. It
+    # does the same kind of work as the stages (struct decoding, dicts,
+    # string formatting), so a baseline from another machine can be
+    # scaled by the ratio of the two calibrations. Like the stages, it
+    # reports the best case; many short runs sample the machine's speed
+    # more often than a few long ones.
+    record = struct.Struct("<IIQQ")
+    data = b"".join(record.pack(i, i * 7, i * 13, i * 31) for i in range(5000))
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = [dict(zip(("a", "b", "c", "d"), record.unpack_from(data, i * record.size))) for i in range(5000)]
+        "\n".join("%08x %-10d %016x %s" % (r["a"], r["b"], r["c"], r["d"]) for r in rows)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def run_startup(repeat) -> dict:
+    # Wall time of short-lived processes, minus that of a bare
+    # interpreter, so what remains is our import and first-call cost.
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "tiny.elf")
+        write_elf(path, elf_class=2, sections=SIZES["tiny"][0], segments=SIZES["tiny"][1], symbols=SIZES["tiny"][2])
+        env = dict(os.environ, PYTHONPATH=SRC)
+        def spawn(code):
+            best = None
+            for _ in range(repeat):
+                start = time.perf_counter()
+                subprocess.run([sys.executable, "-c", code], env=env, check=True, stdout=subprocess.DEVNULL)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            return best
+        bare = spawn("pass")
+        for name, code in STARTUP.items():
+            key = "startup/%s" % name
+            results[key] = {"seconds": max(spawn(code.format(path=path)) - bare, 0.0), "peak_bytes": 0, "mb_per_s": None, "symbols_per_s": None}
+            _report(key, results[key])
+    return results
+
+def _measure(setup, run, repeat):
+    best = None
+    for _ in range(repeat):
+        arg = setup()
+        start = time.perf_counter()
+        run(arg)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    arg = setup()
+    tracemalloc.start()
+    run(arg)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak
+
+def run_benchmarks(sizes, classes, repeat, byteorder="<") -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            nsections, nsegments, nsymbols = SIZES[size]
+            for elf_class in classes:
+                # Big-endian runs are keyed apart, e.g. "small/64be/...".
+                label = "%d%s" % (elf_class, "be" if byteorder == ">" else "")
+                path = os.path.join(tmp, "%s-%s.elf" % (size, label))
+                file_size = write_elf(path, elf_class=1 if elf_class == 32 else 2, sections=nsections, segments=nsegments, symbols=nsymbols, byteorder=byteorder)
+                stages, symbol_count = _stages(path)
+                nsyms = symbol_count()
+                for name, setup, run, unit in stages:
+                    elapsed, peak = _measure(setup, run, repeat)
+                    key = "%s/%s/%s" % (size, label, name)
+                    results[key] = {
+                        "seconds": elapsed,
+                        "peak_bytes": peak,
+                        "mb_per_s": file_size / elapsed / 1e6 if elapsed else None,
+                        "symbols_per_s": nsyms / elapsed if unit and elapsed else None,
+                    }
+                    _report(key, results[key])
+    return results
+
+def _report(key, r) -> None:
+    rate = "%12.0f sym/s" % r["symbols_per_s"] if r["symbols_per_s"] else " " * 18
+    print("%-45s %10.3f ms %10.1f MB/s %s %10.1f KiB peak" % (key, r["seconds"] * 1e3, r["mb_per_s"] or 0, rate, r["peak_bytes"] / 1024))
+
+def compare(results, calibration, baseline, threshold) -> int:
+    # Prints the change of every stage against the baseline and returns
+    # the number of stages that got slower by more than threshold. The
+    # baseline times are scaled by calibration over the baseline's own,
+    # so a baseline taken on a faster or slower machine still compares.
+    scale = calibration / baseline["calibration"]
+    regressions = 0
+    print("")
+    print("Calibration %.3f ms, baseline %.3f ms: baseline times scaled by %.2f" % (calibration * 1e3, baseline["calibration"] * 1e3, scale))
+    print("%-45s %12s %12s %8s" % ("Stage", "Baseline", "Current", "Change"))
+    for key, r in results.items():
+        if key not in baseline["results"]:
+            continue
+        old = baseline["results"][key]["seconds"] * scale
+        change = (r["seconds"] - old) / old * 100 if old else 0.0
+        mark = ""
+        if change > threshold:
+            mark = "  REGRESSION"
+            regressions += 1
+        print("%-45s %9.3f ms %9.3f ms %+7.1f%%%s" % (key, old * 1e3, r["seconds"] * 1e3, change, mark))
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the parsers on synthetic ELF files")
+    parser.add_argument("--sizes", default="tiny,small,medium", help="Comma separated: " + ",".join(SIZES))
+    parser.add_argument("--class", dest="classes", default="32,64", help="ELF classes to generate (32, 64)")
+    parser.add_argument("--byteorder", choices=("little", "big"), default="little", help="Byte order of the generated files")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per stage; the fastest is reported")
+    parser.add_argument("--baseline", metavar="PATH", default=DEFAULT_BASELINE, help="Baseline results file")
+    parser.add_argument("--save-baseline", help="Store these results as the new baseline", action="store_true")
+    parser.add_argument("--compare", help="Compare with the baseline, scaled to this machine by the calibration, and exit with status 1 on a regression", action="store_true")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Slowdown in percent reported as a regression")
+    parser.add_argument("--no-startup", help="Skip the interpreter start-up and import time stages", action="store_true")
+    parser.add_argument("--output", metavar="PATH", help="Also write the results to PATH as JSON")
+    args = parser.parse_args()
+
+    sizes = args.sizes.split(",")
+    classes = [int(c) for c in args.classes.split(",")]
+    # The machine's speed drifts; the faster of a calibration before and
+    # one after the stages matches their best-of-repeat times.
+    calibration = calibrate()
+    results = {} if args.no_startup else run_startup(max(args.repeat, 5))
+    results |= run_benchmarks(sizes, classes, args.repeat, "<" if args.byteorder == "little" else ">")
+    calibration = min(calibration, calibrate())
+    # The output and baseline files hold the calibration with the results.
+    record = {"calibration": calibration, "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(record, f, indent=4)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(record, f, indent=4)
+    elif args.compare:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if "calibration" not in baseline:
+            sys.exit("%s has no calibration; regenerate it with --save-baseline" % args.baseline)
+        sys.exit(1 if compare(results, calibration, baseline, args.threshold) else 0)
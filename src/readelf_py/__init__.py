@@ -0,0 +1,53 @@
+import importlib
+
+__version__ = "0.1.0"
+
+# Public name -> module that defines it. Submodules are only imported on
+# first use, so "import readelf_py" costs next to nothing and a caller
+# that only reads headers never loads the symbol, export or CLI code.
+_EXPORTS = {
+    "ELFFile": "elffile",
+    "ELFReader": "elfreader",
+    "ELFHeader": "elfheader",
+    "ProgramHeader": "programheader",
+    "SectionHeader": "sectionheader",
+    "SymbolTable": "symboltable",
+    "DynamicSection": "dynamicsection",
+    "Relocations": "relocations",
+    "Notes": "notes",
+    "ELFCache": "elfcache",
+    "ELFDiff": "elfdiff",
+    "DependencyGraph": "depgraph",
+    "ELFServer": "server",
+    "Stats": "stats",
+    "StreamReader": "streamreader",
+    "StreamError": "streamreader",
+    "ArchiveError": "archive",
+    "CompressionError": "compressed",
+}
+
+__all__ = ["__version__", "open_elf"] + list(_EXPORTS)
+
+def open_elf(source):
+    # ELFFile for a path or an open binary file. A path is opened here
+    # and closed with the ELFFile (also usable as a context manager).
+    from .elffile import ELFFile
+    if isinstance(source, (str, bytes)) or hasattr(source, "__fspath__"):
+        f = open(source, "rb")
+        try:
+            return ELFFile(f, owns_file=True)
+        except Exception:
+            f.close()
+            raise
+    return ELFFile(source)
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    value = getattr(importlib.import_module("." + module, __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
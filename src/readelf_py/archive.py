@@ -0,0 +1,231 @@
+import struct
+
+AR_MAGIC = b"!<arch>\n"
+AR_HEADER_SIZE = 60
+# Names of the symbol index members: GNU/System V with 32-bit and with
+# 64-bit offsets.
+SYMBOL_INDEX = "/"
+SYMBOL_INDEX_64 = "/SYM64/"
+
+class ArchiveError(Exception):
+    pass
+
+class PrefixedStream:
+    # A non-seekable stream that returns prefix (bytes already read off
+    # stream, e.g. to sniff a magic number) before the rest of stream.
+    def __init__(self, prefix, stream, size=None) -> None:
+        self._prefix = prefix
+        self._stream = stream
+        self.size = size
+
+    def seekable(self) -> bool:
+        return False
+
+    def read(self, size=-1) -> bytes:
+        if self._prefix:
+            if size < 0:
+                data, self._prefix = self._prefix + self._stream.read(), b""
+                return data
+            data, self._prefix = self._prefix[:size], self._prefix[size:]
+            return data
+        return self._stream.read(size)
+
+class MemberStream:
+    # The next size bytes of an archive stream, read front to back.
+    # skip() drains whatever the reader left (seeking past it when the
+    # archive stream can), so the stream is positioned at the following
+    # member. offset is that of the member header in the archive and
+    # data_offset that of the contents.
+    def __init__(self, stream, size, offset=None) -> None:
+        self._stream = stream
+        self._left = size
+        self.size = size
+        self.offset = offset
+        self.data_offset = None if offset is None else offset + AR_HEADER_SIZE
+
+    def seekable(self) -> bool:
+        return False
+
+    def read(self, size=-1) -> bytes:
+        if size < 0 or size > self._left:
+            size = self._left
+        data = read_exact(self._stream, size)
+        self._left -= len(data)
+        if len(data) < size:
+            raise ArchiveError("archive truncated inside a member")
+        return data
+
+    def skip(self) -> None:
+        if self._left and _is_seekable(self._stream):
+            self._stream.seek(self._left, 1)
+            self._left = 0
+        while self._left:
+            if not self.read(1024 * 1024):
+                break
+
+def read_exact(stream, size) -> bytes:
+    # Pipes may return short reads; loop until size bytes or EOF.
+    data = stream.read(size)
+    if len(data) == size or not data:
+        return data
+    parts = [data]
+    size -= len(data)
+    while size:
+        data = stream.read(size)
+        if not data:
+            break
+        parts.append(data)
+        size -= len(data)
+    return b"".join(parts)
+
+def _is_seekable(stream) -> bool:
+    try:
+        return stream.seekable()
+    except (AttributeError, ValueError):
+        return False
+
+def iter_members(stream):
+    # Yields (name, stream) for each regular member of an ar archive
+    # (static library, .deb) or a tar archive (plain or compressed, e.g.
+    # an image layer), reading the archive once, front to back. Each
+    # member stream is only valid until the next one is yielded.
+    magic = read_exact(stream, len(AR_MAGIC))
+    if magic == AR_MAGIC:
+        for name, member in _iter_ar(stream):
+            if name not in (SYMBOL_INDEX, SYMBOL_INDEX_64) and not name.startswith("__.SYMDEF"):
+                yield name, member
+    else:
+        yield from _iter_tar(PrefixedStream(magic, stream))
+
+def _iter_tar(stream):
+    import tarfile
+    try:
+        with tarfile.open(fileobj=stream, mode="r|*") as tar:
+            for member in tar:
+                if member.isreg():
+                    yield member.name, MemberStream(tar.extractfile(member), member.size)
+    except tarfile.TarError as e:
+        raise ArchiveError("not an ar or tar archive: %s" % e)
+
+def _iter_ar(stream):
+    # Yields (name, member) for each member of an ar archive, symbol
+    # index included, once the magic has been read. System V/GNU and BSD
+    # formats: the GNU "//" member holds the long names that the others
+    # reference as "/offset"; BSD stores a long name as "#1/length"
+    # followed by the name itself.
+    names = b""
+    offset = len(AR_MAGIC)
+    while True:
+        header = read_exact(stream, AR_HEADER_SIZE)
+        if not header:
+            return
+        if len(header) < AR_HEADER_SIZE or header[58:60] != b"`\n":
+            raise ArchiveError("malformed ar member header at offset 0x%x" % offset)
+        name = header[:16].decode("utf-8", errors="replace").rstrip(" ")
+        try:
+            size = int(header[48:58])
+        except ValueError:
+            raise ArchiveError("malformed ar member size %r at offset 0x%x" % (header[48:58], offset))
+        member = MemberStream(stream, size, offset)
+        if name == "//":
+            names = member.read()
+            name = None
+        elif name.startswith("#1/"):
+            if not name[3:].isdigit() or int(name[3:]) > size:
+                raise ArchiveError("malformed BSD member name %r at offset 0x%x" % (name, offset))
+            length = int(name[3:])
+            name = member.read(length).rstrip(b"\x00").decode("utf-8", errors="replace")
+            member.size -= length
+            member.data_offset += length
+        elif name.startswith("/") and name[1:].isdigit():
+            start = int(name[1:])
+            end = names.find(b"/\n", start)
+            name = names[start:end if end >= 0 else len(names)].decode("utf-8", errors="replace")
+        elif name.endswith("/") and name not in (SYMBOL_INDEX, SYMBOL_INDEX_64):
+            name = name[:-1]
+        if name is not None:
+            yield name, member
+        member.skip()
+        if size % 2:
+            read_exact(stream, 1)
+        offset += AR_HEADER_SIZE + size + size % 2
+
+class ArArchive:
+    # The member table and symbol index of an ar archive (a static
+    # library), read from the member headers alone, in one forward pass:
+    # no member is opened. Answers which member defines a symbol the way
+    # the linker does, from the index that "ar s"/ranlib writes.
+    #
+    # members lists (name, header offset, data offset, size) in archive
+    # order; symbols lists (symbol, header offset) in index order.
+    def __init__(self, f, name="") -> None:
+        self.name = name
+        self.members = []
+        self.symbols = []
+        self.has_index = False
+        if read_exact(f, len(AR_MAGIC)) != AR_MAGIC:
+            raise ArchiveError("not an ar archive")
+        for member_name, member in _iter_ar(f):
+            if member_name in (SYMBOL_INDEX, SYMBOL_INDEX_64):
+                self.symbols = parse_symbol_index(member.read(), member_name == SYMBOL_INDEX_64)
+                self.has_index = True
+            elif not member_name.startswith("__.SYMDEF"):
+                self.members.append((member_name, member.offset, member.data_offset, member.size))
+        self._names = {offset: member_name for member_name, offset, _, _ in self.members}
+        self._defined = None
+
+    def member_name(self, offset) -> str:
+        return self._names.get(offset, "<offset 0x%x>" % offset)
+
+    def find_symbol(self, symbol) -> list:
+        # Names of the members that define symbol; the linker takes the
+        # first.
+        if self._defined is None:
+            self._defined = {}
+            for name, offset in self.symbols:
+                self._defined.setdefault(name, []).append(offset)
+        return [self.member_name(offset) for offset in self._defined.get(symbol, [])]
+
+    def iter_index(self):
+        # Yields (member name, header offset, [symbols]), grouping runs
+        # of consecutive index entries, which is how ranlib orders them.
+        run = []
+        for name, offset in self.symbols:
+            if run and offset != run[0][1]:
+                yield self.member_name(run[0][1]), run[0][1], [symbol for symbol, _ in run]
+                run = []
+            run.append((name, offset))
+        if run:
+            yield self.member_name(run[0][1]), run[0][1], [symbol for symbol, _ in run]
+
+    def print_index(self) -> None:
+        if not self.has_index:
+            print("%s has no archive symbol index" % self.name)
+            return
+        print("Index of archive %s: (%d entries)" % (self.name, len(self.symbols)))
+        for member_name, offset, symbols in self.iter_index():
+            print("Binary %s(%s) at offset 0x%x" % (self.name, member_name, offset))
+            for symbol in symbols:
+                print("\t" + symbol)
+        print("")
+
+    def export_index(self) -> dict:
+        tmp = []
+        for member_name, offset, symbols in self.iter_index():
+            tmp.append({"Member": member_name, "Offset": offset, "Symbols": symbols})
+        return {"Archive Index": tmp}
+
+def parse_symbol_index(data, wide=False) -> list:
+    # The "/" member: a big-endian count, that many member header
+    # offsets, then as many NUL-terminated names; "/SYM64/" is the same
+    # with 64-bit count and offsets. Returns [(symbol, header offset)].
+    word = struct.Struct(">Q" if wide else ">I")
+    if len(data) < word.size:
+        return []
+    count = word.unpack_from(data)[0]
+    end = word.size * (count + 1)
+    if end > len(data):
+        raise ArchiveError("archive symbol index truncated")
+    offsets = struct.unpack_from(">%d%s" % (count, word.format[-1]), data, word.size)
+    names = bytes(data[end:]).split(b"\x00")
+    return [(names[i].decode("utf-8", errors="replace"), offsets[i]) for i in range(min(count, len(names)))]
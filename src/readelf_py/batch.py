@@ -0,0 +1,163 @@
+import glob
+import io
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import redirect_stdout
+
+from .elfheader import ELF_MAGIC
+from .elfcache import open_elffile
+from .elffile import ELFFile
+
+MEMBERS_PER_TASK = 64
+
+def iter_paths(sources):
+    # Expands directories, glob patterns and "-" (one path per line on
+    # stdin) into the regular files they name.
+    for source in sources:
+        if source == "-":
+            for line in sys.stdin:
+                path = line.rstrip("\n")
+                if path:
+                    yield from iter_paths([path])
+        elif os.path.isdir(source):
+            for root, dirs, files in os.walk(source):
+                dirs.sort()
+                for name in sorted(files):
+                    path = os.path.join(root, name)
+                    if os.path.isfile(path) and not os.path.islink(path):
+                        yield path
+        elif glob.has_magic(source):
+            for path in glob.iglob(source, recursive=True):
+                if os.path.isfile(path):
+                    yield path
+        else:
+            yield source
+
+def is_elf_file(path) -> bool:
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(ELF_MAGIC)) == ELF_MAGIC
+    except OSError:
+        return False
+
+def analyse_file(path, display, args, export) -> tuple:
+    # Runs in a worker process. Returns (path, text, export, error);
+    # text is None when the file was skipped as non-ELF. export is None,
+    # "json" (one object per file) or "jsonl" (one line per record).
+    if not is_elf_file(path):
+        return path, None, None, None
+    try:
+        with open(path, "rb") as elf:
+            return analyse(path, lambda: open_elffile(elf, args), display, args, export)
+    except OSError as e:
+        return path, "", None, "%s: %s" % (type(e).__name__, e)
+
+def analyse(path, load, display, args, export) -> tuple:
+    # analyse_file() for the ELFFile that load() returns. A "jsonl"
+    # export is written to a SpooledExport rather than returned as a
+    # string, so neither the worker nor the result sent back holds the
+    # records of a whole file.
+    out = io.StringIO()
+    spool = None
+    try:
+        with load() as elffile:
+            with redirect_stdout(out):
+                display(elffile, args)
+            if export == "json":
+                result = json.dumps({"File": path} | elffile.export()) + "\n"
+            elif export == "jsonl":
+                spool = SpooledExport()
+                with open(spool.path, "w", encoding="utf-8") as f:
+                    elffile.export_json_lines(f, {"File": path})
+                result = spool
+            else:
+                result = None
+    except Exception as e:
+        if spool is not None:
+            spool.discard()
+        return path, out.getvalue(), None, "%s: %s" % (type(e).__name__, e)
+    return path, out.getvalue(), result, None
+
+class SpooledExport:
+    # Export output written to a temporary file and handed back by name.
+    # write_to() copies it out in bounded chunks and removes the file.
+    def __init__(self) -> None:
+        import tempfile
+        fd, self.path = tempfile.mkstemp(prefix="readelf-py-", suffix=".jsonl")
+        os.close(fd)
+
+    def write_to(self, f) -> None:
+        import shutil
+        try:
+            with open(self.path, encoding="utf-8") as spool:
+                shutil.copyfileobj(spool, f)
+        finally:
+            self.discard()
+
+    def discard(self) -> None:
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+def write_result(result, f) -> None:
+    # Writes the export of an analyse_file() result to f.
+    if isinstance(result, SpooledExport):
+        result.write_to(f)
+    else:
+        f.write(result)
+
+def analyse_members(path, members, display, args, export) -> list:
+    # Runs in a worker process: analyse_file() for a run of members of
+    # the ar archive at path, given as (name, data offset, size). Each
+    # member is read in one piece and parsed in memory.
+    results = []
+    with open(path, "rb") as f:
+        for name, offset, size in members:
+            member_path = "%s(%s)" % (path, name)
+            f.seek(offset)
+            data = f.read(size)
+            if data[:len(ELF_MAGIC)] != ELF_MAGIC:
+                results.append((member_path, None, None, None))
+                continue
+            results.append(analyse(member_path, lambda: ELFFile(data), display, args, export))
+    return results
+
+def run_batch(sources, display, args, jobs=None, export=None):
+    # Analyses every file named by sources on a pool of worker processes
+    # and yields analyse_file() results as soon as each one completes.
+    # At most a few tasks per worker are queued at once, so the path
+    # list is never materialised in full.
+    jobs = jobs or os.cpu_count() or 1
+    paths = iter_paths(sources)
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        pending = set()
+        for path in paths:
+            pending.add(pool.submit(analyse_file, path, display, args, export))
+            if len(pending) >= jobs * 4:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+def run_archive(path, archive, display, args, jobs=None, export=None):
+    # Analyses the members of the ar archive at path (an ArArchive) on a
+    # pool of worker processes, in runs of MEMBERS_PER_TASK so that small
+    # objects are not sent one by one, and yields the analyse_file()
+    # results in member order.
+    jobs = jobs or os.cpu_count() or 1
+    members = [(name, offset, size) for name, _, offset, size in archive.members]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        pending = deque()
+        for i in range(0, len(members), MEMBERS_PER_TASK):
+            pending.append(pool.submit(analyse_members, path, members[i:i + MEMBERS_PER_TASK], display, args, export))
+            if len(pending) >= jobs * 4:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
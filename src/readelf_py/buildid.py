@@ -0,0 +1,46 @@
+import struct
+
+from .batch import iter_paths
+from .elfheader import ELFHeader
+from .elfreader import ELFReader
+from .notes import find_build_id
+
+def read_build_id(path) -> str:
+    # Build ID of the file at path, or None (no build ID, not an ELF
+    # file or unreadable). The file is opened unbuffered and not mapped,
+    # so only the ELF header, the program headers and the PT_NOTE
+    # segments are read.
+    try:
+        with open(path, "rb", buffering=0) as f:
+            elf = ELFReader(f, use_mmap=False)
+            eh = ELFHeader(elf)
+            if not eh.is_elf():
+                return None
+            return find_build_id(elf, eh)
+    except (OSError, ValueError, struct.error):
+        return None
+
+def iter_build_ids(sources):
+    # (build ID, path) for every ELF file with a build ID in the given
+    # directories, globs or files.
+    for path in iter_paths(sources):
+        build_id = read_build_id(path)
+        if build_id is not None:
+            yield build_id, path
+
+def write_build_id_index(sources, f) -> int:
+    # Writes "build-id<TAB>path" lines sorted by build ID, so the index
+    # can be merged or binary searched. Returns the number of entries.
+    entries = sorted(iter_build_ids(sources))
+    for build_id, path in entries:
+        f.write("%s\t%s\n" % (build_id, path))
+    return len(entries)
+
+def load_build_id_index(f) -> dict:
+    # build ID -> list of paths, from a file written by write_build_id_index.
+    index = {}
+    for line in f:
+        build_id, _, path = line.rstrip("\n").partition("\t")
+        if path:
+            index.setdefault(build_id, []).append(path)
+    return index
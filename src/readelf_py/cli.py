@@ -0,0 +1,324 @@
+import argparse
+import contextlib
+import sys
+# refference: binutils
+
+
+def display(elffile, args) -> None:
+    if args.file_header:
+        elffile.elfHeader.print_elf_header()
+    if args.program_headers:
+        elffile.programHeader.print_program_header(elffile.sectionHeader)
+    if args.section_headers:   
+        elffile.sectionHeader.print_section_header()
+    if args.dynamic:
+        elffile.dynamicSection.print_dynamic_section()
+    if args.relocs:
+        elffile.relocations.print_relocations()
+    if args.notes:
+        elffile.notes.print_notes()
+    if args.symbols:
+        elffile.symbolTable.print_symbol_table()
+    elif args.dyn_syms:
+        elffile.symbolTable.print_symbol_table((".dynsym",))
+    for name in args.hex_dump or ():
+        elffile.sectionHeader.print_hex_dump(name, args.decompress)
+    for name in args.string_dump or ():
+        elffile.sectionHeader.print_string_dump(name, args.decompress)
+
+def symbolize(elffile, lines) -> None:
+    # Prints "address name+offset" for every hex address read from lines,
+    # and "?? word" for a word that is not one.
+    words = []
+    for line in lines:
+        for word in line.split():
+            try:
+                words.append((word, int(word, 16)))
+            except ValueError:
+                words.append((word, None))
+    results = iter(elffile.lookup_addresses([addr for _, addr in words if addr is not None]))
+    for word, addr in words:
+        if addr is None:
+            print("?? %s" % word)
+            continue
+        found = next(results)
+        if found is None:
+            print("0x%x ??" % addr)
+        else:
+            print("0x%x %s+0x%x" % (addr, found[0], found[1]))
+
+def find_symbols(elffile, names) -> None:
+    for name in names:
+        i = elffile.find_symbol(name)
+        if i is None:
+            print(name + ": not found in .dynsym")
+        else:
+            print(elffile.symbolTable.format_symbol(".dynsym", i))
+
+def open_input(elf, args):
+    # Regular files go through the cache, if there is one. Streams are
+    # read front to back, keeping only what the requested output needs.
+    from .elfreader import is_seekable
+    if is_seekable(elf):
+        from .elfcache import open_elffile
+        return open_elffile(elf, args)
+    from .elffile import ELFFile
+    from .streamreader import StreamReader
+    return ELFFile(StreamReader(elf, getattr(elf, "size", None), args.stream_limit * 1024 * 1024, needs_loaded(args)))
+
+def needs_loaded(args) -> bool:
+    # Whether the output reads the contents of PT_LOAD segments (symbol,
+    # relocation and dynamic tables, section dumps) or only the headers,
+    # the notes and the non-allocated sections.
+    return bool(args.dynamic or args.relocs or args.symbols or args.dyn_syms or args.hex_dump or args.string_dump
+                or args.find_symbol or args.symbolize or args.export or args.stats)
+
+def main_file(elf, args) -> None:
+    if args.stats:
+        return main_stats(elf, args)
+    elffile = open_input(elf, args)
+    output(elffile, args)
+    elffile.close()
+
+def output(elffile, args) -> None:
+    display(elffile, args)
+    if args.find_symbol:
+        find_symbols(elffile, args.find_symbol)
+    if args.symbolize:
+        symbolize(elffile, sys.stdin)
+    if args.export:
+        import json
+        with open_export(args.export) as f:
+            if args.export_format == "jsonl":
+                elffile.export_json_lines(f)
+            else:
+                json.dump(elffile.export(), f, indent=4)
+
+def stats_stages(args) -> tuple:
+    # What the requested output parses in full: (program headers,
+    # section names, symbol tables decoded, symbol tables whose every
+    # name is printed).
+    all_tables = (".symtab", ".dynsym")
+    program = bool(args.export or args.program_headers or args.dynamic or args.notes)
+    sections = bool(args.export or args.program_headers or args.section_headers or args.relocs or args.notes
+                    or args.symbols or args.dyn_syms or args.hex_dump or args.string_dump or args.find_symbol or args.symbolize)
+    named = all_tables if args.symbols or args.export else (".dynsym",) if args.dyn_syms else ()
+    decoded = all_tables if args.symbolize else named
+    return program, sections, decoded, named
+
+def main_stats(elf, args) -> None:
+    # Same as main(), but the tables the requested output parses in
+    # full are parsed first, one stage at a time, so each stage's cost
+    # can be reported separately. Stages the output does not need are
+    # skipped; what it parses on demand (a hash lookup, the names of a
+    # few symbols) counts towards "output".
+    from .stats import Stats
+    stats = Stats(trace_memory=True)
+    program, sections, decoded, named = stats_stages(args)
+    with stats.stage("header parse"):
+        elffile = open_input(elf, args)
+        stats.reader = elffile.elf
+        if program:
+            elffile.programHeader
+    if sections:
+        with stats.stage("section parse"):
+            for sh in elffile.sectionHeader.s_headers:
+                elffile.sectionHeader.get_section_name(sh["sh_name"])
+    if decoded:
+        with stats.stage("symbol decode"):
+            for k in elffile.symbolTable.sym_sections:
+                if k in decoded:
+                    elffile.symbolTable.get_table(k)
+    if named:
+        with stats.stage("name resolution"):
+            elffile.symbolTable.resolve_names(named)
+    with stats.stage("output"):
+        output(elffile, args)
+    elffile.close()
+    sys.stdout.flush()
+    if args.stats == "json":
+        stats.write_json()
+    else:
+        stats.print_stats()
+
+def open_export(path):
+    if path == "-":
+        return contextlib.nullcontext(sys.stdout)
+    return open(path, "w")
+
+def main_batch(args) -> None:
+    from .batch import run_batch
+    with open_export(args.export) if args.export else contextlib.nullcontext() as export:
+        export_format = args.export_format if export is not None else None
+        print_results(run_batch(args.batch, display, args, args.jobs, export_format), export)
+
+def print_results(results, export) -> None:
+    # Prints batch.analyse_file() results as "File: path" sections.
+    from .batch import write_result
+    for path, text, result, error in results:
+        if text is None:
+            continue
+        if text:
+            print("File: " + path)
+            print(text, end="")
+        if error:
+            print("Error: " + path + ": " + error, file=sys.stderr)
+        if result is not None:
+            write_result(result, export)
+
+def main_archive(args) -> None:
+    # A seekable ar archive (a static library) is split into members from
+    # its headers and the members are parsed on a worker pool; anything
+    # else (stdin, tar) is read in one forward pass without extracting
+    # it. -c and --find-symbol only read the ar symbol index.
+    import json
+    from .archive import AR_MAGIC, ArArchive, PrefixedStream, iter_members, read_exact
+    from .batch import analyse, run_archive
+    from .elfheader import ELF_MAGIC
+    source = contextlib.nullcontext(sys.stdin.buffer) if args.archive == "-" else open(args.archive, "rb")
+    with source as f, open_export(args.export) if args.export else contextlib.nullcontext() as export:
+        export_format = args.export_format if export is not None else None
+        if args.archive_index or args.find_symbol:
+            archive = ArArchive(f, args.archive)
+            if args.archive_index:
+                if export is None or args.export != "-":
+                    archive.print_index()
+                if export is not None:
+                    json.dump(archive.export_index(), export, indent=4)
+            for symbol in args.find_symbol or []:
+                print("%s: %s" % (symbol, ", ".join(archive.find_symbol(symbol)) or "not found"))
+            return
+        if args.archive != "-" and read_exact(f, len(AR_MAGIC)) == AR_MAGIC:
+            f.seek(0)
+            archive = ArArchive(f, args.archive)
+            return print_results(run_archive(args.archive, archive, display, args, args.jobs, export_format), export)
+        if args.archive != "-":
+            f.seek(0)
+        for name, member in iter_members(f):
+            path = "%s(%s)" % (args.archive, name)
+            magic = read_exact(member, len(ELF_MAGIC))
+            if magic != ELF_MAGIC:
+                continue
+            stream = PrefixedStream(magic, member, member.size)
+            print_results([analyse(path, lambda: open_input(stream, args), display, args, export_format)], export)
+
+def main_deps(args) -> None:
+    # One graph for every file, so shared libraries are parsed only once.
+    import json
+    from .batch import is_elf_file, iter_paths
+    from .depgraph import DependencyGraph
+    graph = DependencyGraph(args.library_path)
+    with open_export(args.export) if args.export else contextlib.nullcontext() as export:
+        for path in iter_paths(args.deps):
+            if not is_elf_file(path):
+                continue
+            if export is None or args.export != "-":
+                print("File: " + path)
+                graph.print_dependencies(path)
+            if export is not None:
+                export.write(json.dumps({"File": path} | graph.export_dependencies(path)) + "\n")
+
+def main_diff(args) -> int:
+    # Exit status 1 when the files differ, like diff(1).
+    import json
+    from .elfdiff import ELFDiff
+    with open(args.diff[0], "rb") as a, open(args.diff[1], "rb") as b:
+        diff = ELFDiff(a, b)
+        if args.export:
+            with open_export(args.export) as f:
+                json.dump(diff.export_diff(), f, indent=4)
+        if args.export != "-":
+            diff.print_diff()
+        differs = bool(diff)
+        diff.close()
+    return 1 if differs else 0
+
+def main_build_ids(args) -> None:
+    from .buildid import load_build_id_index, write_build_id_index
+    if args.build_id_index:
+        with open_export(args.index_file) as f:
+            count = write_build_id_index(args.build_id_index, f)
+        print("%d build IDs indexed" % count, file=sys.stderr)
+    if args.lookup_build_id:
+        with open(args.index_file) as f:
+            index = load_build_id_index(f)
+        for build_id in args.lookup_build_id:
+            for path in index.get(build_id.lower(), ["not found"]):
+                print("%s %s" % (build_id, path))
+    
+
+def main(argv=None) -> None:
+    # The subsystems behind each mode are imported only when it runs.
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-eh", "--file-header", help="Display the ELF file header", action="store_true")
+    parser.add_argument("-l", "--program-headers", help="Display the program headers", action="store_true")
+    parser.add_argument("-S", "--section-headers", help="Display the sections' header", action="store_true")
+    parser.add_argument("-e", "--headers", help="Display all headers", action="store_true")
+    parser.add_argument("-d", "--dynamic", help="Display the dynamic section", action="store_true")
+    parser.add_argument("-r", "--relocs", help="Display the relocations", action="store_true")
+    parser.add_argument("-n", "--notes", help="Display the notes", action="store_true")
+    parser.add_argument("-s", "--symbols", help="Display the symbol table", action="store_true")
+    parser.add_argument("--dyn-syms", help="Display the dynamic symbol table only", action="store_true")
+    parser.add_argument("-x", "--hex-dump", metavar="SECTION", action="append", help="Dump the contents of SECTION (name or number) as bytes (repeatable)")
+    parser.add_argument("-p", "--string-dump", metavar="SECTION", action="append", help="Dump the contents of SECTION (name or number) as strings (repeatable)")
+    parser.add_argument("-z", "--decompress", help="Decompress compressed sections before dumping them", action="store_true")
+    parser.add_argument("--find-symbol", metavar="NAME", action="append", help="Look up a dynamic symbol by name via .gnu.hash/.hash; with --archive, the members defining it via the archive symbol index (repeatable)")
+    parser.add_argument("--symbolize", help="Read hex addresses from stdin and print the symbol containing each", action="store_true")
+    parser.add_argument("--stats", nargs="?", const="table", choices=("table", "json"), help="Print the time, bytes read, read/seek calls and peak memory of each stage to stderr")
+    parser.add_argument("--export", metavar="PATH", help="Export the headers to a JSON file ('-' for stdout; one JSON object per file with --batch or --archive)")
+    parser.add_argument("--export-format", choices=("json", "jsonl"), default="json", help="json: one document; jsonl: stream one JSON Lines record per header, segment, section, symbol and relocation")
+    parser.add_argument("--batch", metavar="SOURCE", nargs="+", help="Analyse every ELF file in the given directories, globs or files ('-' reads paths from stdin)")
+    parser.add_argument("-j", "--jobs", metavar="N", type=int, help="Number of worker processes for --batch and --archive (default: CPU count)")
+    parser.add_argument("--archive", metavar="ARCHIVE", help="Analyse every ELF member of an ar archive (static library; members in parallel) or a tar archive (optionally compressed; in one pass without extracting it) ('-' for stdin)")
+    parser.add_argument("-c", "--archive-index", help="Display the symbol index of the --archive ar archive", action="store_true")
+    parser.add_argument("--deps", metavar="SOURCE", nargs="+", help="Resolve the shared library dependencies of every ELF file in the given directories, globs or files")
+    parser.add_argument("--library-path", metavar="DIR", action="append", help="Search DIR for libraries before DT_RUNPATH, like LD_LIBRARY_PATH (repeatable)")
+    parser.add_argument("--diff", metavar=("A", "B"), nargs=2, help="Report sections, segments and exported symbols added, removed or resized from A to B (exit status 1 if any)")
+    parser.add_argument("--build-id-index", metavar="SOURCE", nargs="+", help="Write a build-id -> path index of every ELF file in the given directories, globs or files, reading only headers and PT_NOTE segments")
+    parser.add_argument("--lookup-build-id", metavar="ID", action="append", help="Print the paths of build ID ID from --index-file (repeatable)")
+    parser.add_argument("--index-file", metavar="PATH", default="-", help="Build ID index file written by --build-id-index or read by --lookup-build-id (default: stdout)")
+    parser.add_argument("--serve", metavar="SOCKET", help="Serve JSON Lines requests on the Unix domain socket SOCKET, keeping parsed files warm")
+    parser.add_argument("--max-files", metavar="N", type=int, help="Number of parsed files --serve keeps (default: 64)")
+    parser.add_argument("--cache-dir", metavar="DIR", help="Cache parse results in DIR, keyed by file content (default: $READELF_PY_CACHE_DIR)")
+    parser.add_argument("--cache-size", metavar="MB", type=int, help="Evict least recently used cache entries beyond this size (default: 512)")
+    parser.add_argument("--no-cache", help="Bypass the result cache", action="store_true")
+    parser.add_argument("--rebuild-cache", help="Re-parse and overwrite this file's cache entry", action="store_true")
+    parser.add_argument("--stream-limit", metavar="MB", type=int, default=256, help="Most bytes kept in memory when reading a stream (stdin, archive members)")
+    parser.add_argument("file", nargs="?", help="The file to read ('-' reads a stream from stdin without seeking)")
+    args = parser.parse_args(argv)
+    
+    if args.headers:
+        args.file_header = True
+        args.program_headers = True
+        args.section_headers = True
+    
+    if args.serve:
+        from .server import DEFAULT_MAX_FILES, ELFServer
+        ELFServer(args.serve, args.max_files or DEFAULT_MAX_FILES).serve()
+    elif args.diff:
+        sys.exit(main_diff(args))
+    elif args.build_id_index or args.lookup_build_id:
+        main_build_ids(args)
+    elif args.deps:
+        main_deps(args)
+    elif args.batch:
+        main_batch(args)
+    elif args.archive:
+        from .archive import ArchiveError
+        try:
+            main_archive(args)
+        except ArchiveError as e:
+            sys.exit("Error: %s: %s" % (args.archive, e))
+    elif args.archive_index:
+        parser.error("-c/--archive-index requires --archive")
+    elif args.file is None:
+        parser.error("the following arguments are required: file")
+    elif args.file == "-":
+        from .streamreader import StreamError
+        try:
+            main_file(sys.stdin.buffer, args)
+        except StreamError as e:
+            sys.exit("Error: -: %s" % e)
+    else:
+        with open(args.file, 'rb') as elf:
+            main_file(elf, args)
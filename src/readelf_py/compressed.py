@@ -0,0 +1,127 @@
+import zlib
+from collections import OrderedDict
+
+SHF_COMPRESSED = 0x800
+ELFCOMPRESS_ZLIB = 1
+ELFCOMPRESS_ZSTD = 2
+
+# .zdebug_* sections (the GNU format that predates SHF_COMPRESSED) start
+# with "ZLIB" and the uncompressed size as a 64-bit big-endian number.
+ZDEBUG_MAGIC = b"ZLIB"
+ZDEBUG_HEADER_SIZE = 12
+
+CHUNK_SIZE = 1024 * 1024
+# Default bound of the decompressed sections kept by each SectionHeader.
+CACHE_SIZE = 64 * 1024 * 1024
+
+class CompressionError(Exception):
+    pass
+
+def iter_decompress(data, ch_type, chunk_size=CHUNK_SIZE):
+    # Yields the decompressed bytes of data in chunks of at most
+    # chunk_size, so only one chunk is held in memory at a time.
+    if ch_type == ELFCOMPRESS_ZLIB:
+        yield from _iter_zlib(data, chunk_size)
+    elif ch_type == ELFCOMPRESS_ZSTD:
+        yield from _iter_zstd(data, chunk_size)
+    else:
+        raise CompressionError("unknown compression type %d" % ch_type)
+
+def _iter_zlib(data, chunk_size):
+    d = zlib.decompressobj()
+    try:
+        chunk = d.decompress(data, chunk_size)
+        while chunk:
+            yield chunk
+            chunk = d.decompress(d.unconsumed_tail, chunk_size)
+    except zlib.error as e:
+        raise CompressionError("zlib: %s" % e)
+    # A cut off stream decompresses without an error up to the cut.
+    if not d.eof:
+        raise CompressionError("zlib: truncated stream")
+
+def _import_zstd() -> tuple:
+    # (compression.zstd, zstandard), either of them None when missing.
+    # Only imported once a zstd section is actually decompressed.
+    try:
+        from compression import zstd
+    except ImportError:
+        zstd = None
+    try:
+        import zstandard
+    except ImportError:
+        zstandard = None
+    return zstd, zstandard
+
+def _iter_zstd(data, chunk_size):
+    # compression.zstd is in the standard library from Python 3.14; the
+    # zstandard package is used on older versions when it is installed.
+    _zstd, _zstandard = _import_zstd()
+    if _zstd is not None:
+        d = _zstd.ZstdDecompressor()
+        try:
+            chunk = d.decompress(data, chunk_size)
+            while chunk:
+                yield chunk
+                if d.eof:
+                    return
+                chunk = d.decompress(b"", chunk_size)
+        except _zstd.ZstdError as e:
+            raise CompressionError("zstd: %s" % e)
+        if not d.eof:
+            raise CompressionError("zstd: truncated stream")
+    elif _zstandard is not None:
+        try:
+            with _zstandard.ZstdDecompressor().stream_reader(data) as reader:
+                chunk = reader.read(chunk_size)
+                while chunk:
+                    yield chunk
+                    chunk = reader.read(chunk_size)
+        except _zstandard.ZstdError as e:
+            raise CompressionError("zstd: %s" % e)
+    else:
+        raise CompressionError("zstd compressed sections need Python 3.14 or the zstandard module")
+
+def iter_blocks(chunks, size):
+    # Regroups chunks into blocks of exactly size bytes (the last one may
+    # be shorter), e.g. so every hex dump line gets 16 bytes.
+    rest = b""
+    for chunk in chunks:
+        if rest:
+            chunk = rest + chunk
+        end = len(chunk) - len(chunk) % size
+        if end:
+            yield memoryview(chunk)[:end]
+        rest = bytes(chunk[end:])
+    if rest:
+        yield memoryview(rest)
+
+class DecompressedCache:
+    # Least recently used decompressed sections, bounded by their total
+    # size in bytes. A buffer larger than the bound is never kept.
+    def __init__(self, max_bytes) -> None:
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._buffers = OrderedDict()
+
+    def get(self, key):
+        buf = self._buffers.get(key)
+        if buf is not None:
+            self._buffers.move_to_end(key)
+        return buf
+
+    def put(self, key, buf) -> None:
+        if len(buf) > self.max_bytes:
+            return
+        old = self._buffers.pop(key, None)
+        if old is not None:
+            self.size -= len(old)
+        self._buffers[key] = buf
+        self.size += len(buf)
+        while self.size > self.max_bytes:
+            _, old = self._buffers.popitem(last=False)
+            self.size -= len(old)
+
+    def clear(self) -> None:
+        self._buffers.clear()
+        self.size = 0
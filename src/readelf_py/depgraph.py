@@ -0,0 +1,198 @@
+import glob
+import os
+import struct
+
+from .dynamicsection import DynamicSection
+from .elfheader import ELFHeader
+from .elfreader import ELFReader
+from .programheader import ProgramHeader
+
+class Library:
+    # What the dependency graph needs to know about one ELF file.
+    __slots__ = ("path", "elf_class", "elf_data", "machine", "soname", "needed", "rpath", "runpath")
+
+    def __init__(self, path, elf_class, elf_data, machine, soname, needed, rpath, runpath) -> None:
+        self.path = path
+        self.elf_class = elf_class
+        self.elf_data = elf_data
+        self.machine = machine
+        self.soname = soname
+        self.needed = needed
+        self.rpath = rpath
+        self.runpath = runpath
+
+    def compatible(self, other) -> bool:
+        return (self.elf_class, self.elf_data, self.machine) == (other.elf_class, other.elf_data, other.machine)
+
+class DependencyGraph:
+    # Resolves DT_NEEDED entries the way the glibc dynamic loader does:
+    # DT_RPATH of the object and its loaders (unless the object has
+    # DT_RUNPATH), then the extra library paths, then DT_RUNPATH, then the
+    # directories of /etc/ld.so.conf and the system defaults.
+    #
+    # Everything is memoised for the lifetime of the graph: each file is
+    # parsed once (keyed by device and inode, so symlinks share an entry),
+    # each directory is listed once, and each object's resolved
+    # dependencies are kept, so libraries shared by many graphs cost
+    # nothing after the first one.
+    def __init__(self, library_path=None, ld_so_conf="/etc/ld.so.conf") -> None:
+        self.library_path = list(library_path or [])
+        self.conf_paths = self._read_ld_so_conf(ld_so_conf, set()) if ld_so_conf else []
+        self._files = {}
+        self._paths = {}
+        self._dirs = {}
+        self._edges = {}
+
+    def load(self, path) -> Library:
+        # The Library for path, or None if it is not a readable ELF file.
+        if path in self._paths:
+            return self._paths[path]
+        try:
+            st = os.stat(path)
+        except OSError:
+            self._paths[path] = None
+            return None
+        key = (st.st_dev, st.st_ino)
+        if key not in self._files:
+            self._files[key] = self._parse(path)
+        self._paths[path] = self._files[key]
+        return self._files[key]
+
+    def _parse(self, path) -> Library:
+        # Only the ELF header, the program headers and PT_DYNAMIC are read.
+        try:
+            with open(path, "rb") as f:
+                elf = ELFReader(f)
+                try:
+                    eh = ELFHeader(elf)
+                    if not eh.is_elf():
+                        return None
+                    dyn = DynamicSection(elf, ProgramHeader(elf, eh), None, eh)
+                    return Library(path, eh.elf_class, eh.elf_data, eh.elf_machine, dyn.soname, dyn.needed, dyn.rpath, dyn.runpath)
+                finally:
+                    elf.close()
+        except (OSError, ValueError, struct.error):
+            return None
+
+    def dependencies(self, lib, loader_rpath=()) -> list:
+        # [(name, Library or None)] for each DT_NEEDED entry of lib.
+        # loader_rpath holds the expanded DT_RPATH directories of the
+        # objects that loaded lib.
+        return self._dependencies(lib, loader_rpath)[0]
+
+    def _dependencies(self, lib, loader_rpath) -> tuple:
+        # (edges, DT_RPATH chain handed down to the libraries lib loads)
+        key = (lib.path, loader_rpath)
+        result = self._edges.get(key)
+        if result is None:
+            origin = os.path.dirname(os.path.abspath(lib.path))
+            runpath = tuple(self._expand(d, origin, lib) for d in lib.runpath)
+            if runpath:
+                # DT_RUNPATH disables the object's own DT_RPATH, and the
+                # loaders' DT_RPATH for its own lookups.
+                rpath, chain = (), loader_rpath
+            else:
+                rpath = chain = tuple(self._expand(d, origin, lib) for d in lib.rpath) + loader_rpath
+            edges = [(name, self._resolve(name, lib, rpath, runpath)) for name in lib.needed]
+            result = self._edges[key] = (edges, chain)
+        return result
+
+    def closure(self, path) -> list:
+        # Every library path loads, directly or not, in the breadth-first
+        # order the loader maps them: [(name, Library or None)]. Each
+        # library appears once; names that cannot be found are listed too.
+        root = self.load(path)
+        if root is None:
+            return []
+        result = []
+        seen = {root.path}
+        missing = set()
+        queue = [(root, ())]
+        for lib, loader_rpath in queue:
+            edges, chain = self._dependencies(lib, loader_rpath)
+            for name, dep in edges:
+                if dep is None:
+                    if name not in missing:
+                        missing.add(name)
+                        result.append((name, None))
+                elif dep.path not in seen:
+                    seen.add(dep.path)
+                    result.append((name, dep))
+                    queue.append((dep, chain))
+        return result
+
+    def print_dependencies(self, path) -> None:
+        # ldd-style listing of the closure of path.
+        for name, dep in self.closure(path):
+            if dep is None:
+                print("\t%s => not found" % name)
+            else:
+                print("\t%s => %s" % (name, dep.path))
+
+    def export_dependencies(self, path) -> dict:
+        export = {}
+        lib = self.load(path)
+        export["Needed"] = lib.needed if lib is not None else []
+        export["Closure"] = {name: dep.path if dep is not None else None for name, dep in self.closure(path)}
+        return export
+
+    def _resolve(self, name, lib, rpath, runpath) -> Library:
+        if "/" in name:
+            dep = self.load(name)
+            return dep if dep is not None and dep.compatible(lib) else None
+        for dirs in (rpath, self.library_path, runpath, self.conf_paths, self._default_paths(lib)):
+            for d in dirs:
+                if name in self._listdir(d):
+                    dep = self.load(os.path.join(d, name))
+                    if dep is not None and dep.compatible(lib):
+                        return dep
+        return None
+
+    def _listdir(self, d) -> frozenset:
+        entries = self._dirs.get(d)
+        if entries is None:
+            try:
+                entries = frozenset(os.listdir(d))
+            except OSError:
+                entries = frozenset()
+            self._dirs[d] = entries
+        return entries
+
+    def _expand(self, d, origin, lib) -> str:
+        # Dynamic string tokens; $PLATFORM is left as is.
+        libdir = "lib64" if lib.elf_class == 2 else "lib"
+        for token, value in (("$ORIGIN", origin), ("${ORIGIN}", origin), ("$LIB", libdir), ("${LIB}", libdir)):
+            d = d.replace(token, value)
+        return d
+
+    def _default_paths(self, lib) -> tuple:
+        if lib.elf_class == 2:
+            return ("/lib64", "/usr/lib64", "/lib", "/usr/lib")
+        return ("/lib32", "/usr/lib32", "/lib", "/usr/lib")
+
+    def _read_ld_so_conf(self, path, seen) -> list:
+        # Directories listed in an ld.so.conf, following "include" lines.
+        # Files are compared by real path, so include cycles spelled
+        # differently ("conf.d/../ld.so.conf") still end.
+        real = os.path.realpath(path)
+        if real in seen:
+            return []
+        seen.add(real)
+        dirs = []
+        try:
+            with open(path) as f:
+                lines = f.read().splitlines()
+        except OSError:
+            return dirs
+        for line in lines:
+            line = line.split("#", 1)[0].strip()
+            if not line or line.startswith("hwcap "):
+                continue
+            if line.startswith("include "):
+                for pattern in line.split()[1:]:
+                    pattern = os.path.join(os.path.dirname(path), pattern)
+                    for conf in sorted(glob.glob(pattern)):
+                        dirs.extend(self._read_ld_so_conf(conf, seen))
+            else:
+                dirs.extend(d for d in line.replace(",", " ").replace(":", " ").split() if d)
+        return dirs
@@ -0,0 +1,206 @@
+from .elfheader import ELFHeader
+from .elfreader import open_reader
+from .programheader import ProgramHeader
+from .sectionheader import SectionHeader
+from .stringtable import StringTable
+
+PT_DYNAMIC = 0x2
+SHT_DYNAMIC = 0x6
+
+DT_NULL = 0
+DT_NEEDED = 1
+DT_STRTAB = 5
+DT_STRSZ = 10
+DT_SONAME = 14
+DT_RPATH = 15
+DT_FLAGS = 30
+DT_RUNPATH = 29
+DT_FLAGS_1 = 0x6ffffffb
+
+class DynamicSection:
+    _D_TAGS = {
+        0: "NULL", 1: "NEEDED", 2: "PLTRELSZ", 3: "PLTGOT", 4: "HASH", 5: "STRTAB",
+        6: "SYMTAB", 7: "RELA", 8: "RELASZ", 9: "RELAENT", 10: "STRSZ", 11: "SYMENT",
+        12: "INIT", 13: "FINI", 14: "SONAME", 15: "RPATH", 16: "SYMBOLIC", 17: "REL",
+        18: "RELSZ", 19: "RELENT", 20: "PLTREL", 21: "DEBUG", 22: "TEXTREL", 23: "JMPREL",
+        24: "BIND_NOW", 25: "INIT_ARRAY", 26: "FINI_ARRAY", 27: "INIT_ARRAYSZ", 28: "FINI_ARRAYSZ",
+        29: "RUNPATH", 30: "FLAGS", 32: "PREINIT_ARRAY", 33: "PREINIT_ARRAYSZ", 34: "SYMTAB_SHNDX",
+        35: "RELRSZ", 36: "RELR", 37: "RELRENT",
+        0x6ffffdf5: "GNU_PRELINKED", 0x6ffffdf6: "GNU_CONFLICTSZ", 0x6ffffdf7: "GNU_LIBLISTSZ",
+        0x6ffffdf8: "CHECKSUM", 0x6ffffdf9: "PLTPADSZ", 0x6ffffdfa: "MOVEENT", 0x6ffffdfb: "MOVESZ",
+        0x6ffffdfc: "FEATURE", 0x6ffffdfd: "POSFLAG_1", 0x6ffffdfe: "SYMINSZ", 0x6ffffdff: "SYMINENT",
+        0x6ffffef5: "GNU_HASH", 0x6ffffef6: "TLSDESC_PLT", 0x6ffffef7: "TLSDESC_GOT",
+        0x6ffffef8: "GNU_CONFLICT", 0x6ffffef9: "GNU_LIBLIST", 0x6ffffefa: "CONFIG", 0x6ffffefb: "DEPAUDIT",
+        0x6ffffefc: "AUDIT", 0x6ffffefd: "PLTPAD", 0x6ffffefe: "MOVETAB", 0x6ffffeff: "SYMINFO",
+        0x6ffffff0: "VERSYM", 0x6ffffff9: "RELACOUNT", 0x6ffffffa: "RELCOUNT", 0x6ffffffb: "FLAGS_1",
+        0x6ffffffc: "VERDEF", 0x6ffffffd: "VERDEFNUM", 0x6ffffffe: "VERNEED", 0x6fffffff: "VERNEEDNUM",
+        0x7ffffffd: "AUXILIARY", 0x7fffffff: "FILTER",
+    }
+
+    # Tags whose value is a size in bytes, and tags whose value is a count.
+    _D_SIZES = {2, 8, 9, 10, 11, 18, 19, 27, 28, 33, 35, 37, 0x6ffffdf6, 0x6ffffdf7, 0x6ffffdf9, 0x6ffffdfa, 0x6ffffdfb, 0x6ffffdfe, 0x6ffffdff}
+    _D_COUNTS = {0x6ffffff9, 0x6ffffffa, 0x6ffffffd, 0x6fffffff}
+
+    _DF_FLAGS = {
+        0x1: "ORIGIN", 0x2: "SYMBOLIC", 0x4: "TEXTREL", 0x8: "BIND_NOW", 0x10: "STATIC_TLS",
+    }
+
+    _DF_1_FLAGS = {
+        0x1: "NOW", 0x2: "GLOBAL", 0x4: "GROUP", 0x8: "NODELETE", 0x10: "LOADFLTR",
+        0x20: "INITFIRST", 0x40: "NOOPEN", 0x80: "ORIGIN", 0x100: "DIRECT", 0x200: "TRANS",
+        0x400: "INTERPOSE", 0x800: "NODEFLIB", 0x1000: "NODUMP", 0x2000: "CONFALT",
+        0x4000: "ENDFILTEE", 0x8000: "DISPRELDNE", 0x10000: "DISPRELPND", 0x20000: "NODIRECT",
+        0x40000: "IGNMULDEF", 0x80000: "NOKSYMS", 0x100000: "NOHDR", 0x200000: "EDITED",
+        0x400000: "NORELOC", 0x800000: "SYMINTPOSE", 0x1000000: "GLOBAUDIT", 0x2000000: "SINGLETON",
+        0x4000000: "STUB", 0x8000000: "PIE",
+    }
+
+    # Tags whose value is an offset into the dynamic string table.
+    _D_STRINGS = {DT_NEEDED, DT_SONAME, DT_RPATH, DT_RUNPATH, 0x7ffffffd, 0x7fffffff, 0x6ffffefa, 0x6ffffefb, 0x6ffffefc}
+
+    def __init__(self, elf, programHeader=None, sectionHeader=None, elfHeader=None) -> None:
+        # The table is found through PT_DYNAMIC, so stripped section headers
+        # do not matter; the section headers are only read as a fallback.
+        self.elf = open_reader(elf)
+        self.elfHeader = elfHeader if elfHeader is not None else ELFHeader(self.elf)
+        self.programHeader = programHeader if programHeader is not None else ProgramHeader(self.elf, self.elfHeader)
+        self.d_offset = None
+        self.entries = []
+        self.strings = {}
+
+        size = None
+        for ph in self.programHeader.p_headers:
+            if ph["p_type"] == PT_DYNAMIC:
+                self.d_offset, size = ph["p_offset"], ph["p_filesz"]
+                break
+        dynstr = None
+        if self.d_offset is None or sectionHeader is not None:
+            sectionHeader = sectionHeader if sectionHeader is not None else SectionHeader(self.elf, self.elfHeader)
+            for sh in sectionHeader.s_headers:
+                if sh["sh_type"] == SHT_DYNAMIC:
+                    if self.d_offset is None:
+                        self.d_offset, size = sh["sh_offset"], sh["sh_size"]
+                    if sh["sh_link"] < len(sectionHeader.s_headers):
+                        dynstr = sectionHeader.s_headers[sh["sh_link"]]
+                    break
+        if self.d_offset is None:
+            return
+
+        structs = self.elfHeader.structs
+        count = min(size, max(self.elf.size - self.d_offset, 0)) // structs.dyn.size
+        cols = structs.unpack_columns(self.elf.read(self.d_offset, count * structs.dyn.size), count, structs.dyn.size, structs.dyn_columns)
+        for tag, val in zip(cols["d_tag"], cols["d_val"]):
+            self.entries.append((tag, val))
+            if tag == DT_NULL:
+                break
+
+        # String values are decoded once here.
+        strtab = self._string_table(dynstr)
+        if strtab is not None:
+            for i, (tag, val) in enumerate(self.entries):
+                if tag in self._D_STRINGS:
+                    self.strings[i] = strtab.get(val)
+
+    def _string_table(self, dynstr) -> StringTable:
+        # DT_STRTAB is a virtual address; map it to the file through the
+        # LOAD segments. Relocatable files fall back to the sh_link section.
+        values = dict(self.entries)
+        offset = None
+        if DT_STRTAB in values:
+            offset = self.programHeader.address_to_offset(values[DT_STRTAB])
+        if offset is not None:
+            return StringTable(self.elf, offset, values.get(DT_STRSZ, self.elf.size - offset))
+        if dynstr is not None:
+            return StringTable(self.elf, dynstr["sh_offset"], dynstr["sh_size"])
+        return None
+
+    def _values(self, tag) -> list:
+        return [self.strings.get(i, "") for i, (t, _) in enumerate(self.entries) if t == tag]
+
+    @property
+    def needed(self) -> list:
+        return self._values(DT_NEEDED)
+
+    @property
+    def soname(self) -> str:
+        values = self._values(DT_SONAME)
+        return values[0] if values else None
+
+    @property
+    def rpath(self) -> list:
+        # Search directories, in order, with the ':' separators split out.
+        return [d for v in self._values(DT_RPATH) for d in v.split(":") if d]
+
+    @property
+    def runpath(self) -> list:
+        return [d for v in self._values(DT_RUNPATH) for d in v.split(":") if d]
+
+    @property
+    def flags(self) -> int:
+        return dict(self.entries).get(DT_FLAGS, 0)
+
+    @property
+    def flags_1(self) -> int:
+        return dict(self.entries).get(DT_FLAGS_1, 0)
+
+    def print_dynamic_section(self) -> None:
+        if not self.entries:
+            print("")
+            print("There is no dynamic section in this file.")
+            return
+        wide = self.elfHeader.elf_class != 1
+        print("")
+        print("Dynamic section at offset 0x%x contains %d entries:" % (self.d_offset, len(self.entries)))
+        print("  Tag        Type                         Name/Value")
+        for tmp in self.iter_dynamic_section():
+            tag = ("0x%016x" if wide else "0x%08x") % tmp["Tag"]
+            print(" %s %-*s %s" % (tag, 20 if wide else 28, "(%s)" % tmp["Type"], tmp["Name/Value"]))
+
+    def export_dynamic_section(self) -> dict:
+        export = {}
+        export["Dynamic Section"] = list(self.iter_dynamic_section())
+        return export
+
+    def iter_dynamic_section(self):
+        for i, (tag, val) in enumerate(self.entries):
+            tmp = {}
+            tmp["Tag"] = tag
+            tmp["Type"] = self._get_dynamic_type(tag)
+            tmp["Value"] = val
+            tmp["Name/Value"] = self._get_dynamic_value(i, tag, val)
+            yield tmp
+
+    def _get_dynamic_type(self, x) -> str:
+        if x in self._D_TAGS:
+            return self._D_TAGS[x]
+        return "<unknown>: %x" % x
+
+    def _get_dynamic_value(self, i, tag, val) -> str:
+        if tag == DT_NEEDED:
+            return "Shared library: [%s]" % self.strings.get(i, "")
+        elif tag == DT_SONAME:
+            return "Library soname: [%s]" % self.strings.get(i, "")
+        elif tag == DT_RPATH:
+            return "Library rpath: [%s]" % self.strings.get(i, "")
+        elif tag == DT_RUNPATH:
+            return "Library runpath: [%s]" % self.strings.get(i, "")
+        elif tag == DT_FLAGS:
+            return self._get_flag_names(val, self._DF_FLAGS)
+        elif tag == DT_FLAGS_1:
+            return "Flags: " + self._get_flag_names(val, self._DF_1_FLAGS)
+        elif tag == 20:
+            return self._get_dynamic_type(val)
+        elif tag in self._D_SIZES:
+            return "%d (bytes)" % val
+        elif tag in self._D_COUNTS:
+            return "%d" % val
+        elif i in self.strings:
+            return self.strings[i]
+        return "0x%x" % val
+
+    def _get_flag_names(self, val, names) -> str:
+        words = [name for bit, name in names.items() if val & bit]
+        rest = val & ~sum(names)
+        if rest:
+            words.append("0x%x" % rest)
+        return " ".join(words)
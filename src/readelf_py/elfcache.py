@@ -0,0 +1,333 @@
+import os
+import stat
+import struct
+import sys
+from array import array
+
+from . import __version__
+from .elffile import ELFFile
+from .elfreader import open_reader
+from .programheader import ProgramHeader
+from .sectionheader import SectionHeader
+
+# Entry layout: _HEADER (magic, format version, host byte order, number
+# of columns), then per column _COLUMN (name length, typecode, item
+# count), the UTF-8 name and count items in host byte order. Column "s"
+# holds a byte string of count bytes. Names are "ph/<field>",
+# "sh/<field>", "str/<index>/offsets" + "str/<index>/names" (the names
+# decoded from string table <index>, NUL-separated) and
+# "sym/<table>/<field>".
+_MAGIC = b"RPYC"
+_HEADER = struct.Struct("<4sHBxI")
+_COLUMN = struct.Struct("<HcxQ")
+_TYPECODES = frozenset("BHIQiq")
+_BYTEORDER = 0 if sys.byteorder == "little" else 1
+
+class ELFCache:
+    # On-disk cache of parsed ELFFile contexts, keyed by a hash of the
+    # file contents and the tool version. The least recently used entries
+    # are evicted once the cache directory grows beyond max_bytes.
+    #
+    # The directory is scanned on the first store, and again only once
+    # that size plus what this instance has written since passes
+    # max_bytes; eviction then goes down to _LOW_WATER of it, so many
+    # stores share a scan. Entries that other processes write are only
+    # counted at the next scan.
+    #
+    # Hashing reads the whole file, so it is done once per version of a
+    # file: the key is kept in a small alias entry named after the
+    # file's identity (device, inode, size, modification and change
+    # times), which later runs read instead. Rewriting the file changes
+    # its change time, and with it the alias.
+    #
+    # An entry holds the parsed tables as raw column arrays (see
+    # encode_entry), never pickles: the directory may be shared, and
+    # loading an entry must not be able to run code.
+    #
+    # hashlib, tempfile and zlib are imported by the methods that use
+    # them, so runs without a cache never load them.
+    _FORMAT = 12
+    _SUFFIX = ".elfcache"
+    _ALIAS_SUFFIX = ".elfkey"
+    DEFAULT_SIZE = 512 * 1024 * 1024
+    _LOW_WATER = 0.75
+
+    def __init__(self, directory, max_bytes=DEFAULT_SIZE) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        # Estimated size of the directory; None until scanned.
+        self._size = None
+        try:
+            os.makedirs(directory, exist_ok=True)
+        except OSError:
+            # Every load misses and every store fails quietly.
+            pass
+
+    def open(self, elf, rebuild=False) -> ELFFile:
+        # Returns a restored context on a hit and a fresh one on a miss
+        # (or with rebuild). Nothing is parsed up front: when the context
+        # is closed, the entry is (re)written if the run parsed more than
+        # it held, so the entry grows with what later runs use. Besides
+        # the entry, a run costs one hash of the file the first time that
+        # version of it is seen (see key()).
+        elf = open_reader(elf)
+        key = self.key(elf)
+        elffile = None if rebuild else self.load(key, elf)
+        if elffile is None:
+            elffile = ELFFile(elf)
+            loaded = NOTHING_PARSED
+        else:
+            loaded = parsed_tables(elffile)
+
+        def store(elffile):
+            if parsed_tables(elffile) != loaded:
+                self.store(key, elffile)
+        elffile.on_close = store
+        return elffile
+
+    def key(self, elf) -> str:
+        alias = self._alias_path(elf)
+        if alias is not None:
+            try:
+                with open(alias, "rb") as f:
+                    key = f.read().decode("ascii")
+                if len(key) == 40 and not key.strip("0123456789abcdef"):
+                    return key
+            except (OSError, UnicodeDecodeError):
+                pass
+        key = self.content_key(elf)
+        if alias is not None:
+            self._write(alias, key.encode("ascii"))
+        return key
+
+    def content_key(self, elf) -> str:
+        import hashlib
+        h = hashlib.blake2b(digest_size=20)
+        h.update(("readelf-py %s %d\0" % (__version__, self._FORMAT)).encode())
+        if elf.data is not None:
+            h.update(elf.data)
+        else:
+            offset = 0
+            while True:
+                chunk = elf.read(offset, 1 << 20)
+                if not chunk:
+                    break
+                h.update(chunk)
+                offset += len(chunk)
+        return h.hexdigest()
+
+    def _alias_path(self, elf) -> str:
+        # None unless elf is a regular file that can be identified.
+        import hashlib
+        try:
+            st = os.fstat(elf.elf.fileno())
+        except (AttributeError, OSError, ValueError):
+            return None
+        if not stat.S_ISREG(st.st_mode):
+            return None
+        identity = "readelf-py %s %d\0%d %d %d %d %d" % (__version__, self._FORMAT, st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns, st.st_ctime_ns)
+        return os.path.join(self.directory, hashlib.blake2b(identity.encode(), digest_size=20).hexdigest() + self._ALIAS_SUFFIX)
+
+    def load(self, key, elf) -> ELFFile:
+        import zlib
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        try:
+            elffile = restore_entry(decode_entry(zlib.decompress(data)), elf)
+        except Exception:
+            # A truncated, foreign or stale entry is just a miss.
+            self._remove(path)
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return elffile
+
+    def store(self, key, elffile) -> None:
+        # A cache that cannot be written (read-only, full, no permission)
+        # only costs the entry; the analysis goes on.
+        import zlib
+        self._write(self._path(key), zlib.compress(encode_entry(elffile), 1))
+
+    def _write(self, path, data) -> bool:
+        # Writes path atomically; False if it could not be written.
+        import tempfile
+        tmp = None
+        try:
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except OSError:
+            if tmp is not None:
+                self._remove(tmp)
+            return False
+        if self._size is not None:
+            self._size += len(data)
+        if self._size is None or self._size > self.max_bytes:
+            try:
+                self._evict()
+            except OSError:
+                pass
+        return True
+
+    def _evict(self) -> None:
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not entry.name.endswith((self._SUFFIX, self._ALIAS_SUFFIX)):
+                    continue
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, entry.path))
+                total += st.st_size
+        if total > self.max_bytes:
+            entries.sort()
+            for mtime, size, path in entries:
+                if total <= self.max_bytes * self._LOW_WATER:
+                    break
+                self._remove(path)
+                total -= size
+        self._size = total
+
+    def _remove(self, path) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _path(self, key) -> str:
+        return os.path.join(self.directory, key + self._SUFFIX)
+
+# One ELFCache per (directory, max_bytes) and process, so that a batch
+# run keeps one size estimate.
+_caches = {}
+
+def cache_from_args(args) -> ELFCache:
+    # --cache-dir (or READELF_PY_CACHE_DIR) enables the cache; --no-cache
+    # bypasses it.
+    directory = args.cache_dir or os.environ.get("READELF_PY_CACHE_DIR")
+    if args.no_cache or not directory:
+        return None
+    max_bytes = ELFCache.DEFAULT_SIZE if args.cache_size is None else args.cache_size * 1024 * 1024
+    cache = _caches.get((directory, max_bytes))
+    if cache is None:
+        cache = _caches[(directory, max_bytes)] = ELFCache(directory, max_bytes)
+    return cache
+
+def open_elffile(elf, args) -> ELFFile:
+    cache = cache_from_args(args)
+    if cache is None:
+        return ELFFile(elf)
+    return cache.open(elf, args.rebuild_cache)
+
+NOTHING_PARSED = (False, None, ())
+
+def parsed_tables(elffile) -> tuple:
+    # What an entry of elffile would hold: the program headers, the
+    # section headers with the number of names decoded, the symbol tables.
+    parsed = elffile.__dict__
+    names = None
+    if "sectionHeader" in parsed:
+        names = sum(len(cache) for cache in elffile.sectionHeader.string_caches().values())
+    tables = ()
+    if "symbolTable" in parsed:
+        tables = tuple(sorted(elffile.symbolTable.decoded_tables()))
+    return "programHeader" in parsed, names, tables
+
+def encode_entry(elffile) -> bytes:
+    # The tables elffile has parsed so far as an entry.
+    from .symboltable import Symbol
+    columns = []
+    parsed = elffile.__dict__
+    if "programHeader" in parsed:
+        rows = elffile.programHeader.p_headers
+        for field in elffile.elfHeader.structs.phdr_fields:
+            columns.append(("ph/" + field, array("Q", [ph[field] for ph in rows])))
+    if "sectionHeader" in parsed:
+        sections = elffile.sectionHeader
+        for field in elffile.elfHeader.structs.shdr_fields:
+            columns.append(("sh/" + field, array("Q", [sh[field] for sh in sections.s_headers])))
+        for index, cache in sections.string_caches().items():
+            columns.append(("str/%d/offsets" % index, array("Q", cache)))
+            columns.append(("str/%d/names" % index, "\0".join(cache.values()).encode("utf-8")))
+    if "symbolTable" in parsed:
+        for k, table in elffile.symbolTable.decoded_tables().items():
+            for field in Symbol.__slots__:
+                columns.append(("sym/%s/%s" % (k, field), getattr(table, field)))
+    parts = [_HEADER.pack(_MAGIC, ELFCache._FORMAT, _BYTEORDER, len(columns))]
+    for name, column in columns:
+        name = name.encode("utf-8")
+        if isinstance(column, bytes):
+            parts.append(_COLUMN.pack(len(name), b"s", len(column)))
+            parts += [name, column]
+        else:
+            parts.append(_COLUMN.pack(len(name), column.typecode.encode(), len(column)))
+            parts += [name, column.tobytes()]
+    return b"".join(parts)
+
+def decode_entry(data) -> dict:
+    # name -> array (or bytes) of an entry. Raises ValueError unless
+    # the entry is well formed, of this format and this byte order.
+    magic, version, byteorder, count = _HEADER.unpack_from(data)
+    if magic != _MAGIC or version != ELFCache._FORMAT or byteorder != _BYTEORDER:
+        raise ValueError("not a cache entry of this format")
+    columns = {}
+    offset = _HEADER.size
+    for _ in range(count):
+        name_size, typecode, items = _COLUMN.unpack_from(data, offset)
+        offset += _COLUMN.size
+        name = data[offset:offset + name_size].decode("utf-8")
+        offset += name_size
+        typecode = typecode.decode("ascii")
+        if typecode == "s":
+            column = data[offset:offset + items]
+        elif typecode in _TYPECODES:
+            column = array(typecode)
+            column.frombytes(data[offset:offset + items * column.itemsize])
+        else:
+            raise ValueError("bad column type %r" % typecode)
+        if len(column) != items:
+            raise ValueError("column %s truncated" % name)
+        offset += len(column) * (1 if typecode == "s" else column.itemsize)
+        columns[name] = column
+    return columns
+
+def restore_entry(columns, elf) -> ELFFile:
+    # An ELFFile over elf with the tables of a decoded entry in place;
+    # anything the entry lacks is parsed from the file on first use.
+    from .symboltable import Symbol, SymbolColumns, SymbolTable
+    elffile = ELFFile(elf)
+    structs = elffile.elfHeader.structs
+    if "ph/p_type" in columns:
+        fields = [columns["ph/" + field] for field in structs.phdr_fields]
+        rows = [dict(zip(structs.phdr_fields, values)) for values in zip(*fields)]
+        elffile.__dict__["programHeader"] = ProgramHeader(elffile.elf, elffile.elfHeader, rows)
+    if "sh/sh_name" in columns:
+        fields = [columns["sh/" + field] for field in structs.shdr_fields]
+        rows = [dict(zip(structs.shdr_fields, values)) for values in zip(*fields)]
+        caches = {}
+        for name, column in columns.items():
+            if name.startswith("str/") and name.endswith("/offsets"):
+                index = name[4:-8]
+                names = columns["str/%s/names" % index].decode("utf-8").split("\0") if len(column) else []
+                if len(names) != len(column):
+                    raise ValueError("string table %s names do not match" % index)
+                caches[int(index)] = dict(zip(column, names))
+        elffile.__dict__["sectionHeader"] = SectionHeader(elffile.elf, elffile.elfHeader, rows, caches)
+    tables = {}
+    for name in columns:
+        if name.startswith("sym/") and name.endswith("/st_name"):
+            k = name[4:-8]
+            tables[k] = SymbolColumns({field: columns["sym/%s/%s" % (k, field)] for field in Symbol.__slots__})
+    if tables:
+        elffile.__dict__["symbolTable"] = SymbolTable(elffile.elf, elffile.sectionHeader, elffile.elfHeader, columns=tables)
+    return elffile
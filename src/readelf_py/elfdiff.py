@@ -0,0 +1,173 @@
+from .elffile import ELFFile
+
+SHT_SYMTAB = 0x2
+SHT_DYNSYM = 0xb
+SHN_UNDEF = 0
+STB_GLOBAL = 1
+STB_WEAK = 2
+STB_GNU_UNIQUE = 10
+STV_DEFAULT = 0
+STV_PROTECTED = 3
+
+# Bytes compared at a time when checking two tables for identity.
+_COMPARE_CHUNK = 1024 * 1024
+
+def same_bytes(a, offset_a, b, offset_b, size) -> bool:
+    # True if size bytes at offset_a of reader a equal those at offset_b
+    # of reader b. Compared a chunk at a time, so nothing is decoded and
+    # at most two chunks are copied out of the mappings.
+    for start in range(0, size, _COMPARE_CHUNK):
+        n = min(_COMPARE_CHUNK, size - start)
+        if bytes(a.read(offset_a + start, n)) != bytes(b.read(offset_b + start, n)):
+            return False
+    return True
+
+class ELFDiff:
+    # Sections, segments and exported symbols added, removed or resized
+    # between two files. Sections are matched by name, segments by type
+    # and position among the segments of that type, symbols by name,
+    # each through a dict, so the cost is linear in the table sizes.
+    #
+    # Tables whose raw bytes (and string tables) are identical in both
+    # files are reported as such without being decoded: the section
+    # names, and the symbol tables and their names, are only read when
+    # something differs.
+    def __init__(self, a, b) -> None:
+        self.a = a if isinstance(a, ELFFile) else ELFFile(a)
+        self.b = b if isinstance(b, ELFFile) else ELFFile(b)
+        self.sections = self._diff_sections()
+        self.segments = self._diff_segments()
+        self.symbols = self._diff_symbols()
+
+    def __bool__(self) -> bool:
+        return any(d is not None and any(d.values()) for d in (self.sections, self.segments, self.symbols))
+
+    def _same_table(self, offset_a, size_a, offset_b, size_b) -> bool:
+        return size_a == size_b and same_bytes(self.a.elf, offset_a, self.b.elf, offset_b, size_a)
+
+    def _diff(self, old, new) -> dict:
+        # old and new map a key to a size.
+        tmp = {}
+        tmp["Added"] = [(k, new[k]) for k in new if k not in old]
+        tmp["Removed"] = [(k, old[k]) for k in old if k not in new]
+        tmp["Resized"] = [(k, old[k], new[k]) for k in old if k in new and old[k] != new[k]]
+        return tmp
+
+    def _diff_sections(self) -> dict:
+        # None when the header tables and .shstrtab are byte-identical.
+        eh_a, eh_b = self.a.elfHeader, self.b.elfHeader
+        sh_a, sh_b = self.a.sectionHeader, self.b.sectionHeader
+        if (eh_a.elf_shentsize == eh_b.elf_shentsize and self._same_table(eh_a.elf_shoff, eh_a.elf_shnum * eh_a.elf_shentsize, eh_b.elf_shoff, eh_b.elf_shnum * eh_b.elf_shentsize)
+                and self._same_string_table(sh_a, eh_a.elf_shstrndx, sh_b, eh_b.elf_shstrndx)):
+            return None
+        return self._diff(self._section_sizes(sh_a), self._section_sizes(sh_b))
+
+    def _same_string_table(self, sh_a, index_a, sh_b, index_b) -> bool:
+        if index_a >= len(sh_a.s_headers) or index_b >= len(sh_b.s_headers):
+            return index_a >= len(sh_a.s_headers) and index_b >= len(sh_b.s_headers)
+        s_a, s_b = sh_a.s_headers[index_a], sh_b.s_headers[index_b]
+        return self._same_table(s_a["sh_offset"], s_a["sh_size"], s_b["sh_offset"], s_b["sh_size"])
+
+    def _section_sizes(self, sh) -> dict:
+        # Repeated names (as in relocatable files) get a "#n" suffix
+        # from their second occurrence on.
+        sizes = {}
+        for s in sh.s_headers[1:]:
+            name = sh.get_section_name(s["sh_name"])
+            key, n = name, 1
+            while key in sizes:
+                n += 1
+                key = "%s#%d" % (name, n)
+            sizes[key] = s["sh_size"]
+        return sizes
+
+    def _diff_segments(self) -> dict:
+        eh_a, eh_b = self.a.elfHeader, self.b.elfHeader
+        if eh_a.elf_phentsize == eh_b.elf_phentsize and self._same_table(eh_a.elf_phoff, eh_a.elf_phnum * eh_a.elf_phentsize, eh_b.elf_phoff, eh_b.elf_phnum * eh_b.elf_phentsize):
+            return None
+        return self._diff(self._segment_sizes(self.a.programHeader), self._segment_sizes(self.b.programHeader))
+
+    def _segment_sizes(self, ph) -> dict:
+        # "LOAD[1]" is the second LOAD segment; the size is (filesz, memsz).
+        sizes = {}
+        counts = {}
+        for p in ph.p_headers:
+            name = ph._P_TYPES.get(p["p_type"], "0x%x" % p["p_type"])
+            n = counts.get(name, 0)
+            counts[name] = n + 1
+            sizes["%s[%d]" % (name, n)] = (p["p_filesz"], p["p_memsz"])
+        return sizes
+
+    def _exported_table(self, f) -> dict:
+        # Exported symbols come from .dynsym, or .symtab when there is
+        # none (relocatable files and static executables). Found by type,
+        # so no section name is decoded.
+        for sh_type in (SHT_DYNSYM, SHT_SYMTAB):
+            for sh in f.sectionHeader.s_headers:
+                if sh["sh_type"] == sh_type and sh["sh_entsize"]:
+                    return sh
+        return None
+
+    def _diff_symbols(self) -> dict:
+        v_a, v_b = self._exported_table(self.a), self._exported_table(self.b)
+        if v_a is not None and v_b is not None and v_a["sh_type"] == v_b["sh_type"]:
+            if (self._same_table(v_a["sh_offset"], v_a["sh_size"], v_b["sh_offset"], v_b["sh_size"])
+                    and self._same_string_table(self.a.sectionHeader, v_a["sh_link"], self.b.sectionHeader, v_b["sh_link"])):
+                return None
+        return self._diff(self._symbol_sizes(self.a, v_a), self._symbol_sizes(self.b, v_b))
+
+    def _symbol_sizes(self, f, v) -> dict:
+        # Defined global, weak and unique symbols with default or
+        # protected visibility. Only their names are decoded.
+        sizes = {}
+        if v is None:
+            return sizes
+        from .symboltable import parse_symbol_table
+        table = parse_symbol_table(f.elf, f.elfHeader.structs, v)
+        strtab = f.sectionHeader.get_string_table(v["sh_link"])
+        for st_name, st_size, st_info, st_other, st_shndx in zip(table.st_name, table.st_size, table.st_info, table.st_other, table.st_shndx):
+            if st_shndx == SHN_UNDEF or st_info >> 4 not in (STB_GLOBAL, STB_WEAK, STB_GNU_UNIQUE) or st_other & 0x3 not in (STV_DEFAULT, STV_PROTECTED):
+                continue
+            name = strtab.get(st_name)
+            if name and name not in sizes:
+                sizes[name] = st_size
+        return sizes
+
+    def print_diff(self) -> None:
+        self._print_part("Sections", self.sections, "0x%x")
+        self._print_part("Segments", self.segments, "filesz 0x%x memsz 0x%x")
+        self._print_part("Symbols", self.symbols, "%d")
+
+    def _print_part(self, title, diff, fmt) -> None:
+        if diff is None:
+            print("%s: identical" % title)
+            return
+        if not any(diff.values()):
+            print("%s: no differences" % title)
+            return
+        print("%s:" % title)
+        for key, size in diff["Added"]:
+            print(("  + %s (" + fmt + ")") % ((key,) + self._tuple(size)))
+        for key, size in diff["Removed"]:
+            print(("  - %s (" + fmt + ")") % ((key,) + self._tuple(size)))
+        for key, old, new in diff["Resized"]:
+            print(("  ~ %s " + fmt + " -> " + fmt) % ((key,) + self._tuple(old) + self._tuple(new)))
+
+    def _tuple(self, size) -> tuple:
+        return size if isinstance(size, tuple) else (size,)
+
+    def export_diff(self) -> dict:
+        export = {}
+        for title, diff in (("Sections", self.sections), ("Segments", self.segments), ("Symbols", self.symbols)):
+            if diff is None:
+                export[title] = "identical"
+                continue
+            export[title] = {}
+            export[title]["Added"] = [{"Name": key, "Size": size} for key, size in diff["Added"]]
+            export[title]["Removed"] = [{"Name": key, "Size": size} for key, size in diff["Removed"]]
+            export[title]["Resized"] = [{"Name": key, "Old size": old, "New size": new} for key, old, new in diff["Resized"]]
+        return export
+
+    def close(self) -> None:
+        self.a.close()
+        self.b.close()
@@ -0,0 +1,155 @@
+from functools import cached_property
+
+from .elfheader import ELFHeader
+from .elfreader import open_reader
+from .programheader import ProgramHeader
+from .sectionheader import SectionHeader
+
+class ELFFile:
+    # Parse context shared by every view and export of one file.
+    # The ELF header is read once up front; the tables are parsed on
+    # first access and then handed out to everything that needs them.
+    # All of them share one ELFReader, so the file is mapped only once.
+    # The modules behind the symbol, dynamic, relocation and note views
+    # are imported on first access too.
+    #
+    # With owns_file, close() also closes the file object (open_elf()
+    # passes it for files it opened itself). on_close, if set, is called
+    # with the context first (elfcache stores what the run parsed).
+    def __init__(self, elf, owns_file=False) -> None:
+        self.elf = open_reader(elf)
+        self._file = elf if owns_file else None
+        self.on_close = None
+        self.elfHeader = ELFHeader(self.elf)
+
+    def __enter__(self) -> "ELFFile":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @cached_property
+    def programHeader(self) -> ProgramHeader:
+        return ProgramHeader(self.elf, self.elfHeader)
+
+    @cached_property
+    def sectionHeader(self) -> SectionHeader:
+        return SectionHeader(self.elf, self.elfHeader)
+
+    @cached_property
+    def symbolTable(self) -> "SymbolTable":
+        from .symboltable import SymbolTable
+        return SymbolTable(self.elf, self.sectionHeader, self.elfHeader)
+
+    @cached_property
+    def dynamicSection(self) -> "DynamicSection":
+        from .dynamicsection import DynamicSection
+        return DynamicSection(self.elf, self.programHeader, None, self.elfHeader)
+
+    @cached_property
+    def notes(self) -> "Notes":
+        from .notes import Notes
+        return Notes(self.elf, self.programHeader, self.sectionHeader, self.elfHeader)
+
+    @cached_property
+    def relocations(self) -> "Relocations":
+        from .relocations import Relocations
+        return Relocations(self.elf, self.sectionHeader, self.symbolTable, self.elfHeader)
+
+    def section_data(self, name, decompress=False) -> memoryview:
+        # Zero-copy view of the contents of the section called name (or
+        # with index name), or None if there is no such section. With
+        # decompress, compressed sections are returned inflated.
+        index = self.sectionHeader.find_section(name)
+        if index is None:
+            return None
+        return self.sectionHeader.get_section_data(index, decompress)
+
+    def build_id(self) -> str:
+        # Hex GNU build ID, or None.
+        return self.notes.build_id()
+
+    def section_for_address(self, addr) -> int:
+        # Index of the allocated section containing addr, or None.
+        return self.sectionHeader.section_for_address(addr)
+
+    def section_for_offset(self, offset) -> int:
+        return self.sectionHeader.section_for_offset(offset)
+
+    def segments_for_address(self, addr) -> list:
+        # Indices of every segment whose memory image contains addr.
+        return self.programHeader.segments_for_address(addr)
+
+    def sections_in_segment(self, i) -> list:
+        return self.programHeader.sections_in_segment(i, self.sectionHeader)
+
+    def lookup_address(self, addr) -> tuple:
+        # (symbol name, offset into it, symbol index) for the function or
+        # object containing addr, or None.
+        return self.symbolTable.address_index().lookup(addr)
+
+    def lookup_addresses(self, addrs) -> list:
+        return self.symbolTable.address_index().lookup_many(addrs)
+
+    def find_symbol(self, name, table=".dynsym") -> int:
+        # Index of the symbol called name that table defines (imports
+        # never match), or None.
+        return self.symbolTable.find_symbol(name, table)
+
+    def load_all(self) -> None:
+        # Parses every table and resolves every name up front.
+        self.programHeader
+        for sh in self.sectionHeader.s_headers:
+            self.sectionHeader.get_section_name(sh["sh_name"])
+        self.symbolTable.resolve_names()
+
+    def export(self) -> dict:
+        export = {}
+        export = export | self.elfHeader.export_elf_header()
+        export = export | self.programHeader.export_program_header()
+        export = export | self.sectionHeader.export_section_header()
+        export = export | self.symbolTable.export_symbol_table()
+        export = export | self.dynamicSection.export_dynamic_section()
+        export = export | self.relocations.export_relocations()
+        export = export | self.notes.export_notes()
+        return export
+
+    def iter_records(self):
+        # One flat record per header, segment, section, symbol, dynamic
+        # entry, relocation and note, with "Record" naming what it describes.
+        # Records are produced one at a time, so nothing is accumulated
+        # for the whole file.
+        yield {"Record": "ELF Header"} | self.elfHeader.export_elf_header()["ELF Header"]
+        for tmp in self.programHeader.iter_program_header():
+            yield {"Record": "Program Header"} | tmp
+        for tmp in self.sectionHeader.iter_section_header():
+            yield {"Record": "Section Header"} | tmp
+        for k in self.symbolTable.sym_sections:
+            for tmp in self.symbolTable.iter_symbol_table(k):
+                yield {"Record": "Symbol", "Table": k} | tmp
+        for tmp in self.dynamicSection.iter_dynamic_section():
+            yield {"Record": "Dynamic"} | tmp
+        for k in self.relocations.rel_sections:
+            for tmp in self.relocations.iter_relocations(k):
+                yield {"Record": "Relocation", "Table": k} | tmp
+        for i, (name, offset, _, _) in enumerate(self.notes.regions):
+            for tmp in self.notes.iter_notes(i):
+                yield {"Record": "Note", "Table": name if name is not None else "0x%x" % offset} | tmp
+
+    def export_json_lines(self, f, extra=None) -> None:
+        # extra is merged into every record (e.g. the file path in batch mode).
+        import json
+        encode = json.JSONEncoder().encode
+        for record in self.iter_records():
+            if extra:
+                record = extra | record
+            f.write(encode(record))
+            f.write("\n")
+
+    def close(self) -> None:
+        if self.on_close is not None:
+            on_close, self.on_close = self.on_close, None
+            on_close(self)
+        self.elf.close()
+        if self._file is not None:
+            self._file.close()
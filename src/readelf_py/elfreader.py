@@ -0,0 +1,134 @@
+import io
+import mmap
+import struct
+
+class ELFReader:
+    # Random access to the bytes of an ELF file (or of a bytes object).
+    # Regular files are memory-mapped and decoded in place with
+    # struct.unpack_from, so only the pages that are actually touched get
+    # faulted in. Streams that cannot be mapped fall back to seek()/read()
+    # (or, when they cannot seek either, are read into memory once).
+    # use_mmap=False forces the seek()/read() path, for callers that read
+    # a few small pieces of many files and want to skip the mapping.
+    #
+    # reads, seeks and bytes_read count the accesses made through the
+    # reader (on a mapped file a read is a slice and never seeks); see
+    # stats.Stats.
+    def __init__(self, elf, use_mmap=True) -> None:
+        self.elf = elf
+        self._data = None
+        self.buf = None
+        self.reads = 0
+        self.seeks = 0
+        self.bytes_read = 0
+        if isinstance(elf, (bytes, bytearray)):
+            # An image already in memory, e.g. an archive member.
+            self._data = elf
+        elif use_mmap:
+            self._data = self._map(elf)
+        if self._data is None and not is_seekable(elf):
+            self._data = elf.read()
+        if self._data is not None:
+            self.buf = memoryview(self._data)
+
+    def _map(self, elf) -> mmap.mmap:
+        try:
+            return mmap.mmap(elf.fileno(), 0, access=mmap.ACCESS_READ)
+        except (AttributeError, OSError, ValueError, io.UnsupportedOperation):
+            return None
+
+    @property
+    def data(self):
+        # The whole file as an mmap/bytes object, or None on the
+        # seek()/read() fallback path.
+        return self._data
+
+    @property
+    def size(self) -> int:
+        if self.buf is not None:
+            return len(self.buf)
+        self.seeks += 1
+        return self.elf.seek(0, io.SEEK_END)
+
+    def read(self, offset, size):
+        # Returns a zero-copy memoryview slice when the file is mapped.
+        self.reads += 1
+        if self.buf is not None:
+            data = self.buf[offset:offset + size]
+        else:
+            self.seeks += 1
+            self.elf.seek(offset)
+            data = self.elf.read(size)
+        self.bytes_read += len(data)
+        return data
+
+    def unpack_from(self, fmt, offset) -> tuple:
+        # fmt is either a format string or a precompiled struct.Struct.
+        if isinstance(fmt, str):
+            fmt = struct.Struct(fmt)
+        self.reads += 1
+        self.bytes_read += fmt.size
+        if self.buf is not None:
+            return fmt.unpack_from(self.buf, offset)
+        self.seeks += 1
+        self.elf.seek(offset)
+        return fmt.unpack(self.elf.read(fmt.size))
+
+    def iter_unpack(self, st, offset, count, entsize=None):
+        # Decodes a table of count records of layout st in one pass.
+        entsize = entsize or st.size
+        data = self.read(offset, count * entsize)
+        if entsize == st.size:
+            return st.iter_unpack(data)
+        return (st.unpack_from(data, i * entsize) for i in range(count))
+
+    def read_cstring(self, offset) -> bytes:
+        self.reads += 1
+        if self.buf is not None:
+            end = self._data.find(b'\x00', offset)
+            if end < 0:
+                return None
+            self.bytes_read += end + 1 - offset
+            return bytes(self.buf[offset:end])
+        self.seeks += 1
+        self.elf.seek(offset)
+        name = b''
+        while True:
+            chunk = self.elf.read(64)
+            self.bytes_read += len(chunk)
+            if not chunk:
+                return None
+            end_point = chunk.find(b'\x00')
+            if end_point >= 0:
+                return name + chunk[:end_point]
+            name += chunk
+
+    def close(self) -> None:
+        if self.buf is None:
+            return
+        try:
+            self.buf.release()
+            if isinstance(self._data, mmap.mmap):
+                self._data.close()
+        except BufferError:
+            # A caller still holds a slice of the mapping; it is unmapped
+            # once that view is garbage collected.
+            return
+        self.buf = None
+        self._data = None
+
+def open_reader(elf) -> ELFReader:
+    # Streams that cannot seek (pipes, archive members) are read front
+    # to back by a StreamReader instead of being slurped.
+    if isinstance(elf, ELFReader):
+        return elf
+    if not is_seekable(elf) and hasattr(elf, "read"):
+        from .streamreader import StreamReader
+        return StreamReader(elf)
+    return ELFReader(elf)
+
+def is_seekable(elf) -> bool:
+    try:
+        return elf.seekable()
+    except (AttributeError, ValueError):
+        return False
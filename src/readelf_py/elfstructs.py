@@ -0,0 +1,89 @@
+import struct
+import sys
+from array import array
+from functools import lru_cache
+
+class ELFStructs:
+    # Precompiled record layouts for one (class, byte order) combination.
+    # The *_fields tuples name the members of each record in file order.
+    def __init__(self, elf_class, byteorder) -> None:
+        self.elf_class = elf_class
+        self.byteorder = byteorder
+        # True when the file's byte order is not the host's.
+        self.swap = byteorder != ("<" if sys.byteorder == "little" else ">")
+        if elf_class == 1:
+            # 32-bit
+            self.ehdr = struct.Struct(byteorder + "HHIIIIIHHHHHH")
+            self.phdr = struct.Struct(byteorder + "IIIIIIII")
+            self.phdr_fields = ("p_type", "p_offset", "p_vaddr", "p_paddr", "p_filesz", "p_memsz", "p_flags", "p_align")
+            self.shdr = struct.Struct(byteorder + "IIIIIIIIII")
+            self.sym = struct.Struct(byteorder + "IIIBBH")
+            self.sym_fields = ("st_name", "st_value", "st_size", "st_info", "st_other", "st_shndx")
+            # (name, array typecode, offset in record[, width]) per column
+            self.sym_columns = (("st_name", "I", 0), ("st_value", "I", 4), ("st_size", "I", 8), ("st_info", "B", 12), ("st_other", "B", 13), ("st_shndx", "H", 14))
+            # r_info is ELF32_R_SYM (24 bits) << 8 | ELF32_R_TYPE (8 bits)
+            if byteorder == "<":
+                info = (("r_type", "B", 4), ("r_sym", "I", 5, 3))
+            else:
+                info = (("r_sym", "I", 4, 3), ("r_type", "B", 7))
+            self.rel = struct.Struct(byteorder + "II")
+            self.rel_columns = (("r_offset", "I", 0),) + info
+            self.rela = struct.Struct(byteorder + "IIi")
+            self.rela_columns = self.rel_columns + (("r_addend", "i", 8),)
+            self.dyn = struct.Struct(byteorder + "II")
+            self.dyn_columns = (("d_tag", "I", 0), ("d_val", "I", 4))
+            self.chdr = struct.Struct(byteorder + "III")
+            self.chdr_fields = ("ch_type", "ch_size", "ch_addralign")
+        else:
+            # 64-bit
+            self.ehdr = struct.Struct(byteorder + "HHIQQQIHHHHHH")
+            self.phdr = struct.Struct(byteorder + "IIQQQQQQ")
+            self.phdr_fields = ("p_type", "p_flags", "p_offset", "p_vaddr", "p_paddr", "p_filesz", "p_memsz", "p_align")
+            self.shdr = struct.Struct(byteorder + "IIQQQQIIQQ")
+            self.sym = struct.Struct(byteorder + "IBBHQQ")
+            self.sym_fields = ("st_name", "st_info", "st_other", "st_shndx", "st_value", "st_size")
+            self.sym_columns = (("st_name", "I", 0), ("st_info", "B", 4), ("st_other", "B", 5), ("st_shndx", "H", 6), ("st_value", "Q", 8), ("st_size", "Q", 16))
+            # r_info is ELF64_R_SYM (32 bits) << 32 | ELF64_R_TYPE (32 bits)
+            if byteorder == "<":
+                info = (("r_type", "I", 8), ("r_sym", "I", 12))
+            else:
+                info = (("r_sym", "I", 8), ("r_type", "I", 12))
+            self.rel = struct.Struct(byteorder + "QQ")
+            self.rel_columns = (("r_offset", "Q", 0),) + info
+            self.rela = struct.Struct(byteorder + "QQq")
+            self.rela_columns = self.rel_columns + (("r_addend", "q", 16),)
+            self.dyn = struct.Struct(byteorder + "QQ")
+            self.dyn_columns = (("d_tag", "Q", 0), ("d_val", "Q", 8))
+            self.chdr = struct.Struct(byteorder + "IIQQ")
+            self.chdr_fields = ("ch_type", "ch_reserved", "ch_size", "ch_addralign")
+        self.word = struct.Struct(byteorder + "I")
+        self.word2 = struct.Struct(byteorder + "II")
+        self.word3 = struct.Struct(byteorder + "III")
+        self.word4 = struct.Struct(byteorder + "IIII")
+        self.addr = struct.Struct(byteorder + ("I" if elf_class == 1 else "Q"))
+        self.shdr_fields = ("sh_name", "sh_type", "sh_flags", "sh_addr", "sh_offset", "sh_size", "sh_link", "sh_info", "sh_addralign", "sh_entsize")
+
+    def unpack_columns(self, data, count, entsize, columns) -> dict:
+        # Splits a table of fixed-size records into one array per column.
+        # Each byte of a field is gathered with a strided slice, so no
+        # per-record Python objects are created. A column may give a width
+        # narrower than its array item (e.g. the 24-bit ELF32_R_SYM); the
+        # missing high-order bytes are zero.
+        data = memoryview(data).cast("B")
+        result = {}
+        for name, typecode, offset, *width in columns:
+            size = array(typecode).itemsize
+            width = width[0] if width else size
+            pad = 0 if self.byteorder == "<" else size - width
+            raw = bytearray(count * size)
+            for k in range(width):
+                raw[pad + k::size] = data[offset + k:count * entsize:entsize]
+            col = array(typecode, raw)
+            if self.swap and size > 1:
+                col.byteswap()
+            result[name] = col
+        return result
+
+@lru_cache(maxsize=None)
+def get_structs(elf_class, byteorder="<") -> ELFStructs:
+    return ELFStructs(elf_class, byteorder)
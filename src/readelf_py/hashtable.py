@@ -0,0 +1,81 @@
+SHT_HASH = 0x5
+SHT_GNU_HASH = 0x6ffffff6
+
+def gnu_hash(name) -> int:
+    h = 5381
+    for c in name:
+        h = (h * 33 + c) & 0xffffffff
+    return h
+
+def sysv_hash(name) -> int:
+    h = 0
+    for c in name:
+        h = (h << 4) + c
+        g = h & 0xf0000000
+        if g:
+            h ^= g >> 24
+        h &= ~g
+    return h
+
+class GnuHashTable:
+    # A .gnu.hash section. Only the header is read up front; a lookup
+    # reads one bloom filter word, one bucket and the chain entries of
+    # that bucket straight from the file.
+    def __init__(self, elf, structs, sh) -> None:
+        self.elf = elf
+        self.word = structs.word
+        self.addr = structs.addr
+        offset = sh["sh_offset"]
+        self.nbuckets, self.symoffset, self.bloom_size, self.bloom_shift = elf.unpack_from(structs.word4, offset)
+        self.bloom_offset = offset + 16
+        self.bucket_offset = self.bloom_offset + self.bloom_size * self.addr.size
+        self.chain_offset = self.bucket_offset + self.nbuckets * 4
+        self.bloom_bits = self.addr.size * 8
+
+    def lookup(self, name, symbol_name, accept=None) -> int:
+        # Index of the first symbol called name for which accept(i) holds
+        # (any symbol without accept), or None. symbol_name(i) returns
+        # the name of dynamic symbol i.
+        if self.nbuckets == 0 or self.bloom_size == 0:
+            return None
+        h = gnu_hash(name.encode())
+        bits = self.bloom_bits
+        word = self.elf.unpack_from(self.addr, self.bloom_offset + ((h // bits) % self.bloom_size) * self.addr.size)[0]
+        mask = (1 << (h % bits)) | (1 << ((h >> self.bloom_shift) % bits))
+        if word & mask != mask:
+            return None
+        i = self.elf.unpack_from(self.word, self.bucket_offset + (h % self.nbuckets) * 4)[0]
+        if i < self.symoffset:
+            return None
+        while True:
+            h2 = self.elf.unpack_from(self.word, self.chain_offset + (i - self.symoffset) * 4)[0]
+            if (h | 1) == (h2 | 1) and symbol_name(i) == name and (accept is None or accept(i)):
+                return i
+            if h2 & 1:
+                return None
+            i += 1
+
+class SysvHashTable:
+    # A .hash section, looked up in place like GnuHashTable.
+    def __init__(self, elf, structs, sh) -> None:
+        self.elf = elf
+        self.word = structs.word
+        offset = sh["sh_offset"]
+        self.nbucket, self.nchain = elf.unpack_from(structs.word2, offset)
+        self.bucket_offset = offset + 8
+        self.chain_offset = self.bucket_offset + self.nbucket * 4
+
+    def lookup(self, name, symbol_name, accept=None) -> int:
+        # As GnuHashTable.lookup. The chain continues past a rejected
+        # match, since .hash also covers undefined symbols.
+        if self.nbucket == 0:
+            return None
+        h = sysv_hash(name.encode())
+        i = self.elf.unpack_from(self.word, self.bucket_offset + (h % self.nbucket) * 4)[0]
+        seen = 0
+        while i != 0 and i < self.nchain and seen < self.nchain:
+            if symbol_name(i) == name and (accept is None or accept(i)):
+                return i
+            i = self.elf.unpack_from(self.word, self.chain_offset + i * 4)[0]
+            seen += 1
+        return None
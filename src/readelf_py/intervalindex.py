@@ -0,0 +1,40 @@
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+
+class IntervalIndex:
+    # Half-open [start, end) intervals sorted by start, each carrying a
+    # value. Point lookups bisect to the last interval starting at or
+    # before the point and walk left only while some earlier interval
+    # still reaches past it (tracked by the running maximum of the ends),
+    # so they cost O(log n) plus the number of overlapping intervals.
+    def __init__(self, intervals) -> None:
+        items = sorted(intervals, key=lambda x: (x[0], x[1]))
+        self.starts = [i[0] for i in items]
+        self.ends = [i[1] for i in items]
+        self.values = [i[2] for i in items]
+        self.max_ends = list(accumulate(self.ends, max))
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def find(self, point) -> list:
+        # Values of all intervals containing point, innermost first.
+        found = []
+        i = bisect_right(self.starts, point) - 1
+        while i >= 0 and self.max_ends[i] > point:
+            if self.ends[i] > point:
+                found.append(self.values[i])
+            i -= 1
+        return found
+
+    def find_one(self, point):
+        i = bisect_right(self.starts, point) - 1
+        while i >= 0 and self.max_ends[i] > point:
+            if self.ends[i] > point:
+                return self.values[i]
+            i -= 1
+        return None
+
+    def starting_in(self, start, end) -> list:
+        # Values of all intervals whose start lies in [start, end).
+        return self.values[bisect_left(self.starts, start):bisect_left(self.starts, end)]
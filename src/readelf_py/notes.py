@@ -0,0 +1,240 @@
+from .elfheader import ELFHeader
+from .elfreader import open_reader
+from .programheader import ProgramHeader
+from .sectionheader import SectionHeader
+
+PT_NOTE = 0x4
+SHT_NOTE = 0x7
+
+NT_GNU_ABI_TAG = 1
+NT_GNU_HWCAP = 2
+NT_GNU_BUILD_ID = 3
+NT_GNU_GOLD_VERSION = 4
+NT_GNU_PROPERTY_TYPE_0 = 5
+NT_STAPSDT = 3
+
+class Note:
+    # One entry of a note section or segment. desc is a view of the file.
+    __slots__ = ("name", "type", "desc", "offset")
+
+    def __init__(self, name, type, desc, offset) -> None:
+        self.name = name
+        self.type = type
+        self.desc = desc
+        self.offset = offset
+
+def iter_notes(elf, structs, offset, size, align=4):
+    # Walks the notes in size bytes at offset. Names are padded to 4
+    # bytes and descriptors to align (8 for 8-byte aligned note segments).
+    align = 8 if align == 8 else 4
+    end = offset + size
+    while offset + 12 <= end:
+        namesz, descsz, n_type = elf.unpack_from(structs.word3, offset)
+        name_start = offset + 12
+        desc_start = (name_start + namesz + 3) & ~3
+        desc_end = desc_start + descsz
+        if desc_end > end:
+            return
+        name = bytes(elf.read(name_start, namesz)).rstrip(b"\x00").decode("utf-8", errors="replace")
+        yield Note(name, n_type, elf.read(desc_start, descsz), offset)
+        offset = (desc_end + align - 1) & ~(align - 1)
+
+def find_build_id(elf, elfHeader=None, programHeader=None) -> str:
+    # Hex GNU build ID of a file, from its PT_NOTE segments only (the
+    # section headers are read only when there are no segments, as in
+    # relocatable files). None if the file has none.
+    eh = elfHeader if elfHeader is not None else ELFHeader(elf)
+    ph = programHeader if programHeader is not None else ProgramHeader(elf, eh)
+    regions = [(p["p_offset"], p["p_filesz"], p["p_align"]) for p in ph.p_headers if p["p_type"] == PT_NOTE]
+    if not ph.p_headers:
+        sh = SectionHeader(elf, eh)
+        regions = [(s["sh_offset"], s["sh_size"], s["sh_addralign"]) for s in sh.s_headers if s["sh_type"] == SHT_NOTE]
+    for offset, size, align in regions:
+        for note in iter_notes(elf, eh.structs, offset, size, align):
+            if note.name == "GNU" and note.type == NT_GNU_BUILD_ID:
+                return note.desc.hex()
+    return None
+
+class Notes:
+    _NT_GNU = {
+        NT_GNU_ABI_TAG: "NT_GNU_ABI_TAG (ABI version tag)",
+        NT_GNU_HWCAP: "NT_GNU_HWCAP (DSO-supplied software HWCAP info)",
+        NT_GNU_BUILD_ID: "NT_GNU_BUILD_ID (unique build ID bitstring)",
+        NT_GNU_GOLD_VERSION: "NT_GNU_GOLD_VERSION (gold version)",
+        NT_GNU_PROPERTY_TYPE_0: "NT_GNU_PROPERTY_TYPE_0",
+    }
+
+    _ABI_OS = {
+        0: "Linux",
+        1: "Hurd",
+        2: "Solaris",
+        3: "FreeBSD",
+        4: "NetBSD",
+        5: "Syllable",
+        6: "NaCl",
+    }
+
+    _X86_ISA = {0x1: "x86-64-baseline", 0x2: "x86-64-v2", 0x4: "x86-64-v3", 0x8: "x86-64-v4"}
+    _X86_FEATURE_1 = {0x1: "IBT", 0x2: "SHSTK", 0x4: "LAM_U48", 0x8: "LAM_U57"}
+    _X86_FEATURE_2 = {
+        0x1: "x86", 0x2: "x87", 0x4: "MMX", 0x8: "XMM", 0x10: "YMM", 0x20: "ZMM",
+        0x40: "FXSR", 0x80: "XSAVE", 0x100: "XSAVEOPT", 0x200: "XSAVEC", 0x400: "TMM", 0x800: "MASK",
+    }
+    _AARCH64_FEATURE_1 = {0x1: "BTI", 0x2: "PAC", 0x4: "GCS"}
+
+    # pr_type -> (label, bit names) of the bitmask properties by machine.
+    _PROPERTIES = {
+        3: {
+            0xc0000002: ("x86 feature", _X86_FEATURE_1),
+            0xc0008001: ("x86 feature needed", _X86_FEATURE_2),
+            0xc0010001: ("x86 feature used", _X86_FEATURE_2),
+            0xc0008002: ("x86 ISA needed", _X86_ISA),
+            0xc0010002: ("x86 ISA used", _X86_ISA),
+        },
+        183: {
+            0xc0000000: ("AArch64 feature", _AARCH64_FEATURE_1),
+        },
+    }
+    _PROPERTIES[62] = _PROPERTIES[3]
+
+    def __init__(self, elf, programHeader=None, sectionHeader=None, elfHeader=None) -> None:
+        # Notes are listed per note section when the file has section
+        # headers and per PT_NOTE segment otherwise, like binutils.
+        self.elf = open_reader(elf)
+        self.elfHeader = elfHeader if elfHeader is not None else ELFHeader(self.elf)
+        self.programHeader = programHeader if programHeader is not None else ProgramHeader(self.elf, self.elfHeader)
+        self.sectionHeader = sectionHeader if sectionHeader is not None else SectionHeader(self.elf, self.elfHeader)
+
+        # (section name or None, offset, size, align) per note region
+        self.regions = []
+        for sh in self.sectionHeader.s_headers:
+            if sh["sh_type"] == SHT_NOTE:
+                self.regions.append((self.sectionHeader.get_section_name(sh["sh_name"]), sh["sh_offset"], sh["sh_size"], sh["sh_addralign"]))
+        if not self.regions:
+            for ph in self.programHeader.p_headers:
+                if ph["p_type"] == PT_NOTE:
+                    self.regions.append((None, ph["p_offset"], ph["p_filesz"], ph["p_align"]))
+
+    def iter_region(self, i):
+        _, offset, size, align = self.regions[i]
+        return iter_notes(self.elf, self.elfHeader.structs, offset, size, align)
+
+    def build_id(self) -> str:
+        for i in range(len(self.regions)):
+            for note in self.iter_region(i):
+                if note.name == "GNU" and note.type == NT_GNU_BUILD_ID:
+                    return note.desc.hex()
+        return None
+
+    def print_notes(self) -> None:
+        for i, (name, offset, size, _) in enumerate(self.regions):
+            print("")
+            if name is not None:
+                print("Displaying notes found in: %s" % name)
+            else:
+                print("Displaying notes found at file offset 0x%08x with length 0x%08x:" % (offset, size))
+            print("  Owner                Data size \tDescription")
+            for tmp in self.iter_notes(i):
+                print("  %-20s 0x%08x\t%s" % (tmp["Owner"], tmp["Data size"], tmp["Description"]))
+                self._print_note_details(tmp)
+
+    def _print_note_details(self, tmp) -> None:
+        if "Build ID" in tmp:
+            print("    Build ID: " + tmp["Build ID"])
+        elif "OS" in tmp:
+            print("    OS: %s, ABI: %s" % (tmp["OS"], tmp["ABI"]))
+        elif "Version" in tmp:
+            print("    Version: " + tmp["Version"])
+        elif "Properties" in tmp:
+            print("      Properties: " + "\n\t".join(tmp["Properties"]))
+        elif "Provider" in tmp:
+            fmt = "0x%016x" if self.elfHeader.elf_class != 1 else "0x%08x"
+            print("    Provider: " + tmp["Provider"])
+            print("    Name: " + tmp["Name"])
+            print(("    Location: " + fmt + ", Base: " + fmt + ", Semaphore: " + fmt) % (tmp["Location"], tmp["Base"], tmp["Semaphore"]))
+            print("    Arguments: " + tmp["Arguments"])
+        elif tmp.get("Data"):
+            print("   description data: " + tmp["Data"] + " ")
+
+    def export_notes(self) -> dict:
+        export = {}
+        export["Notes"] = []
+        for i, (name, offset, _, _) in enumerate(self.regions):
+            export["Notes"].append({name if name is not None else "0x%x" % offset: list(self.iter_notes(i))})
+        return export
+
+    def iter_notes(self, i):
+        for note in self.iter_region(i):
+            tmp = {}
+            tmp["Owner"] = note.name
+            tmp["Data size"] = len(note.desc)
+            tmp["Type"] = note.type
+            tmp["Description"] = self._get_note_type(note)
+            tmp.update(self._get_note_details(note))
+            yield tmp
+
+    def _get_note_type(self, note) -> str:
+        if note.name == "GNU" and note.type in self._NT_GNU:
+            return self._NT_GNU[note.type]
+        if note.name == "stapsdt" and note.type == NT_STAPSDT:
+            return "NT_STAPSDT (SystemTap probe descriptors)"
+        return "Unknown note type: (0x%08x)" % note.type
+
+    def _get_note_details(self, note) -> dict:
+        # The decoded descriptor of the note types we know about, else
+        # its bytes in hex.
+        desc = note.desc
+        tmp = {}
+        if note.name == "GNU" and note.type == NT_GNU_BUILD_ID:
+            tmp["Build ID"] = desc.hex()
+        elif note.name == "GNU" and note.type == NT_GNU_ABI_TAG and len(desc) >= 16:
+            os, major, minor, sub = self.elfHeader.structs.word4.unpack_from(desc)
+            tmp["OS"] = self._ABI_OS.get(os, "Unknown")
+            tmp["ABI"] = "%d.%d.%d" % (major, minor, sub)
+        elif note.name == "GNU" and note.type == NT_GNU_GOLD_VERSION:
+            tmp["Version"] = bytes(desc).rstrip(b"\x00").decode("utf-8", errors="replace")
+        elif note.name == "GNU" and note.type == NT_GNU_PROPERTY_TYPE_0:
+            tmp["Properties"] = self._get_properties(desc)
+        elif note.name == "stapsdt" and note.type == NT_STAPSDT:
+            tmp.update(self._get_stapsdt(desc))
+        else:
+            tmp["Data"] = desc.hex(" ")
+        return tmp
+
+    def _get_properties(self, desc) -> list:
+        # pr_type, pr_datasz and the data, padded to the address size.
+        structs = self.elfHeader.structs
+        pad = structs.addr.size
+        known = self._PROPERTIES.get(self.elfHeader.elf_machine, {})
+        props = []
+        offset = 0
+        while offset + 8 <= len(desc):
+            pr_type, datasz = structs.word2.unpack_from(desc, offset)
+            data = desc[offset + 8:offset + 8 + datasz]
+            offset += 8 + ((datasz + pad - 1) & ~(pad - 1))
+            if pr_type in known and datasz == 4:
+                label, names = known[pr_type]
+                bits = structs.word.unpack_from(data)[0]
+                words = [name for bit, name in names.items() if bits & bit]
+                if bits & ~sum(names):
+                    words.append("<unknown: %x>" % (bits & ~sum(names)))
+                props.append("%s: %s" % (label, ", ".join(words) if words else "<None>"))
+            elif pr_type == 1 and datasz == pad:
+                props.append("stack size: 0x%x" % structs.addr.unpack_from(data)[0])
+            elif pr_type == 2 and datasz == 0:
+                props.append("no copy on protected")
+            else:
+                props.append("<application-specific type 0x%x data: %s>" % (pr_type, data.hex(" ")))
+        return props
+
+    def _get_stapsdt(self, desc) -> dict:
+        # pc, base and semaphore addresses, then provider, name and
+        # argument strings.
+        addr = self.elfHeader.structs.addr
+        if len(desc) < 3 * addr.size:
+            return {"Data": desc.hex(" ")}
+        tmp = {}
+        strings = bytes(desc[3 * addr.size:]).split(b"\x00") + [b"", b"", b""]
+        tmp["Provider"], tmp["Name"], tmp["Arguments"] = (s.decode("utf-8", errors="replace") for s in strings[:3])
+        tmp["Location"], tmp["Base"], tmp["Semaphore"] = (addr.unpack_from(desc, i * addr.size)[0] for i in range(3))
+        return tmp
@@ -0,0 +1,140 @@
+from .elfheader import ELFHeader
+from .elfreader import open_reader
+from .intervalindex import IntervalIndex
+from .sectionheader import SectionHeader
+
+class ProgramHeader():
+    _P_TYPES = {
+        0: "NULL",
+        1: "LOAD",
+        2: "DYNAMIC",
+        3: "INTERP",
+        4: "NOTE",
+        5: "SHLIB",
+        6: "PHDR",
+        7: "TLS",
+        8: "NUM",
+        0x6474e550: "GNU_EH_FRAME",
+        0x6474e551: "GNU_STACK",
+        0x6474e552: "GNU_RELRO",
+        0x6474e553: "GNU_PROPERTY",
+    }
+    
+    _P_FLAGS = {
+        0x1: "X",
+        0x2: "W",
+        0x3: "WE",
+        0x4: "R",
+        0x5: "RE",
+        0x6: "RW",
+        0x7: "RWE",
+    }
+
+    def __init__(self, elf, elfHeader=None, p_headers=None) -> None:
+        # p_headers restores a table parsed before (see elfcache).
+        self.elf = open_reader(elf)
+        eh = elfHeader if elfHeader is not None else ELFHeader(self.elf)
+        self.elfHeader = eh
+        self.elf_phnum = eh.elf_phnum
+        self.elf_phoff = eh.elf_phoff
+        self.elf_phentsize = eh.elf_phentsize
+        self.elf_class = eh.elf_class
+        
+        self.p_headers = []
+        self._address_index = None
+        self._offset_index = None
+        
+        structs = eh.structs
+        names = structs.phdr_fields
+        if p_headers is not None:
+            self.p_headers = p_headers
+        elif self.elf_phnum:
+            for fields in self.elf.iter_unpack(structs.phdr, self.elf_phoff, self.elf_phnum, self.elf_phentsize):
+                self.p_headers.append(dict(zip(names, fields)))
+                
+    def address_index(self) -> IntervalIndex:
+        if self._address_index is None:
+            self._address_index = IntervalIndex(
+                (ph["p_vaddr"], ph["p_vaddr"] + ph["p_memsz"], i) for i, ph in enumerate(self.p_headers))
+        return self._address_index
+
+    def offset_index(self) -> IntervalIndex:
+        if self._offset_index is None:
+            self._offset_index = IntervalIndex(
+                (ph["p_offset"], ph["p_offset"] + ph["p_filesz"], i) for i, ph in enumerate(self.p_headers))
+        return self._offset_index
+
+    def segments_for_address(self, addr) -> list:
+        return sorted(self.address_index().find(addr))
+
+    def segments_for_offset(self, offset) -> list:
+        return sorted(self.offset_index().find(offset))
+
+    def address_to_offset(self, addr) -> int:
+        # File offset of virtual address addr through the LOAD segment
+        # that maps it, or None when no segment has file bytes there.
+        for i in self.address_index().find(addr):
+            ph = self.p_headers[i]
+            if ph["p_type"] == 1 and addr - ph["p_vaddr"] < ph["p_filesz"]:
+                return ph["p_offset"] + addr - ph["p_vaddr"]
+        return None
+
+    def sections_in_segment(self, i, sectionHeader) -> list:
+        # Indices of the sections whose address falls inside segment i.
+        ph = self.p_headers[i]
+        return sorted(sectionHeader.address_index().starting_in(ph["p_vaddr"], ph["p_vaddr"] + ph["p_memsz"]))
+
+    def print_program_header(self, sectionHeader=None) -> None:
+        print("Program Headers:")
+        print("%12s %18s  %18s  %18s  %18s  %18s  %04s  %18s" %("Type", "Offset", "VirtAddr", "PhysAddr", "FileSiz", "MemSiz", "Flags", "Align"))
+        for i in range(self.elf_phnum):
+            print("%12s 0x%016x  0x%016x  0x%016x  0x%016x  0x%016x  %05s  0x%016x" %(self._get_program_type(self.p_headers[i]["p_type"]), self.p_headers[i]["p_offset"], self.p_headers[i]["p_vaddr"], self.p_headers[i]["p_paddr"], self.p_headers[i]["p_filesz"], self.p_headers[i]["p_memsz"], self._get_program_flag(self.p_headers[i]["p_flags"]), self.p_headers[i]["p_align"]))
+            if self.p_headers[i]["p_type"] == 0x3:
+                print("    [Requesting program interpreter: "+ self._get_interp_name(self.p_headers[i]["p_offset"]) +"]")
+        print("")
+        print(" Section to Segment mapping:")
+        print("  Segment Sections...")
+        sections = sectionHeader if sectionHeader is not None else SectionHeader(self.elf, self.elfHeader)
+        for i in range(self.elf_phnum):
+            print("   %02d     " %i, end="")
+            for j in self.sections_in_segment(i, sections):
+                section_name = sections.get_section_name(sections.s_headers[j]["sh_name"])
+                print("%s " % section_name, end="")
+            print()
+        print("")
+    
+    def export_program_header(self) -> dict:
+        export = {}
+        export["Program Header"] = list(self.iter_program_header())
+        return export
+    
+    def iter_program_header(self):
+        for i in range(self.elf_phnum):
+            tmp = {}
+            tmp["Type"] = self._get_program_type(self.p_headers[i]["p_type"])
+            tmp["Offset"] = self.p_headers[i]["p_offset"]
+            tmp["VirtAddr"] = self.p_headers[i]["p_vaddr"]
+            tmp["PhysAddr"] = self.p_headers[i]["p_paddr"]
+            tmp["FileSiz"] = self.p_headers[i]["p_filesz"]
+            tmp["MemSiz"] = self.p_headers[i]["p_memsz"]
+            tmp["Flags"] = self._get_program_flag(self.p_headers[i]["p_flags"])
+            tmp["Align"] = self.p_headers[i]["p_align"]
+            yield tmp
+    
+    def _get_interp_name(self, offset) -> str:
+        name = self.elf.read_cstring(offset)
+        return name.decode("utf-8") if name else ""
+            
+    def _get_program_type(self, x) -> str:
+        if x in self._P_TYPES:
+            return self._P_TYPES[x]
+        elif x >= 0x60000000 and x <= 0x6fffff00:
+            return 'LOOS+%lx' % (x - 0x60000000)
+        else :
+            return 'Unknown'
+        
+    def _get_program_flag(self, x) -> str:
+        if x in self._P_FLAGS:
+            return self._P_FLAGS[x]
+        else:
+            return 'Unknown'
\ No newline at end of file
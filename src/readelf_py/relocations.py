@@ -0,0 +1,203 @@
+from array import array
+
+from .elfheader import ELFHeader
+from .elfreader import open_reader
+from .sectionheader import SectionHeader
+from .symboltable import SymbolTable
+
+SHT_RELA = 0x4
+SHT_REL = 0x9
+SHT_RELR = 0x13
+
+class RelocationColumns:
+    # One relocation section stored as parallel arrays. r_addend is None
+    # for REL sections; RELR sections only have r_offset and are expanded
+    # to one R_*_RELATIVE entry per relocated word.
+    def __init__(self, r_offset, r_type, r_sym, r_addend=None) -> None:
+        self.r_offset = r_offset
+        self.r_type = r_type
+        self.r_sym = r_sym
+        self.r_addend = r_addend
+
+    def __len__(self) -> int:
+        return len(self.r_offset)
+
+class Relocations:
+    _R_X86_64 = {
+        0: "R_X86_64_NONE", 1: "R_X86_64_64", 2: "R_X86_64_PC32", 3: "R_X86_64_GOT32",
+        4: "R_X86_64_PLT32", 5: "R_X86_64_COPY", 6: "R_X86_64_GLOB_DAT", 7: "R_X86_64_JUMP_SLOT",
+        8: "R_X86_64_RELATIVE", 9: "R_X86_64_GOTPCREL", 10: "R_X86_64_32", 11: "R_X86_64_32S",
+        12: "R_X86_64_16", 13: "R_X86_64_PC16", 14: "R_X86_64_8", 15: "R_X86_64_PC8",
+        16: "R_X86_64_DTPMOD64", 17: "R_X86_64_DTPOFF64", 18: "R_X86_64_TPOFF64", 19: "R_X86_64_TLSGD",
+        20: "R_X86_64_TLSLD", 21: "R_X86_64_DTPOFF32", 22: "R_X86_64_GOTTPOFF", 23: "R_X86_64_TPOFF32",
+        24: "R_X86_64_PC64", 25: "R_X86_64_GOTOFF64", 26: "R_X86_64_GOTPC32", 27: "R_X86_64_GOT64",
+        28: "R_X86_64_GOTPCREL64", 29: "R_X86_64_GOTPC64", 30: "R_X86_64_GOTPLT64", 31: "R_X86_64_PLTOFF64",
+        32: "R_X86_64_SIZE32", 33: "R_X86_64_SIZE64", 34: "R_X86_64_GOTPC32_TLSDESC", 35: "R_X86_64_TLSDESC_CALL",
+        36: "R_X86_64_TLSDESC", 37: "R_X86_64_IRELATIVE", 38: "R_X86_64_RELATIVE64",
+        41: "R_X86_64_GOTPCRELX", 42: "R_X86_64_REX_GOTPCRELX",
+    }
+
+    _R_386 = {
+        0: "R_386_NONE", 1: "R_386_32", 2: "R_386_PC32", 3: "R_386_GOT32",
+        4: "R_386_PLT32", 5: "R_386_COPY", 6: "R_386_GLOB_DAT", 7: "R_386_JMP_SLOT",
+        8: "R_386_RELATIVE", 9: "R_386_GOTOFF", 10: "R_386_GOTPC", 11: "R_386_32PLT",
+        14: "R_386_TLS_TPOFF", 15: "R_386_TLS_IE", 16: "R_386_TLS_GOTIE", 17: "R_386_TLS_LE",
+        18: "R_386_TLS_GD", 19: "R_386_TLS_LDM", 20: "R_386_16", 21: "R_386_PC16",
+        22: "R_386_8", 23: "R_386_PC8", 35: "R_386_TLS_DTPMOD32", 36: "R_386_TLS_DTPOFF32",
+        37: "R_386_TLS_TPOFF32", 38: "R_386_SIZE32", 39: "R_386_TLS_GOTDESC", 40: "R_386_TLS_DESC_CALL",
+        41: "R_386_TLS_DESC", 42: "R_386_IRELATIVE", 43: "R_386_GOT32X",
+    }
+
+    _R_AARCH64 = {
+        0: "R_AARCH64_NONE", 257: "R_AARCH64_ABS64", 258: "R_AARCH64_ABS32", 259: "R_AARCH64_ABS16",
+        260: "R_AARCH64_PREL64", 261: "R_AARCH64_PREL32", 262: "R_AARCH64_PREL16",
+        275: "R_AARCH64_ADR_PREL_PG_HI21", 277: "R_AARCH64_ADD_ABS_LO12_NC", 282: "R_AARCH64_JUMP26",
+        283: "R_AARCH64_CALL26", 286: "R_AARCH64_LDST64_ABS_LO12_NC", 311: "R_AARCH64_ADR_GOT_PAGE",
+        312: "R_AARCH64_LD64_GOT_LO12_NC", 1024: "R_AARCH64_COPY", 1025: "R_AARCH64_GLOB_DAT",
+        1026: "R_AARCH64_JUMP_SLOT", 1027: "R_AARCH64_RELATIVE", 1028: "R_AARCH64_TLS_DTPMOD",
+        1029: "R_AARCH64_TLS_DTPREL", 1030: "R_AARCH64_TLS_TPREL", 1031: "R_AARCH64_TLSDESC",
+        1032: "R_AARCH64_IRELATIVE",
+    }
+
+    # e_machine -> (type names, R_*_RELATIVE used for RELR entries)
+    _R_TYPES = {
+        62: (_R_X86_64, 8),
+        3: (_R_386, 8),
+        183: (_R_AARCH64, 1027),
+    }
+
+    def __init__(self, elf, sectionHeader=None, symbolTable=None, elfHeader=None) -> None:
+        self.elf = open_reader(elf)
+        self.elfHeader = elfHeader if elfHeader is not None else ELFHeader(self.elf)
+        self.sectionHeader = sectionHeader if sectionHeader is not None else SectionHeader(self.elf, self.elfHeader)
+        self.symbolTable = symbolTable if symbolTable is not None else SymbolTable(self.elf, self.sectionHeader, self.elfHeader)
+        self.type_names, self.relative_type = self._R_TYPES.get(self.elfHeader.elf_machine, ({}, 0))
+
+        self.rel_sections = {}
+        for sh in self.sectionHeader.s_headers:
+            if sh["sh_type"] in (SHT_RELA, SHT_REL, SHT_RELR):
+                self.rel_sections[self.sectionHeader.get_section_name(sh["sh_name"])] = sh
+        self._tables = {}
+
+    def get_table(self, k) -> RelocationColumns:
+        table = self._tables.get(k)
+        if table is None:
+            table = self._parse_relocations(self.rel_sections[k])
+            self._tables[k] = table
+        return table
+
+    def _parse_relocations(self, sh) -> RelocationColumns:
+        structs = self.elfHeader.structs
+        if sh["sh_type"] == SHT_RELR:
+            return self._parse_relr(sh)
+        if sh["sh_type"] == SHT_RELA:
+            layout, columns = structs.rela, structs.rela_columns
+        else:
+            layout, columns = structs.rel, structs.rel_columns
+        entsize = sh["sh_entsize"] or layout.size
+        count = sh["sh_size"] // entsize
+        cols = structs.unpack_columns(self.elf.read(sh["sh_offset"], count * entsize), count, entsize, columns)
+        return RelocationColumns(cols["r_offset"], cols["r_type"], cols["r_sym"], cols.get("r_addend"))
+
+    def _parse_relr(self, sh) -> RelocationColumns:
+        # Even entries are addresses; odd entries are bitmaps whose bit n
+        # (n >= 1) relocates the word n - 1 words after the current base.
+        # Bitmaps are expanded by peeling off their lowest set bit, so the
+        # cost is proportional to the number of relocations, not bits.
+        structs = self.elfHeader.structs
+        wordsize = structs.addr.size
+        entries = array("I" if wordsize == 4 else "Q", bytes(self.elf.read(sh["sh_offset"], sh["sh_size"] - sh["sh_size"] % wordsize)))
+        if structs.swap:
+            entries.byteswap()
+        offsets = array(entries.typecode)
+        span = (wordsize * 8 - 1) * wordsize
+        base = 0
+        for entry in entries:
+            if entry & 1 == 0:
+                offsets.append(entry)
+                base = entry + wordsize
+                continue
+            bitmap = entry >> 1
+            while bitmap:
+                low = bitmap & -bitmap
+                offsets.append(base + (low.bit_length() - 1) * wordsize)
+                bitmap ^= low
+            base += span
+        count = len(offsets)
+        return RelocationColumns(offsets, array("I", [self.relative_type]) * count, array("I", bytes(4 * count)))
+
+    def print_relocations(self) -> None:
+        if not self.rel_sections:
+            print("There are no relocations in this file.")
+            print("")
+            return
+        for k, sh in self.rel_sections.items():
+            v = self.get_table(k)
+            if sh["sh_type"] == SHT_RELR:
+                # Like binutils: the packed entry count, then the offsets.
+                wordsize = self.elfHeader.structs.addr.size
+                print("Relocation section '%s' at offset 0x%x contains %d entries:" % (k, sh["sh_offset"], sh["sh_size"] // wordsize))
+                print("  %d offsets" % len(v))
+                print("\n".join(["%016x" % x for x in v.r_offset]))
+                print("")
+                continue
+            print("Relocation section '%s' at offset 0x%x contains %d entries:" % (k, sh["sh_offset"], len(v)))
+            print("  Offset          Info           Type                 Sym. Value       Sym. Name + Addend")
+            for tmp in self.iter_relocations(k):
+                line = "%012x  %012x %-20s " % (tmp["Offset"], tmp["Info"], tmp["Type"])
+                if tmp["Symbol"] is not None:
+                    line += "%016x %s" % (tmp["Symbol Value"], tmp["Symbol"])
+                    if tmp["Addend"] is not None:
+                        line += " %s %x" % ("-" if tmp["Addend"] < 0 else "+", abs(tmp["Addend"]))
+                elif tmp["Addend"] is not None:
+                    line += "%16s %x" % ("", tmp["Addend"])
+                print(line)
+            print("")
+
+    def export_relocations(self) -> dict:
+        export = {}
+        export["Relocations"] = []
+        for k in self.rel_sections:
+            export["Relocations"].append({k: list(self.iter_relocations(k))})
+        return export
+
+    def iter_relocations(self, k):
+        v = self.get_table(k)
+        sym_table = self._linked_symbol_table(self.rel_sections[k])
+        shift = 8 if self.elfHeader.elf_class == 1 else 32
+        sections = self.sectionHeader.s_headers
+        for i in range(len(v)):
+            r_sym = v.r_sym[i]
+            tmp = {}
+            tmp["Offset"] = v.r_offset[i]
+            tmp["Info"] = (r_sym << shift) | v.r_type[i]
+            tmp["Type"] = self._get_relocation_type(v.r_type[i])
+            if r_sym and sym_table is not None:
+                sym = self.symbolTable.get_symbol(sym_table, r_sym)
+                tmp["Symbol Value"] = sym.st_value
+                tmp["Symbol"] = self.symbolTable.symbol_name(sym_table, r_sym)
+                if not tmp["Symbol"] and sym.st_info & 0xf == 3 and sym.st_shndx < len(sections):
+                    # STT_SECTION symbols are shown by their section's name.
+                    tmp["Symbol"] = self.sectionHeader.get_section_name(sections[sym.st_shndx]["sh_name"])
+            else:
+                tmp["Symbol Value"] = None
+                tmp["Symbol"] = None
+            tmp["Addend"] = v.r_addend[i] if v.r_addend is not None else None
+            yield tmp
+
+    def _linked_symbol_table(self, sh) -> str:
+        # Key in symbolTable of the table this section's sh_link names.
+        if sh["sh_type"] == SHT_RELR or sh["sh_link"] >= len(self.sectionHeader.s_headers):
+            return None
+        link = self.sectionHeader.s_headers[sh["sh_link"]]
+        name = self.sectionHeader.get_section_name(link["sh_name"])
+        if name not in self.symbolTable.sym_sections:
+            return None
+        # Referenced symbols are looked up at random, so load the columns.
+        self.symbolTable.get_table(name)
+        return name
+
+    def _get_relocation_type(self, x) -> str:
+        if x in self.type_names:
+            return self.type_names[x]
+        return "unrecognized: %x" % x
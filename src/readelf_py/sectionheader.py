@@ -0,0 +1,337 @@
+import sys
+
+from .compressed import (CACHE_SIZE, ELFCOMPRESS_ZLIB, SHF_COMPRESSED, ZDEBUG_HEADER_SIZE, ZDEBUG_MAGIC,
+                        CompressionError, DecompressedCache, iter_blocks, iter_decompress)
+from .elfheader import ELFHeader
+from .elfreader import open_reader
+from .intervalindex import IntervalIndex
+from .stringtable import StringTable
+
+# Printable ASCII stays, everything else is shown as '.' in hex dumps.
+_HEX_TEXT = bytes(c if 0x20 <= c < 0x7f else 0x2e for c in range(256))
+_HEX_LINES = 4096
+# String dumps show control characters as ^X and end a line at '\n',
+# skipping what is not printable after it; the next line is indented
+# under the string, as binutils does.
+_DUMP_ESCAPES = {c: "^" + chr(c + 0x40) for c in range(0x20)}
+_DUMP_NEWLINE = r"\n[^\x20-\x7e]*"
+_DUMP_INDENT = "\\n\n" + " " * 12
+# re is only imported by the string dump; its cache keeps these compiled.
+_DUMP_STRING = rb"[\x20-\x7e][^\x00]*"
+
+class SectionHeader:
+    _SH_FLAGS = {
+        0x1 : "W",
+        0x2 : "A",
+        0x4 : "X",
+        0x10 : "M",
+        0x20 : "S",
+        0x40 : "I",
+        0x80 : "L",
+        0x100 : "O",
+        0x200 : "G",
+        0x400 : "T",
+        0x80000000 : "E",
+        0x800 : "C",
+    }
+    
+    _SH_TYPES = {
+        0x0 : "NULL",
+        0x1 : "PROGBITS",
+        0x2 : "SYMTAB",
+        0x3 : "STRTAB",
+        0x4 : "RELA",
+        0x5 : "HASH",
+        0x6 : "DYNAMIC",
+        0x7 : "NOTE",
+        0x8 : "NOBITS",
+        0x9 : "REL",
+        0xa : "SHLIB",
+        0xb : "DYNSYM",
+        0xe : "INIT_ARRAY",
+        0xf : "FINI_ARRAY",
+        0x10 : "PREINIT_ARRAY",
+        0x11 : "GROUP",
+        0x12 : "SYMTAB_SHNDX",
+        0x13 : "RELR",
+        0x60000000 : "LOOS",
+        0x6fffffff : "SHT_SUNW_versym"
+    }     
+        
+    def __init__(self, elf, elfHeader=None, s_headers=None, string_caches=None) -> None:
+        # s_headers and string_caches restore a table and the names
+        # decoded from it before (see elfcache).
+        self.elf = open_reader(elf)
+        eh = elfHeader if elfHeader is not None else ELFHeader(self.elf)
+        self.elf_class = eh.elf_class
+        self.elf_type = eh.elf_type
+        self.elf_shnum = eh.elf_shnum
+        self.elf_shoff = eh.elf_shoff
+        self.elf_shentsize = eh.elf_shentsize
+        self.elf_shstrndx = eh.elf_shstrndx
+        
+        self.s_headers = []
+        self._string_tables = {}
+        self._string_caches = string_caches if string_caches is not None else {}
+        self._address_index = None
+        self._offset_index = None
+        self._names = None
+        self._decompressed = None
+        self.structs = eh.structs
+        
+        structs = eh.structs
+        names = structs.shdr_fields
+        if s_headers is not None:
+            self.s_headers = s_headers
+        elif self.elf_shnum:
+            for fields in self.elf.iter_unpack(structs.shdr, self.elf_shoff, self.elf_shnum, self.elf_shentsize):
+                self.s_headers.append(dict(zip(names, fields)))
+    
+    def string_caches(self) -> dict:
+        # string table index -> {offset: name} decoded so far.
+        caches = dict(self._string_caches)
+        caches.update((i, strtab.cache) for i, strtab in self._string_tables.items())
+        return caches
+
+    def address_index(self) -> IntervalIndex:
+        # Section index by virtual address range. Sections that are not
+        # allocated get an empty range: they still show up in
+        # starting_in() (as in the segment mapping) but never contain an
+        # address.
+        if self._address_index is None:
+            self._address_index = IntervalIndex(
+                (sh["sh_addr"], sh["sh_addr"] + sh["sh_size"] if sh["sh_flags"] & 0x2 else sh["sh_addr"], i)
+                for i, sh in enumerate(self.s_headers))
+        return self._address_index
+
+    def offset_index(self) -> IntervalIndex:
+        # Section index by file offset range (NOBITS sections take no space).
+        if self._offset_index is None:
+            self._offset_index = IntervalIndex(
+                (sh["sh_offset"], sh["sh_offset"] + (sh["sh_size"] if sh["sh_type"] != 0x8 else 0), i)
+                for i, sh in enumerate(self.s_headers))
+        return self._offset_index
+
+    def section_for_address(self, addr) -> int:
+        return self.address_index().find_one(addr)
+
+    def section_for_offset(self, offset) -> int:
+        return self.offset_index().find_one(offset)
+
+    def find_section(self, name) -> int:
+        # Index of the section called name, or None. A number (or a
+        # string of digits that is not a section name) selects by index.
+        if self._names is None:
+            self._names = {}
+            for i, sh in enumerate(self.s_headers):
+                self._names.setdefault(self.get_section_name(sh["sh_name"]), i)
+        if isinstance(name, str) and name in self._names:
+            return self._names[name]
+        if isinstance(name, int) or name.isdigit():
+            return int(name) if int(name) < len(self.s_headers) else None
+        return None
+
+    def get_section_data(self, index, decompress=False) -> memoryview:
+        # The contents of section index as a zero-copy view of the mapped
+        # file (NOBITS sections are empty). Callers that keep the view
+        # keep the mapping alive. With decompress, compressed sections
+        # are inflated whole and kept in a byte-bounded LRU cache.
+        sh = self.s_headers[index]
+        if sh["sh_type"] == 0x8:
+            return memoryview(b"")
+        data = memoryview(self.elf.read(sh["sh_offset"], sh["sh_size"]))
+        compression = self.get_compression(index) if decompress else None
+        if compression is None:
+            return data
+        if self._decompressed is None:
+            self._decompressed = DecompressedCache(CACHE_SIZE)
+        buf = self._decompressed.get(index)
+        if buf is None:
+            ch_type, _, start = compression
+            buf = b"".join(iter_decompress(data[start:], ch_type))
+            self._decompressed.put(index, buf)
+        return memoryview(buf)
+
+    def iter_section_data(self, index, decompress=False):
+        # The contents of section index as a series of buffers. Compressed
+        # sections are inflated one chunk at a time, unless they are
+        # already in the cache.
+        compression = self.get_compression(index) if decompress else None
+        if compression is None or (self._decompressed is not None and self._decompressed.get(index) is not None):
+            yield self.get_section_data(index, decompress)
+            return
+        sh = self.s_headers[index]
+        ch_type, _, start = compression
+        yield from iter_decompress(self.elf.read(sh["sh_offset"] + start, sh["sh_size"] - start), ch_type)
+
+    def get_compression(self, index) -> tuple:
+        # (ch_type, uncompressed size, offset of the compressed data) for
+        # an SHF_COMPRESSED or .zdebug section, otherwise None.
+        sh = self.s_headers[index]
+        if sh["sh_type"] == 0x8:
+            return None
+        if sh["sh_flags"] & SHF_COMPRESSED:
+            if sh["sh_size"] < self.structs.chdr.size:
+                return None
+            chdr = dict(zip(self.structs.chdr_fields, self.elf.unpack_from(self.structs.chdr, sh["sh_offset"])))
+            return chdr["ch_type"], chdr["ch_size"], self.structs.chdr.size
+        if sh["sh_size"] >= ZDEBUG_HEADER_SIZE and self.get_section_name(sh["sh_name"]).startswith(".zdebug"):
+            head = bytes(self.elf.read(sh["sh_offset"], ZDEBUG_HEADER_SIZE))
+            if head[:4] == ZDEBUG_MAGIC:
+                return ELFCOMPRESS_ZLIB, int.from_bytes(head[4:], "big"), ZDEBUG_HEADER_SIZE
+        return None
+
+    def print_hex_dump(self, name, decompress=False) -> None:
+        index = self._find_dump_section(name)
+        if index is None:
+            return
+        print("")
+        print("Hex dump of section '%s':" % self.get_section_name(self.s_headers[index]["sh_name"]))
+        self._print_relocation_note(index)
+        addr = self.s_headers[index]["sh_addr"]
+        # Whole blocks of lines are converted with one hex() and one
+        # translate() call; the per-line work is only slicing.
+        block = 16 * _HEX_LINES
+        pos = 0
+        try:
+            for data in iter_blocks(self.iter_section_data(index, decompress), 16):
+                for start in range(0, len(data), block):
+                    chunk = data[start:start + block]
+                    hx = chunk.hex(" ", -4)
+                    text = chunk.tobytes().translate(_HEX_TEXT).decode("ascii")
+                    lines = []
+                    for i in range(0, len(chunk), 16):
+                        lines.append("  0x%08x %-36s%s" % (addr + pos + i, hx[i * 9 // 4:i * 9 // 4 + 35], text[i:i + 16]))
+                    print("\n".join(lines))
+                    pos += len(chunk)
+        except CompressionError as e:
+            print("readelf: Warning: Unable to decompress section %s: %s" % (name, e), file=sys.stderr)
+        print("")
+
+    def print_string_dump(self, name, decompress=False) -> None:
+        index = self._find_dump_section(name)
+        if index is None:
+            return
+        print("")
+        print("String dump of section '%s':" % self.get_section_name(self.s_headers[index]["sh_name"]))
+        self._print_relocation_note(index)
+        import re
+        found = False
+        try:
+            for offset, string in self.iter_strings(index, decompress):
+                lines = re.split(_DUMP_NEWLINE, string)
+                string = _DUMP_INDENT.join(line.translate(_DUMP_ESCAPES) for line in lines)
+                if not lines[-1]:
+                    string = string[:-13]
+                print("  [%6x]  %s" % (offset, string))
+                found = True
+        except CompressionError as e:
+            print("readelf: Warning: Unable to decompress section %s: %s" % (name, e), file=sys.stderr)
+        if found:
+            print("")
+        else:
+            print("  No strings found in this section.")
+
+    def iter_strings(self, index, decompress=False):
+        # (offset, string) for every string in the section: a printable
+        # ASCII character and everything after it up to the next NUL.
+        # The strings are found by the regex engine directly on each
+        # buffer; a string cut off at the end of one is carried over.
+        import re
+        base = 0
+        carry = b""
+        for data in self.iter_section_data(index, decompress):
+            if carry:
+                data = carry + data
+            carry = b""
+            for m in re.finditer(_DUMP_STRING, data):
+                if m.end() == len(data):
+                    carry = bytes(data[m.start():])
+                    base += m.start()
+                    break
+                yield base + m.start(), m.group().decode("utf-8", errors="backslashreplace")
+            else:
+                base += len(data)
+        if carry:
+            yield base, carry.decode("utf-8", errors="backslashreplace")
+
+    def _find_dump_section(self, name) -> int:
+        index = self.find_section(name)
+        if index is None:
+            print("readelf: Warning: Section '%s' was not dumped because it does not exist" % name, file=sys.stderr)
+            return None
+        sh = self.s_headers[index]
+        if sh["sh_type"] == 0x8 or sh["sh_size"] == 0:
+            print("Section '%s' has no data to dump." % self.get_section_name(sh["sh_name"]))
+            return None
+        return index
+
+    def _print_relocation_note(self, index) -> None:
+        if self.elf_type != 1:
+            return
+        for sh in self.s_headers:
+            if sh["sh_type"] in (0x4, 0x9) and sh["sh_info"] == index:
+                print(" NOTE: This section has relocations against it, but these have NOT been applied to this dump.")
+                return
+
+    def print_section_header(self) -> None:
+        print("There are %s section headers, starting at offset 0x%x:" % (self.elf_shnum, self.elf_shoff))
+        print(" Section Header:")
+        print("  [Nr] Name              Type             Address          Offset   Size             EntSize          Flags  Link  Info  Align")
+        for i in range(self.elf_shnum):
+            print("  [%02d] %-17s %-16s %016x %08x %016x %016x %5s  %02d    %02d    %02d" % (i, self.get_section_name(self.s_headers[i]["sh_name"])[:17], self._get_section_type(self.s_headers[i]["sh_type"]), self.s_headers[i]["sh_addr"], self.s_headers[i]["sh_offset"], self.s_headers[i]["sh_size"], self.s_headers[i]["sh_entsize"], self._get_section_flag(self.s_headers[i]["sh_flags"]), self.s_headers[i]["sh_link"], self.s_headers[i]["sh_info"], self.s_headers[i]["sh_addralign"]))
+        print("Key to Flags:")
+        print("  W (write), A (alloc), X (execute), M (merge), S (strings), I (info),")
+        print("  C (compressed), E (exclude),")
+        print("")
+        
+    def export_section_header(self) -> dict:
+        # export section header to json
+        export = {}
+        export["Section Header"] = list(self.iter_section_header())
+        return export
+    
+    def iter_section_header(self):
+        for i in range(self.elf_shnum):
+            tmp = {}
+            tmp["Nr"] = i
+            tmp["Name"] = self.get_section_name(self.s_headers[i]["sh_name"])
+            tmp["Type"] = self._get_section_type(self.s_headers[i]["sh_type"])
+            tmp["Address"] = self.s_headers[i]["sh_addr"]
+            tmp["Offset"] = self.s_headers[i]["sh_offset"]
+            tmp["Size"] = self.s_headers[i]["sh_size"]
+            tmp["EntSize"] = self.s_headers[i]["sh_entsize"]
+            tmp["Flags"] = self._get_section_flag(self.s_headers[i]["sh_flags"])
+            tmp["Link"] = self.s_headers[i]["sh_link"]
+            tmp["Info"] = self.s_headers[i]["sh_info"]
+            tmp["Align"] = self.s_headers[i]["sh_addralign"]
+            yield tmp
+        
+    def _get_section_flag(self, x) -> str:
+        flag = ""
+        for i in self._SH_FLAGS:
+            if x & i:
+                flag += self._SH_FLAGS[i]
+        return flag
+    
+    def _get_section_type(self, x) -> str:
+        if x in self._SH_TYPES:
+            return self._SH_TYPES[x]
+        elif x >= 0x60000000 and x <= 0x6fffffff:
+            return 'loos+0x%x' % (x - 0x60000000)
+    
+    def get_section_name(self, sh_name) -> str:
+        if self.elf_shstrndx >= self.elf_shnum:
+            return ''
+        return self.get_string_table(self.elf_shstrndx).get(sh_name)
+
+    def get_string_table(self, index) -> StringTable:
+        # String tables are shared by every printer and exporter that
+        # holds this SectionHeader, so each one is decoded only once.
+        strtab = self._string_tables.get(index)
+        if strtab is None:
+            sh = self.s_headers[index]
+            strtab = StringTable(self.elf, sh["sh_offset"], sh["sh_size"])
+            strtab.cache = self._string_caches.pop(index, strtab.cache)
+            self._string_tables[index] = strtab
+        return strtab
@@ -0,0 +1,271 @@
+import asyncio
+import json
+import os
+import signal
+import socket
+import stat
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from .elffile import ELFFile
+
+DEFAULT_MAX_FILES = 64
+# Longest request line a client may send.
+REQUEST_LIMIT = 1024 * 1024
+
+class ServerError(Exception):
+    pass
+
+class ELFServer:
+    # Answers JSON Lines requests on a Unix domain socket from a warm set
+    # of parsed files. Each request is one line such as
+    #
+    #   {"id": 1, "op": "lookup", "path": "/usr/lib/libc.so.6", "name": "malloc"}
+    #
+    # and gets one line back: {"id": 1, "result": ...} or
+    # {"id": 1, "error": "..."}. Clients are served concurrently by
+    # asyncio and each request runs on a worker thread, so a cold parse
+    # holds up neither the event loop nor requests on other files (they
+    # share the interpreter, but a warm request does not wait for the
+    # parse to finish). Requests on one file run one at a time.
+    #
+    # Parsed files are kept in an LRU of at most max_files ELFFile
+    # contexts keyed by (path, device, inode, mtime, size): a file that
+    # is replaced or rewritten gets a new key, and its stale entry is
+    # closed on the next request for that path, once no request uses
+    # it. Files are mapped, so builds should replace outputs (as linkers
+    # do) rather than truncate them in place while they are being
+    # served.
+    def __init__(self, socket_path, max_files=DEFAULT_MAX_FILES) -> None:
+        self.socket_path = socket_path
+        self.max_files = max_files
+        self.hits = 0
+        self.misses = 0
+        # _lock guards _files, _keys and the counters; each entry has
+        # its own lock, held while a request uses the file.
+        self._lock = threading.Lock()
+        self._files = OrderedDict()
+        self._keys = {}
+        self._ops = {
+            "ping": self._ping,
+            "stats": self._stats,
+            "header": self._header,
+            "segments": self._segments,
+            "sections": self._sections,
+            "symbols": self._symbols,
+            "dynamic": self._dynamic,
+            "relocations": self._relocations,
+            "notes": self._notes,
+            "build_id": self._build_id,
+            "lookup": self._lookup,
+            "symbolize": self._symbolize,
+        }
+
+    @contextmanager
+    def use(self, path):
+        # The cached context for path, parsing the file on a miss, for
+        # the caller alone until the block ends.
+        while True:
+            with self._lock:
+                entry, stale = self._open(path)
+            self._retire(stale)
+            with entry.lock:
+                # Retired between the two locks: look the path up again.
+                if not entry.closed:
+                    yield entry.elffile
+                    return
+
+    def _open(self, path) -> tuple:
+        # (entry for path, entries it evicted); called with _lock held.
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        key = (path, st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size)
+        entry = self._files.get(key)
+        if entry is not None:
+            self._files.move_to_end(key)
+            self.hits += 1
+            return entry, []
+        self.misses += 1
+        stale = []
+        if path in self._keys:
+            stale.append(self._pop(self._keys[path]))
+        f = open(path, "rb")
+        try:
+            elffile = ELFFile(f)
+            if not elffile.elfHeader.is_elf():
+                raise ServerError("not an ELF file: " + path)
+        except Exception:
+            f.close()
+            raise
+        entry = self._files[key] = _Entry(f, elffile)
+        self._keys[path] = key
+        while len(self._files) > self.max_files:
+            stale.append(self._pop(next(iter(self._files))))
+        return entry, stale
+
+    def _pop(self, key) -> "_Entry":
+        entry = self._files.pop(key)
+        if self._keys.get(key[0]) == key:
+            del self._keys[key[0]]
+        return entry
+
+    def _retire(self, entries) -> None:
+        # Closes entries once the requests using them are done.
+        for entry in entries:
+            with entry.lock:
+                entry.closed = True
+                entry.elffile.close()
+                entry.f.close()
+
+    def close(self) -> None:
+        with self._lock:
+            entries = [self._pop(key) for key in list(self._files)]
+        self._retire(entries)
+
+    def handle(self, request) -> dict:
+        # The response to one decoded request.
+        response = {"id": request.get("id")}
+        op = self._ops.get(request.get("op"))
+        try:
+            if op is None:
+                raise ServerError("unknown op: %s" % request.get("op"))
+            response["result"] = op(request)
+        except KeyError as e:
+            response["error"] = "missing field: %s" % e
+        except Exception as e:
+            response["error"] = "%s: %s" % (type(e).__name__, e)
+        return response
+
+    def _respond(self, line) -> bytes:
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("request is not an object")
+        except ValueError as e:
+            return _error_line("bad request: %s" % e)
+        return (json.dumps(self.handle(request)) + "\n").encode()
+
+    def _ping(self, request) -> str:
+        return "pong"
+
+    def _stats(self, request) -> dict:
+        with self._lock:
+            return {"Files": len(self._files), "Hits": self.hits, "Misses": self.misses}
+
+    def _header(self, request) -> dict:
+        with self.use(request["path"]) as elffile:
+            return elffile.elfHeader.export_elf_header()["ELF Header"]
+
+    def _segments(self, request) -> list:
+        with self.use(request["path"]) as elffile:
+            return elffile.programHeader.export_program_header()["Program Header"]
+
+    def _sections(self, request) -> list:
+        with self.use(request["path"]) as elffile:
+            return elffile.sectionHeader.export_section_header()["Section Header"]
+
+    def _symbols(self, request) -> dict:
+        # Every symbol of every table, or of request["table"] only.
+        with self.use(request["path"]) as elffile:
+            st = elffile.symbolTable
+            tables = [request["table"]] if "table" in request else list(st.sym_sections)
+            return {k: list(st.iter_symbol_table(k)) for k in tables if k in st.sym_sections}
+
+    def _dynamic(self, request) -> list:
+        with self.use(request["path"]) as elffile:
+            return elffile.dynamicSection.export_dynamic_section()["Dynamic Section"]
+
+    def _relocations(self, request) -> list:
+        with self.use(request["path"]) as elffile:
+            return elffile.relocations.export_relocations()["Relocations"]
+
+    def _notes(self, request) -> list:
+        with self.use(request["path"]) as elffile:
+            return elffile.notes.export_notes()["Notes"]
+
+    def _build_id(self, request) -> str:
+        with self.use(request["path"]) as elffile:
+            return elffile.build_id()
+
+    def _lookup(self, request) -> dict:
+        # The symbol called request["name"] (in .dynsym unless "table"
+        # says otherwise), or None.
+        with self.use(request["path"]) as elffile:
+            table = request.get("table", ".dynsym")
+            i = elffile.find_symbol(request["name"], table)
+            return elffile.symbolTable.export_symbol(table, i) if i is not None else None
+
+    def _symbolize(self, request) -> list:
+        # {"Name", "Offset"} (or None) for each of request["addresses"].
+        addrs = [int(a, 16) if isinstance(a, str) else a for a in request["addresses"]]
+        with self.use(request["path"]) as elffile:
+            return [{"Name": found[0], "Offset": found[1]} if found is not None else None for found in elffile.lookup_addresses(addrs)]
+
+    async def _client(self, reader, writer) -> None:
+        # A client's requests are answered in order.
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (asyncio.LimitOverrunError, ValueError):
+                    # Where the next request starts is lost with the
+                    # rest of the line, so the connection ends here.
+                    writer.write(_error_line("bad request: longer than %d bytes" % REQUEST_LIMIT))
+                    await writer.drain()
+                    break
+                if not line:
+                    break
+                writer.write(await asyncio.to_thread(self._respond, line))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve_forever(self) -> None:
+        # A socket file left behind by an earlier server is replaced.
+        try:
+            if stat.S_ISSOCK(os.stat(self.socket_path).st_mode):
+                os.remove(self.socket_path)
+        except FileNotFoundError:
+            pass
+        server = await asyncio.start_unix_server(self._client, path=self.socket_path, limit=REQUEST_LIMIT)
+        os.chmod(self.socket_path, 0o600)
+        # SIGTERM stops the server like Ctrl-C, removing the socket.
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            os.remove(self.socket_path)
+            self.close()
+
+    def serve(self) -> None:
+        try:
+            asyncio.run(self.serve_forever())
+        except (KeyboardInterrupt, asyncio.CancelledError):
+            pass
+
+class _Entry:
+    # A parsed file the server keeps; closed once retired.
+    def __init__(self, f, elffile) -> None:
+        self.f = f
+        self.elffile = elffile
+        self.lock = threading.Lock()
+        self.closed = False
+
+def _error_line(message) -> bytes:
+    return (json.dumps({"id": None, "error": message}) + "\n").encode()
+
+def query(socket_path, request):
+    # Sends one request to a server and returns its result; raises
+    # ServerError if the server reports an error.
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        s.connect(socket_path)
+        s.sendall((json.dumps(request) + "\n").encode())
+        with s.makefile("rb") as f:
+            response = json.loads(f.readline())
+    if "error" in response:
+        raise ServerError(response["error"])
+    return response["result"]
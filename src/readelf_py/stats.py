@@ -0,0 +1,81 @@
+import json
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+class Stats:
+    # Per-stage wall time, reader activity and peak allocation.
+    #
+    #   stats = Stats(elffile.elf, trace_memory=True, hook=print)
+    #   with stats.stage("symbol decode"):
+    #       ...
+    #
+    # Reads, seeks and bytes read are the differences of the ELFReader
+    # counters across the stage, names decoded in place from a mapped
+    # string table included. The reader may be set during the first
+    # stage (the one that opens the file). Peak memory is only measured
+    # with trace_memory, because tracemalloc slows everything down. hook,
+    # if given, is called with each stage record as soon as the stage
+    # ends.
+    def __init__(self, reader=None, trace_memory=False, hook=None) -> None:
+        self.reader = reader
+        self.trace_memory = trace_memory
+        self.hook = hook
+        self.records = []
+
+    def _counters(self) -> tuple:
+        if self.reader is None:
+            return 0, 0, 0
+        return self.reader.bytes_read, self.reader.reads, self.reader.seeks
+
+    @contextmanager
+    def stage(self, name):
+        tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        counters = self._counters()
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            elapsed = time.perf_counter() - start
+            tmp = {}
+            tmp["Stage"] = name
+            tmp["Time"] = elapsed
+            tmp["Bytes read"], tmp["Reads"], tmp["Seeks"] = (b - a for a, b in zip(counters, self._counters()))
+            tmp["Peak memory"] = tracemalloc.get_traced_memory()[1] - base if self.trace_memory else None
+            if tracing:
+                tracemalloc.stop()
+            self.records.append(tmp)
+            if self.hook is not None:
+                self.hook(tmp)
+
+    def print_stats(self, file=None) -> None:
+        file = file or sys.stderr
+        print("", file=file)
+        print("Stage               Time (ms)   Bytes read     Reads     Seeks  Peak (KiB)", file=file)
+        total = {"Time": 0, "Bytes read": 0, "Reads": 0, "Seeks": 0}
+        for tmp in self.records:
+            print(self._format_record(tmp), file=file)
+            for k in total:
+                total[k] += tmp[k]
+        peaks = [tmp["Peak memory"] for tmp in self.records if tmp["Peak memory"] is not None]
+        print(self._format_record({"Stage": "total", "Peak memory": max(peaks) if peaks else None} | total), file=file)
+
+    def _format_record(self, tmp) -> str:
+        peak = "%.1f" % (tmp["Peak memory"] / 1024) if tmp["Peak memory"] is not None else "-"
+        return "%-16s %12.3f %12d %9d %9d %11s" % (tmp["Stage"], tmp["Time"] * 1000, tmp["Bytes read"], tmp["Reads"], tmp["Seeks"], peak)
+
+    def export_stats(self) -> dict:
+        export = {}
+        export["Stats"] = list(self.records)
+        return export
+
+    def write_json(self, file=None) -> None:
+        file = file or sys.stderr
+        json.dump(self.export_stats(), file, indent=4)
+        print("", file=file)
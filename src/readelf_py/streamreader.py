@@ -0,0 +1,215 @@
+import struct
+from bisect import bisect_right
+
+from .elfreader import ELFReader
+from .elfstructs import get_structs
+
+PT_LOAD = 0x1
+PT_DYNAMIC = 0x2
+PT_INTERP = 0x3
+PT_NOTE = 0x4
+
+CHUNK_SIZE = 1024 * 1024
+# Default bound of the bytes a StreamReader keeps.
+MAX_BYTES = 256 * 1024 * 1024
+
+class StreamError(Exception):
+    pass
+
+class StreamReader(ELFReader):
+    # ELFReader over a stream that can only be read front to back (a
+    # pipe, stdin, a member of a tar or ar archive). It never seeks.
+    #
+    # Reads are served from the bytes kept so far; a read past them
+    # pulls the stream forward to it. While passing, only the regions
+    # the parsers may come back to are kept:
+    #   - the ELF and program headers are read first and planned from:
+    #     once they are known, the file contents of the PT_LOAD segments
+    #     are dropped unless keep_loaded (they hold code and data, but
+    #     also .dynsym, .dynstr, .rela.* and the hash tables, so any
+    #     output that decodes symbols, relocations or dynamic strings,
+    #     or dumps sections, needs them);
+    #   - the PT_NOTE, PT_INTERP and PT_DYNAMIC contents are always kept;
+    #   - everything else (the headers, the section headers and the
+    #     non-allocated sections such as .symtab and .shstrtab) is kept.
+    # A read of a dropped range raises StreamError, and so does keeping
+    # more than max_bytes.
+    def __init__(self, stream, size=None, max_bytes=MAX_BYTES, keep_loaded=True) -> None:
+        self.elf = stream
+        self._data = None
+        self.buf = None
+        self.reads = 0
+        self.seeks = 0
+        self.bytes_read = 0
+        self.max_bytes = max_bytes
+        self.keep_loaded = keep_loaded
+        self.kept = 0
+        self.pos = 0
+        self._size = size
+        # Kept pieces: parallel lists of start offsets and bytes.
+        self._starts = []
+        self._pieces = []
+        # Sorted, disjoint (start, end) ranges to drop, once planned.
+        self._drop = []
+        self._planned = False
+        self._plan_at = 64
+
+    @property
+    def size(self) -> int:
+        if self._size is None:
+            self._advance(None)
+        return self._size
+
+    def _advance(self, target) -> None:
+        # Reads the stream up to offset target (or to its end).
+        while (target is None or self.pos < target) and (self._size is None or self.pos < self._size):
+            end = self.pos + CHUNK_SIZE
+            if target is not None:
+                end = min(end, target)
+            if not self._planned:
+                end = min(end, self._plan_at)
+            if self._size is not None:
+                end = min(end, self._size)
+            chunk = self.elf.read(end - self.pos)
+            if not chunk:
+                self._size = self.pos
+                break
+            self._keep(self.pos, chunk)
+            self.pos += len(chunk)
+            if not self._planned and self.pos >= self._plan_at:
+                self._plan()
+
+    def _keep(self, offset, chunk) -> None:
+        # Stores the parts of chunk outside the drop ranges.
+        end = offset + len(chunk)
+        start = offset
+        for drop_start, drop_end in self._drop:
+            if drop_end <= start or drop_start >= end:
+                continue
+            if drop_start > start:
+                self._store(start, chunk[start - offset:drop_start - offset])
+            start = max(start, drop_end)
+        if start < end:
+            self._store(start, chunk[start - offset:])
+
+    def _store(self, offset, data) -> None:
+        self.kept += len(data)
+        if self.kept > self.max_bytes:
+            raise StreamError("more than %d bytes would have to be kept in memory" % self.max_bytes)
+        self._starts.append(offset)
+        self._pieces.append(bytes(data))
+
+    def _plan(self) -> None:
+        # Called once the ELF header is in, then again once the program
+        # headers are. Drop ranges only ever lie ahead of the stream.
+        head = self._read_kept(0, 64)
+        if len(head) < 52 or head[:4] != b"\x7fELF" or head[4] not in (1, 2):
+            self._planned = True
+            return
+        structs = get_structs(head[4], ">" if head[5] == 2 else "<")
+        ehdr = structs.ehdr.unpack_from(head, 16)
+        phoff, phentsize, phnum = ehdr[4], ehdr[8], ehdr[9]
+        if not phnum or phentsize < structs.phdr.size:
+            self._planned = True
+            return
+        phdr_end = phoff + phnum * phentsize
+        if self.pos < phdr_end:
+            self._plan_at = phdr_end
+            return
+        self._planned = True
+        if self.keep_loaded:
+            return
+        table = self._read_kept(phoff, phnum * phentsize)
+        if len(table) < phnum * phentsize:
+            return
+        loads, keeps = [], []
+        for i in range(phnum):
+            ph = dict(zip(structs.phdr_fields, structs.phdr.unpack_from(table, i * phentsize)))
+            if ph["p_type"] == PT_LOAD:
+                loads.append((ph["p_offset"], ph["p_offset"] + ph["p_filesz"]))
+            elif ph["p_type"] in (PT_NOTE, PT_INTERP, PT_DYNAMIC):
+                keeps.append((ph["p_offset"], ph["p_offset"] + ph["p_filesz"]))
+        self._drop = _subtract(_merge((max(s, self.pos), e) for s, e in loads if e > self.pos), keeps)
+
+    def _read_kept(self, offset, size) -> bytes:
+        # The kept bytes at offset, cut short at the first gap.
+        i = bisect_right(self._starts, offset) - 1
+        parts = []
+        while size > 0 and 0 <= i < len(self._starts):
+            start, piece = self._starts[i], self._pieces[i]
+            if not start <= offset < start + len(piece):
+                break
+            part = piece[offset - start:offset - start + size]
+            parts.append(part)
+            offset += len(part)
+            size -= len(part)
+            i += 1
+        return parts[0] if len(parts) == 1 else b"".join(parts)
+
+    def read(self, offset, size):
+        # Returns bytes, as the seek()/read() path of ELFReader does.
+        self.reads += 1
+        self._advance(offset + size)
+        end = min(offset + size, self.pos)
+        if offset >= end:
+            return b""
+        i = bisect_right(self._starts, offset) - 1
+        if i >= 0 and offset + size <= self._starts[i] + len(self._pieces[i]):
+            data = self._pieces[i][offset - self._starts[i]:offset - self._starts[i] + size]
+        else:
+            data = self._read_kept(offset, end - offset)
+            if len(data) < end - offset:
+                raise StreamError("bytes 0x%x-0x%x of the stream were not kept" % (offset, end))
+        self.bytes_read += len(data)
+        return data
+
+    def unpack_from(self, fmt, offset) -> tuple:
+        if isinstance(fmt, str):
+            fmt = struct.Struct(fmt)
+        data = self.read(offset, fmt.size)
+        return fmt.unpack_from(data)
+
+    def read_cstring(self, offset) -> bytes:
+        # Grows the read until a NUL, stopping at the end of the kept
+        # bytes rather than failing on a dropped range that follows.
+        self.reads += 1
+        size = 64
+        while True:
+            self._advance(offset + size)
+            data = self._read_kept(offset, size)
+            end = data.find(b"\x00")
+            if end >= 0:
+                self.bytes_read += end + 1
+                return bytes(data[:end])
+            if len(data) < size:
+                if offset + len(data) < self.pos:
+                    raise StreamError("bytes 0x%x-0x%x of the stream were not kept" % (offset + len(data), offset + size))
+                return None
+            size *= 4
+
+    def close(self) -> None:
+        self._starts = []
+        self._pieces = []
+
+def _merge(ranges) -> list:
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        elif start < end:
+            merged.append((start, end))
+    return merged
+
+def _subtract(ranges, holes) -> list:
+    # ranges minus holes, both lists of (start, end).
+    result = []
+    for start, end in ranges:
+        for hole_start, hole_end in _merge(holes):
+            if hole_end <= start or hole_start >= end:
+                continue
+            if hole_start > start:
+                result.append((start, hole_start))
+            start = max(start, hole_end)
+        if start < end:
+            result.append((start, end))
+    return result
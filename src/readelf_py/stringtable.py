@@ -0,0 +1,36 @@
+class StringTable:
+    # A string table section (.strtab, .dynstr, .shstrtab, ...).
+    # The table is located once; each offset is decoded on first use and
+    # then served from a memo. Decodes made in place count towards the
+    # reader's reads and bytes_read, as read_cstring() does.
+    def __init__(self, elf, offset, size) -> None:
+        self.elf = elf
+        self.in_place = elf.data is not None
+        if self.in_place:
+            # Search the mapping in place instead of copying the table.
+            self.data = elf.data
+            self.base = offset
+        else:
+            self.data = elf.read(offset, size)
+            self.base = 0
+        self.size = size
+        self.cache = {}
+
+    def get(self, index) -> str:
+        name = self.cache.get(index)
+        if name is None:
+            name = self._decode(index)
+            self.cache[index] = name
+        return name
+
+    def _decode(self, index) -> str:
+        if index >= self.size:
+            return ''
+        start = self.base + index
+        end = self.data.find(b'\x00', start, self.base + self.size)
+        if end < 0:
+            end = self.base + self.size
+        if self.in_place:
+            self.elf.reads += 1
+            self.elf.bytes_read += end + 1 - start
+        return self.data[start:end].decode("utf-8", errors="replace")
@@ -0,0 +1,44 @@
+from .intervalindex import IntervalIndex
+
+class AddressIndex:
+    # Maps addresses to the FUNC/OBJECT symbol covering them.
+    # Built from .symtab when it has any such symbols, otherwise from
+    # .dynsym. Zero-sized symbols only match their exact address.
+    _TYPES = (0x1, 0x2, 0xa) # OBJECT, FUNC, GNU_IFUNC
+
+    def __init__(self, symbolTable) -> None:
+        self.symbolTable = symbolTable
+        self.table = None
+        intervals = []
+        for k in (".symtab", ".dynsym"):
+            if k not in symbolTable.sym_sections:
+                continue
+            v = symbolTable.get_table(k)
+            for t in self._TYPES:
+                for i in v.select(type=t):
+                    if v.st_shndx[i] == 0:
+                        continue
+                    value = v.st_value[i]
+                    intervals.append((value, value + max(v.st_size[i], 1), i))
+            if intervals:
+                self.table = k
+                break
+        self.index = IntervalIndex(intervals)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def lookup(self, addr) -> tuple:
+        # (name, offset into the symbol, symbol index), or None.
+        i = self.index.find_one(addr)
+        if i is None:
+            return None
+        v = self.symbolTable.get_table(self.table)
+        return self.symbolTable.symbol_name(self.table, i), addr - v.st_value[i], i
+
+    def lookup_many(self, addrs) -> list:
+        # Each distinct address is resolved once, in ascending order.
+        results = {}
+        for addr in sorted(set(addrs)):
+            results[addr] = self.lookup(addr)
+        return [results[addr] for addr in addrs]
@@ -0,0 +1,317 @@
+from itertools import compress
+from operator import itemgetter
+
+from .sectionheader import SectionHeader
+from .symbolindex import AddressIndex
+from .elfheader import ELFHeader
+from .elfreader import open_reader
+from .hashtable import SHT_GNU_HASH, SHT_HASH, GnuHashTable, SysvHashTable
+
+SHN_UNDEF = 0
+
+class Symbol:
+    # Row view of one entry of a SymbolColumns table.
+    # Also indexable by field name, like the dicts it replaces.
+    __slots__ = ("st_name", "st_value", "st_size", "st_info", "st_other", "st_shndx")
+
+    def __init__(self, st_name, st_value, st_size, st_info, st_other, st_shndx) -> None:
+        self.st_name = st_name
+        self.st_value = st_value
+        self.st_size = st_size
+        self.st_info = st_info
+        self.st_other = st_other
+        self.st_shndx = st_shndx
+
+    def __getitem__(self, key):
+        return getattr(self, key)
+
+class SymbolColumns:
+    # One symbol table stored as parallel arrays, one per Elf_Sym field.
+    def __init__(self, columns) -> None:
+        self.st_name = columns["st_name"]
+        self.st_value = columns["st_value"]
+        self.st_size = columns["st_size"]
+        self.st_info = columns["st_info"]
+        self.st_other = columns["st_other"]
+        self.st_shndx = columns["st_shndx"]
+
+    def __len__(self) -> int:
+        return len(self.st_name)
+
+    def __getitem__(self, i) -> Symbol:
+        return Symbol(self.st_name[i], self.st_value[i], self.st_size[i], self.st_info[i], self.st_other[i], self.st_shndx[i])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def items(self):
+        return enumerate(self)
+
+    def select(self, bind=None, type=None, shndx=None) -> list:
+        # Indices of the symbols matching every given criterion.
+        # The masks are built with bytes.translate, so filtering runs in C.
+        n = len(self)
+        masks = []
+        if bind is not None:
+            table = bytes(1 if i >> 4 == bind else 0 for i in range(256))
+            masks.append(self.st_info.tobytes().translate(table))
+        if type is not None:
+            table = bytes(1 if i & 0xf == type else 0 for i in range(256))
+            masks.append(self.st_info.tobytes().translate(table))
+        if shndx is not None:
+            masks.append(bytes(x == shndx for x in self.st_shndx))
+        if not masks:
+            return list(range(n))
+        mask = int.from_bytes(masks[0], "little")
+        for m in masks[1:]:
+            mask &= int.from_bytes(m, "little")
+        return list(compress(range(n), mask.to_bytes(n, "little")))
+
+def parse_symbol_table(elf, structs, v) -> SymbolColumns:
+    # Decodes the symbol table with section header v, whatever its name,
+    # without building a SymbolTable (which decodes every section name).
+    count = v["sh_size"] // v["sh_entsize"]
+    data = elf.read(v["sh_offset"], count * v["sh_entsize"])
+    return SymbolColumns(structs.unpack_columns(data, count, v["sh_entsize"], structs.sym_columns))
+
+class SymbolTable:
+    _ST_TYPE = {
+        0x0 : "NOTYPE",
+        0x1 : "OBJECT",
+        0x2 : "FUNC",
+        0x3 : "SECTION",
+        0x4 : "FILE",
+        0x5 : "COMMON",
+        0x6 : "TLS",
+        0x7 : "NUM",
+        0x8 : "RELC",
+        0x9 : "SRELC",
+        0xa : "LOOS",
+        0xb : "HIOS",
+        0xc : "LOPROC",
+        0xd : "HIPROC",
+    }
+    
+    def __init__(self, elf, sectionHeader=None, elfHeader=None, tables=None, columns=None) -> None:
+        # tables restricts the view to some of ".symtab"/".dynsym".
+        # Each table is decoded only when it is first used; columns
+        # restores tables decoded before (see elfcache).
+        self.elf = open_reader(elf)
+        self.elfHeader = elfHeader if elfHeader is not None else ELFHeader(self.elf)
+        self.sectionHeader = sectionHeader if sectionHeader is not None else SectionHeader(self.elf, self.elfHeader)
+        s_header = self.sectionHeader.s_headers
+        self.s_header_dic = {}
+        for i in s_header:
+            name = self.sectionHeader.get_section_name(i["sh_name"])
+            self.s_header_dic[name] = i
+        
+        if tables is None:
+            tables = (".symtab", ".dynsym")
+        self.sym_sections = {}
+        for i in self.s_header_dic:
+            if i in tables:
+                self.sym_sections[i] = self.s_header_dic[i]
+        self._tables = {k: v for k, v in (columns or {}).items() if k in self.sym_sections}
+        self._address_index = None
+        self._hash_tables = {}
+        self._name_indexes = {}
+        structs = self.elfHeader.structs
+        self._row_order = itemgetter(*(structs.sym_fields.index(f) for f in Symbol.__slots__))
+        
+    def decoded_tables(self) -> dict:
+        # The tables decoded so far, by name.
+        return dict(self._tables)
+
+    @property
+    def SymTable(self) -> dict:
+        return {k: self.get_table(k) for k in self.sym_sections}
+
+    def get_table(self, k) -> SymbolColumns:
+        table = self._tables.get(k)
+        if table is None:
+            table = self._parse_symbol_table(self.sym_sections[k])
+            self._tables[k] = table
+        return table
+
+    def iter_symbols(self, k):
+        # Yields the symbols of one table without materialising it.
+        if k in self._tables:
+            yield from self._tables[k]
+            return
+        v = self.sym_sections[k]
+        count = v["sh_size"] // v["sh_entsize"]
+        row = self._row_order
+        for fields in self.elf.iter_unpack(self.elfHeader.structs.sym, v["sh_offset"], count, v["sh_entsize"]):
+            yield Symbol(*row(fields))
+
+    def _parse_symbol_table(self, v) -> SymbolColumns:
+        return parse_symbol_table(self.elf, self.elfHeader.structs, v)
+    
+    def print_symbol_table(self, tables=None) -> None:
+        for k in self.sym_sections:
+            if tables is not None and k not in tables:
+                continue
+            v = self.get_table(k)
+            print("Symbol table '" + k + "' contains " + str(len(v)) + " entries:")
+            print("   Num:    Value         Size Type    Bind   Vis      Ndx Name")
+            for i, j in v.items():
+                print(self._format_symbol(k, i, j))
+            print("")
+
+    def format_symbol(self, k, i) -> str:
+        # One line of print_symbol_table for symbol i of table k.
+        return self._format_symbol(k, i, self.get_symbol(k, i))
+
+    def _format_symbol(self, k, i, j) -> str:
+        return "%6d: %016x %4x %-7s %-6s %-7s %4s %s" % (i, j["st_value"], j["st_size"], self._get_symbol_type(j["st_info"]), self._get_symbol_bind(j["st_info"]), self._get_symbol_visibility(j["st_other"]), self._get_symbol_Ndx(j["st_shndx"]), self._get_symbol_name(k, j))
+            
+    def export_symbol_table(self) -> dict:
+        export = {}
+        export["Symbol Table"] = []
+        for k in self.sym_sections:
+            export["Symbol Table"].append({k: list(self.iter_symbol_table(k))})
+        return export
+    
+    def iter_symbol_table(self, k):
+        for i, j in enumerate(self.iter_symbols(k)):
+            yield self._export_symbol(k, i, j)
+
+    def export_symbol(self, k, i) -> dict:
+        # The iter_symbol_table record of symbol i of table k alone.
+        return self._export_symbol(k, i, self.get_symbol(k, i))
+
+    def _export_symbol(self, k, i, j) -> dict:
+        tmp = {}
+        tmp["Num"] = i
+        tmp["Value"] = j["st_value"]
+        tmp["Size"] = j["st_size"]
+        tmp["Type"] = self._get_symbol_type(j["st_info"])
+        tmp["Bind"] = self._get_symbol_bind(j["st_info"])
+        tmp["Vis"] = self._get_symbol_visibility(j["st_other"])
+        tmp["Ndx"] = j["st_shndx"]
+        tmp["Name"] = self._get_symbol_name(k, j)
+        return tmp
+    
+    def _get_symbol_Ndx(self, x) -> str:
+        if x == 0:
+            return "UND"
+        elif x == 0xfff1:
+            return "ABS"
+        elif x == 0xfff2:
+            return "COM"
+        else:
+            return str(x)
+        
+    def _get_symbol_type(self, x) -> str:
+        return x
+        
+    def _get_symbol_bind(self, x) -> str:
+        if x >> 4 == 0:
+            return "LOCAL"
+        elif x >> 4 == 1:
+            return "GLOBAL"
+        elif x >> 4 == 2:
+            return "WEAK"
+        elif x >> 4 == 10:
+            return "LOOS"
+        elif x >> 4 == 12:
+            return "HIOS"
+        elif x >> 4 == 13:
+            return "LOPROC"
+        elif x >> 4 == 15:
+            return "HIPROC"
+        else :
+            return x
+    
+    def _get_symbol_visibility(self, x) -> str:
+        if x == 0:
+            return "DEFAULT"
+        elif x == 1:
+            return "INTERNAL"
+        elif x == 2:
+            return "HIDDEN"
+        elif x == 3:
+            return "PROTECTED"
+        elif x == 4:
+            return "EXPORTED"
+        elif x == 5:
+            return "SINGLETON"
+        elif x == 6:
+            return "ELIMINATE"
+        else :
+            return x
+
+    def symbol_name(self, k, i) -> str:
+        # Name of symbol i of table k, without decoding the whole table.
+        strtab = self.sectionHeader.get_string_table(self.s_header_dic[k]["sh_link"])
+        if k in self._tables:
+            return strtab.get(self._tables[k].st_name[i])
+        return strtab.get(self.get_symbol(k, i).st_name)
+
+    def get_symbol(self, k, i) -> Symbol:
+        # Symbol i of table k, decoding only that entry if the table
+        # has not been loaded.
+        if k in self._tables:
+            return self._tables[k][i]
+        v = self.sym_sections[k]
+        return Symbol(*self._row_order(self.elf.unpack_from(self.elfHeader.structs.sym, v["sh_offset"] + i * v["sh_entsize"])))
+
+    def find_symbol(self, name, k=".dynsym") -> int:
+        # Index of the symbol called name that table k defines, or None:
+        # undefined (SHN_UNDEF) entries, i.e. imports, never match, so
+        # "does this file export name" gets the same answer whether the
+        # file's own .gnu.hash or .hash is used or, when there is none,
+        # a dict built on first use.
+        if k not in self.sym_sections:
+            return None
+        table = self.hash_table(k)
+        if table is not None:
+            return table.lookup(name, lambda i: self.symbol_name(k, i), lambda i: self.get_symbol(k, i).st_shndx != SHN_UNDEF)
+        return self.name_index(k).get(name)
+
+    def hash_table(self, k):
+        if k not in self._hash_tables:
+            self._hash_tables[k] = None
+            sections = self.sectionHeader.s_headers
+            link = next(i for i, sh in enumerate(sections) if sh is self.sym_sections[k])
+            for sh_type, cls in ((SHT_GNU_HASH, GnuHashTable), (SHT_HASH, SysvHashTable)):
+                for sh in sections:
+                    if sh["sh_type"] == sh_type and sh["sh_link"] == link:
+                        self._hash_tables[k] = cls(self.elf, self.elfHeader.structs, sh)
+                        return self._hash_tables[k]
+        return self._hash_tables[k]
+
+    def name_index(self, k) -> dict:
+        # name -> index of the first defined symbol with that name.
+        index = self._name_indexes.get(k)
+        if index is None:
+            index = {}
+            v = self.get_table(k)
+            strtab = self.sectionHeader.get_string_table(self.s_header_dic[k]["sh_link"])
+            for i, (st_name, st_shndx) in enumerate(zip(v.st_name, v.st_shndx)):
+                if st_shndx != SHN_UNDEF:
+                    index.setdefault(strtab.get(st_name), i)
+            self._name_indexes[k] = index
+        return index
+
+    def address_index(self) -> AddressIndex:
+        if self._address_index is None:
+            self._address_index = AddressIndex(self)
+        return self._address_index
+
+    def resolve_names(self, tables=None) -> None:
+        # Decodes every symbol name (of tables, default all) into the
+        # shared string table caches.
+        for k in self.sym_sections:
+            if tables is not None and k not in tables:
+                continue
+            strtab = self.sectionHeader.get_string_table(self.s_header_dic[k]["sh_link"])
+            for st_name in self.get_table(k).st_name:
+                strtab.get(st_name)
+
+    def _get_symbol_name(self, index, sym) -> str:
+        if index not in self.sym_sections:
+            return ""
+        strtab = self.sectionHeader.get_string_table(self.s_header_dic[index]["sh_link"])
+        return strtab.get(sym["st_name"])
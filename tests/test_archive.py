@@ -0,0 +1,119 @@
+import io
+import struct
+import tarfile
+
+import pytest
+
+from elfgen import generate_elf
+from readelf_py.archive import AR_MAGIC, ArArchive, ArchiveError, iter_members, parse_symbol_index
+from readelf_py.cli import main
+
+ELF = generate_elf(sections=2, symbols=4)
+LONG_NAME = "a_member_name_longer_than_16.o"
+
+def ar_header(name, size) -> bytes:
+    return b"%-16s%-12d%-6d%-6d%-8o%-10d`\n" % (name.encode(), 0, 0, 0, 0o644, size)
+
+def ar_member(name, data) -> bytes:
+    return ar_header(name, len(data)) + data + (b"\n" if len(data) % 2 else b"")
+
+def gnu_archive(members, symbols) -> bytes:
+    # members: [(name, data)]; symbols: [(symbol, member number)]. Writes
+    # the "/" symbol index and the "//" long name table the way GNU ar
+    # does, names longer than 15 characters going to "//".
+    strings = b"".join(name.encode() + b"\0" for name, _ in symbols)
+    index_size = 4 + 4 * len(symbols) + len(strings)
+    long_names = b""
+    headers = []
+    for name, _ in members:
+        if len(name) > 15:
+            headers.append("/%d" % len(long_names))
+            long_names += name.encode() + b"/\n"
+        else:
+            headers.append(name + "/")
+    offset = len(AR_MAGIC) + 60 + index_size + index_size % 2
+    if long_names:
+        offset += 60 + len(long_names) + len(long_names) % 2
+    offsets = []
+    for _, data in members:
+        offsets.append(offset)
+        offset += 60 + len(data) + len(data) % 2
+    index = struct.pack(">I", len(symbols)) + b"".join(struct.pack(">I", offsets[m]) for _, m in symbols) + strings
+    out = AR_MAGIC + ar_member("/", index)
+    if long_names:
+        out += ar_member("//", long_names)
+    for header, (_, data) in zip(headers, members):
+        out += ar_member(header, data)
+    return out
+
+def test_ar_gnu_names_and_index():
+    members = [("a.o", ELF), (LONG_NAME, b"odd"), ("b.o", ELF)]
+    data = gnu_archive(members, [("foo", 0), ("bar", 1), ("foo", 2)])
+    assert [(name, member.read()) for name, member in iter_members(io.BytesIO(data))] == members
+    archive = ArArchive(io.BytesIO(data), "lib.a")
+    assert [name for name, _, _, _ in archive.members] == ["a.o", LONG_NAME, "b.o"]
+    assert archive.find_symbol("foo") == ["a.o", "b.o"]
+    assert archive.find_symbol("bar") == [LONG_NAME]
+    assert archive.find_symbol("baz") == []
+    for (name, _, data_offset, size), (_, contents) in zip(archive.members, members):
+        assert data[data_offset:data_offset + size] == contents
+    assert archive.export_index() == {"Archive Index": [
+        {"Member": "a.o", "Offset": archive.members[0][1], "Symbols": ["foo"]},
+        {"Member": LONG_NAME, "Offset": archive.members[1][1], "Symbols": ["bar"]},
+        {"Member": "b.o", "Offset": archive.members[2][1], "Symbols": ["foo"]},
+    ]}
+
+def test_ar_without_index():
+    archive = ArArchive(io.BytesIO(AR_MAGIC + ar_member("a.o/", ELF)))
+    assert not archive.symbols
+    assert archive.find_symbol("foo") == []
+
+def test_sym64_index():
+    strings = b"alpha\0beta\0"
+    data = struct.pack(">QQQ", 2, 0x1_0000_0000, 0x44) + strings
+    assert parse_symbol_index(data, wide=True) == [("alpha", 0x1_0000_0000), ("beta", 0x44)]
+    with pytest.raises(ArchiveError):
+        parse_symbol_index(struct.pack(">I", 1000), wide=False)
+
+def test_ar_bsd_names():
+    # "#1/len": the name is the first len bytes of the member data.
+    def bsd_member(name, data):
+        name = name.encode()
+        return ar_member("#1/%d" % len(name), name + data)
+    data = AR_MAGIC + bsd_member("__.SYMDEF SORTED", b"\0" * 8) + bsd_member(LONG_NAME, b"xyz") + bsd_member("c.o", ELF)
+    assert [(name, member.read()) for name, member in iter_members(io.BytesIO(data))] == [(LONG_NAME, b"xyz"), ("c.o", ELF)]
+    archive = ArArchive(io.BytesIO(data))
+    name, _, data_offset, size = archive.members[1]
+    assert (name, data[data_offset:data_offset + size]) == ("c.o", ELF)
+
+@pytest.mark.parametrize("member", [
+    b"x" * 60,
+    ar_header("a.o", 4)[:48] + b"4x" + b" " * 8 + b"`\n" + b"data",
+    ar_member("#1/x", b"data"),
+    ar_member("#1/", b"data"),
+    ar_member("#1/5", b"data"),
+], ids=["header", "size", "bsd-name", "bsd-empty", "bsd-too-long"])
+def test_ar_malformed(member):
+    with pytest.raises(ArchiveError):
+        list(iter_members(io.BytesIO(AR_MAGIC + member)))
+
+def test_tar_members():
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w:gz") as tar:
+        for name, data in (("usr/bin/tool", ELF), ("README", b"text")):
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    members = [(name, member.read()) for name, member in iter_members(io.BytesIO(buf.getvalue()))]
+    assert members == [("usr/bin/tool", ELF), ("README", b"text")]
+
+def test_cli_archive_in_member_order(tmp_path, capsys):
+    members = [("m%02d.o" % i, generate_elf(sections=2, symbols=4 + i)) for i in range(20)]
+    path = tmp_path / "lib.a"
+    path.write_bytes(gnu_archive(members + [("notes.txt", b"not an ELF file")], [("sym_1", 0)]))
+    main(["--archive", str(path), "-s", "-j", "2"])
+    out = capsys.readouterr().out
+    files = [line for line in out.splitlines() if line.startswith("File: ")]
+    assert files == ["File: %s(%s)" % (path, name) for name, _ in members]
+    main(["--archive", str(path), "--find-symbol", "sym_1", "--find-symbol", "nope"])
+    assert capsys.readouterr().out == "sym_1: m00.o\nnope: not found\n"
@@ -0,0 +1,57 @@
+import io
+import json
+import os
+
+import pytest
+
+from elfgen import generate_elf
+from readelf_py import ELFFile
+from readelf_py.batch import SpooledExport, analyse, write_result
+from readelf_py.cli import main
+
+@pytest.mark.parametrize("fail", [False, True])
+def test_analyse_closes_file(fail):
+    closed = []
+    def load():
+        f = ELFFile(generate_elf(sections=2, symbols=4))
+        f.on_close = closed.append
+        return f
+    def display(elffile, args):
+        print("symbols: %d" % len(elffile.symbolTable.get_table(".symtab")))
+        if fail:
+            raise ValueError("bad table")
+    path, text, result, error = analyse("a.out", load, display, None, "json")
+    assert text == "symbols: 4\n"
+    assert len(closed) == 1
+    assert error == ("ValueError: bad table" if fail else None)
+    assert (result is None) == fail
+
+def test_jsonl_is_spooled_to_a_file():
+    data = generate_elf(sections=2, symbols=4)
+    path, text, result, error = analyse("a.out", lambda: ELFFile(data), lambda elffile, args: None, None, "jsonl")
+    assert isinstance(result, SpooledExport)
+    out = io.StringIO()
+    write_result(result, out)
+    assert not os.path.exists(result.path)
+    expected = io.StringIO()
+    ELFFile(data).export_json_lines(expected, {"File": "a.out"})
+    assert out.getvalue() == expected.getvalue()
+
+def test_failed_jsonl_export_removes_spool(monkeypatch):
+    spools = []
+    def fail(self, f, extra=None):
+        spools.append(f.name)
+        raise ValueError("bad record")
+    monkeypatch.setattr(ELFFile, "export_json_lines", fail)
+    path, text, result, error = analyse("a.out", lambda: ELFFile(generate_elf(sections=2, symbols=4)),
+                                        lambda elffile, args: None, None, "jsonl")
+    assert (result, error) == (None, "ValueError: bad record")
+    assert spools and not os.path.exists(spools[0])
+
+def test_cli_batch_jsonl(tmp_path):
+    for i in range(3):
+        (tmp_path / ("lib%d.so" % i)).write_bytes(generate_elf(sections=2, symbols=4 + i))
+    export = tmp_path / "out.jsonl"
+    main(["--batch", str(tmp_path), "-j", "2", "-s", "--export", str(export), "--export-format", "jsonl"])
+    records = [json.loads(line) for line in export.read_text().splitlines()]
+    assert {record["File"] for record in records} == {str(tmp_path / ("lib%d.so" % i)) for i in range(3)}
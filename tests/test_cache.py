@@ -0,0 +1,145 @@
+import os
+import zlib
+
+import pytest
+
+from elfgen import generate_elf
+from readelf_py import ELFFile
+from readelf_py.elfcache import _HEADER, ELFCache, decode_entry, encode_entry, restore_entry
+from readelf_py.elfreader import ELFReader
+from readelf_py.symboltable import Symbol
+
+LAYOUTS = [(1, "<"), (1, ">"), (2, "<"), (2, ">")]
+LAYOUT_IDS = ["32le", "32be", "64le", "64be"]
+
+def parse_all(f) -> ELFFile:
+    f.load_all()
+    for k in f.symbolTable.sym_sections:
+        f.symbolTable.get_table(k)
+    return f
+
+def entries(directory) -> list:
+    return sorted(name for name in os.listdir(directory) if name.endswith(".elfcache"))
+
+@pytest.fixture
+def elf_path(tmp_path):
+    path = tmp_path / "a.out"
+    path.write_bytes(generate_elf(sections=4, symbols=100, imports=("printf",), hash_style="gnu"))
+    return path
+
+@pytest.mark.parametrize("elf_class,byteorder", LAYOUTS, ids=LAYOUT_IDS)
+def test_entry_round_trip(elf_class, byteorder):
+    data = generate_elf(elf_class=elf_class, byteorder=byteorder, sections=4, symbols=100, imports=("printf",))
+    f = parse_all(ELFFile(data))
+    restored = restore_entry(decode_entry(encode_entry(f)), data)
+    for name in ("programHeader", "sectionHeader", "symbolTable"):
+        assert name in restored.__dict__
+    assert restored.programHeader.p_headers == f.programHeader.p_headers
+    assert restored.sectionHeader.s_headers == f.sectionHeader.s_headers
+    assert restored.sectionHeader.string_caches() == f.sectionHeader.string_caches()
+    for k, table in f.symbolTable.decoded_tables().items():
+        restored_table = restored.symbolTable.get_table(k)
+        for field in Symbol.__slots__:
+            assert getattr(restored_table, field) == getattr(table, field)
+    assert restored.export() == ELFFile(data).export()
+
+def test_hit_matches_cold_parse(tmp_path, elf_path):
+    cache = ELFCache(str(tmp_path / "cache"))
+    with open(elf_path, "rb") as elf, cache.open(elf) as f:
+        parse_all(f)
+    assert len(entries(cache.directory)) == 1
+    with open(elf_path, "rb") as elf, cache.open(elf) as f:
+        assert "symbolTable" in f.__dict__
+        assert f.export() == ELFFile(elf_path.read_bytes()).export()
+
+def test_rebuilt_file_misses(tmp_path, elf_path):
+    cache = ELFCache(str(tmp_path / "cache"))
+    with open(elf_path, "rb") as elf:
+        key = cache.key(ELFReader(elf))
+    data = bytearray(elf_path.read_bytes())
+    data[-1] ^= 1
+    elf_path.write_bytes(data)
+    with open(elf_path, "rb") as elf:
+        assert cache.key(ELFReader(elf)) != key
+
+def test_entry_grows(tmp_path, elf_path):
+    cache = ELFCache(str(tmp_path / "cache"))
+    with open(elf_path, "rb") as elf, cache.open(elf) as f:
+        f.programHeader
+    [name] = entries(cache.directory)
+    path = os.path.join(cache.directory, name)
+    small = os.path.getsize(path)
+    with open(elf_path, "rb") as elf, cache.open(elf) as f:
+        f.elfHeader
+    assert os.path.getsize(path) == small
+    with open(elf_path, "rb") as elf, cache.open(elf) as f:
+        f.symbolTable.get_table(".symtab")
+    assert os.path.getsize(path) > small
+    with open(elf_path, "rb") as elf, cache.open(elf) as f:
+        assert "programHeader" in f.__dict__
+        assert ".symtab" in f.symbolTable.decoded_tables()
+
+def stale(data) -> bytes:
+    magic, version, byteorder, count = _HEADER.unpack_from(data)
+    return _HEADER.pack(magic, version - 1, byteorder, count) + data[_HEADER.size:]
+
+def foreign(data) -> bytes:
+    magic, version, byteorder, count = _HEADER.unpack_from(data)
+    return _HEADER.pack(magic, version, 1 - byteorder, count) + data[_HEADER.size:]
+
+@pytest.mark.parametrize("damage", [
+    stale,
+    foreign,
+    lambda data: data[:len(data) // 2],
+    lambda data: b"RPYC",
+], ids=["stale", "foreign", "truncated", "short"])
+def test_bad_entry_is_a_miss(tmp_path, elf_path, damage):
+    cache = ELFCache(str(tmp_path / "cache"))
+    with open(elf_path, "rb") as elf, cache.open(elf) as f:
+        parse_all(f)
+    [name] = entries(cache.directory)
+    path = os.path.join(cache.directory, name)
+    with open(path, "rb") as entry:
+        data = zlib.decompress(entry.read())
+    with open(path, "wb") as entry:
+        entry.write(zlib.compress(damage(data)))
+    with open(elf_path, "rb") as elf:
+        f = cache.load(name[:-len(".elfcache")], ELFReader(elf))
+    assert f is None
+    assert not os.path.exists(path)
+
+def test_corrupt_compression_is_a_miss(tmp_path, elf_path):
+    cache = ELFCache(str(tmp_path / "cache"))
+    with open(elf_path, "rb") as elf, cache.open(elf) as f:
+        parse_all(f)
+    [name] = entries(cache.directory)
+    path = os.path.join(cache.directory, name)
+    with open(path, "wb") as entry:
+        entry.write(b"not zlib")
+    with open(elf_path, "rb") as elf, cache.open(elf) as f:
+        assert "symbolTable" not in f.__dict__
+        parse_all(f)
+    with open(elf_path, "rb") as elf, cache.open(elf) as f:
+        assert "symbolTable" in f.__dict__
+
+def test_failed_store_is_quiet(tmp_path, elf_path, monkeypatch):
+    cache = ELFCache(str(tmp_path / "cache"))
+    def fail(src, dst):
+        raise OSError("disk full")
+    monkeypatch.setattr(os, "replace", fail)
+    with open(elf_path, "rb") as elf, cache.open(elf) as f:
+        parse_all(f)
+    assert os.listdir(cache.directory) == []
+
+def test_eviction(tmp_path):
+    cache = ELFCache(str(tmp_path / "cache"), 20000)
+    for i in range(60):
+        f = ELFFile(generate_elf(sections=2, symbols=50 + i))
+        f.symbolTable.get_table(".symtab")
+        cache.store("%040x" % i, f)
+        total = sum(entry.stat().st_size for entry in os.scandir(cache.directory))
+        assert total <= cache.max_bytes
+    names = entries(cache.directory)
+    assert 0 < len(names) < 60
+    # The newest entries are kept.
+    assert names[-1] == "%040x.elfcache" % 59
@@ -0,0 +1,101 @@
+import struct
+import zlib
+
+import pytest
+
+from elfgen import generate_elf
+from readelf_py import ELFFile
+from readelf_py.cli import main
+from readelf_py.compressed import (ELFCOMPRESS_ZLIB, SHF_COMPRESSED, CompressionError, DecompressedCache,
+                                   iter_decompress)
+
+LAYOUTS = [(1, "<"), (1, ">"), (2, "<"), (2, ">")]
+LAYOUT_IDS = ["32le", "32be", "64le", "64be"]
+
+SHT_PROGBITS = 1
+PAYLOAD = b"".join(b"string %d\0" % i for i in range(2000))
+
+def gabi(payload, elf_class, byteorder, ch_type=ELFCOMPRESS_ZLIB) -> bytes:
+    # An SHF_COMPRESSED section body: Elf_Chdr, then the zlib stream.
+    if elf_class == 1:
+        chdr = struct.pack(byteorder + "3I", ch_type, len(payload), 1)
+    else:
+        chdr = struct.pack(byteorder + "2I2Q", ch_type, 0, len(payload), 1)
+    return chdr + zlib.compress(payload)
+
+def gnu(payload) -> bytes:
+    # A .zdebug section body: "ZLIB", the big-endian size, the zlib stream.
+    return b"ZLIB" + len(payload).to_bytes(8, "big") + zlib.compress(payload)
+
+def compressed_elf(elf_class=2, byteorder="<", payload=PAYLOAD) -> bytes:
+    return generate_elf(elf_class=elf_class, byteorder=byteorder, sections=2, symbols=4, extra=[
+        (".debug_str", SHT_PROGBITS, SHF_COMPRESSED, gabi(payload, elf_class, byteorder)),
+        (".zdebug_line", SHT_PROGBITS, 0, gnu(payload)),
+        (".debug_bad", SHT_PROGBITS, SHF_COMPRESSED, gabi(payload, elf_class, byteorder)[:-8]),
+    ])
+
+@pytest.mark.parametrize("elf_class,byteorder", LAYOUTS, ids=LAYOUT_IDS)
+@pytest.mark.parametrize("name", [".debug_str", ".zdebug_line"])
+def test_round_trip(elf_class, byteorder, name):
+    sh = ELFFile(compressed_elf(elf_class, byteorder)).sectionHeader
+    index = sh.find_section(name)
+    ch_type, size, start = sh.get_compression(index)
+    assert (ch_type, size) == (ELFCOMPRESS_ZLIB, len(PAYLOAD))
+    raw = sh.get_section_data(index)
+    assert zlib.decompress(raw[start:]) == PAYLOAD
+    assert b"".join(sh.iter_section_data(index, decompress=True)) == PAYLOAD
+    assert sh.get_section_data(index, decompress=True) == PAYLOAD
+    # Once cached, the section is not inflated again.
+    assert sh.get_section_data(index, decompress=True).obj is sh._decompressed.get(index)
+    assert [bytes(b) for b in sh.iter_section_data(index, decompress=True)] == [PAYLOAD]
+
+def test_uncompressed_section():
+    sh = ELFFile(compressed_elf()).sectionHeader
+    index = sh.find_section(".sec0")
+    assert sh.get_compression(index) is None
+    assert sh.get_section_data(index, decompress=True) == bytes(range(64))
+
+def test_chunked_decompression():
+    chunks = list(iter_decompress(zlib.compress(PAYLOAD), ELFCOMPRESS_ZLIB, chunk_size=1000))
+    assert len(chunks) > 1 and max(map(len, chunks)) <= 1000
+    assert b"".join(chunks) == PAYLOAD
+
+@pytest.mark.parametrize("data,ch_type", [
+    (b"not zlib", ELFCOMPRESS_ZLIB),
+    (zlib.compress(PAYLOAD), 7),
+], ids=["corrupt", "unknown type"])
+def test_decompression_errors(data, ch_type):
+    with pytest.raises(CompressionError):
+        b"".join(iter_decompress(data, ch_type))
+
+def test_dump_decompressed(tmp_path, capsys):
+    path = tmp_path / "a.out"
+    path.write_bytes(compressed_elf(payload=b"hello\0world\0"))
+    main(["-p", ".zdebug_line", "-z", str(path)])
+    assert capsys.readouterr().out == "\nString dump of section '.zdebug_line':\n  [     0]  hello\n  [     6]  world\n\n"
+    main(["-x", ".debug_str", "-z", str(path)])
+    assert capsys.readouterr().out == (
+        "\nHex dump of section '.debug_str':\n"
+        "  0x00000000 68656c6c 6f00776f 726c6400          hello.world.\n\n")
+    main(["-x", ".debug_bad", "-z", str(path)])
+    captured = capsys.readouterr()
+    assert captured.err == "readelf: Warning: Unable to decompress section .debug_bad: zlib: truncated stream\n"
+
+def test_cache_evicts_least_recently_used():
+    cache = DecompressedCache(100)
+    cache.put(1, b"a" * 40)
+    cache.put(2, b"b" * 40)
+    assert cache.get(1) == b"a" * 40
+    cache.put(3, b"c" * 40)
+    assert cache.get(2) is None
+    assert (cache.get(1), cache.get(3), cache.size) == (b"a" * 40, b"c" * 40, 80)
+    # Replacing an entry replaces its size.
+    cache.put(1, b"a" * 10)
+    assert cache.size == 50
+    # A buffer over the bound is not kept and evicts nothing.
+    cache.put(4, b"d" * 101)
+    assert (cache.get(4), cache.size) == (None, 50)
+    cache.put(5, b"e" * 100)
+    assert (cache.get(1), cache.get(3), cache.size) == (None, None, 100)
+    cache.clear()
+    assert (cache.get(5), cache.size) == (None, 0)
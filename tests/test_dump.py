@@ -0,0 +1,102 @@
+import re
+import zlib
+
+import pytest
+
+from elfgen import generate_elf
+from readelf_py import ELFFile
+from readelf_py.cli import main
+from readelf_py.compressed import SHF_COMPRESSED
+from readelf_py.sectionheader import _HEX_LINES
+
+SHT_PROGBITS = 1
+SHT_NOBITS = 8
+
+STRINGS = b"\x01\x02first\0tab\there\0line\n\x01\nbreak\0\xff\xfeutf\xc3\xa9\0\0\0last\n"
+# Long enough for the hex dump to cross a block of lines, and not a
+# whole number of lines.
+LONG = bytes(i * 7 % 256 for i in range(16 * _HEX_LINES + 21))
+
+@pytest.fixture
+def elf_path(tmp_path):
+    path = tmp_path / "a.out"
+    path.write_bytes(generate_elf(sections=2, symbols=4, extra=[
+        (".rodata", SHT_PROGBITS, 0, STRINGS),
+        (".long", SHT_PROGBITS, 0, LONG),
+        (".bss", SHT_NOBITS, 0, bytes(32)),
+        (".empty", SHT_PROGBITS, 0, b""),
+        (".zeros", SHT_PROGBITS, 0, bytes(40)),
+    ]))
+    return path
+
+def hex_dump(data, addr=0) -> str:
+    # The dump readelf -x prints, a line and a byte at a time.
+    lines = []
+    for i in range(0, len(data), 16):
+        line = data[i:i + 16]
+        words = " ".join(line[j:j + 4].hex() for j in range(0, len(line), 4))
+        text = "".join(chr(c) if 0x20 <= c < 0x7f else "." for c in line)
+        lines.append("  0x%08x %-35s %s\n" % (addr + i, words, text))
+    return "".join(lines)
+
+def test_section_data_is_a_view(elf_path):
+    with open(elf_path, "rb") as elf, ELFFile(elf) as f:
+        view = f.section_data(".rodata")
+        assert isinstance(view, memoryview)
+        assert view.obj is f.elf.data
+        assert view == STRINGS
+        index = f.sectionHeader.find_section(".sec1")
+        assert f.section_data(str(index)) == f.section_data(index) == bytes(range(64))
+        assert f.section_data(".bss") == b""
+        assert f.section_data(".nope") is None
+        view.release()
+
+def test_hex_dump(elf_path, capsys):
+    main(["-x", ".sec0", "-x", ".long", str(elf_path)])
+    with ELFFile(elf_path.read_bytes()) as f:
+        sec0 = f.sectionHeader.s_headers[f.sectionHeader.find_section(".sec0")]["sh_addr"]
+    assert capsys.readouterr().out == (
+        "\nHex dump of section '.sec0':\n" + hex_dump(bytes(range(64)), sec0) + "\n"
+        "\nHex dump of section '.long':\n" + hex_dump(LONG) + "\n")
+
+def test_hex_dump_lines(elf_path, capsys):
+    # As printed by GNU readelf 2.40.
+    main(["-x", ".rodata", str(elf_path)])
+    assert capsys.readouterr().out == (
+        "\nHex dump of section '.rodata':\n"
+        "  0x00000000 01026669 72737400 74616209 68657265 ..first.tab.here\n"
+        "  0x00000010 006c696e 650a010a 62726561 6b00fffe .line...break...\n"
+        "  0x00000020 757466c3 a9000000 6c617374 0a       utf.....last.\n\n")
+
+def test_string_dump(elf_path, capsys):
+    # As printed by GNU readelf 2.40: what is not printable after a
+    # newline is skipped.
+    main(["-p", ".rodata", str(elf_path)])
+    assert capsys.readouterr().out == (
+        "\nString dump of section '.rodata':\n"
+        "  [     2]  first\n"
+        "  [     8]  tab^Ihere\n"
+        "  [    11]  line\\n\n"
+        "            break\n"
+        "  [    20]  utf\xe9\n"
+        "  [    28]  last\\n\n\n")
+    main(["-p", ".zeros", str(elf_path)])
+    assert capsys.readouterr().out == "\nString dump of section '.zeros':\n  No strings found in this section.\n"
+
+def test_strings_across_buffers(tmp_path):
+    # Decompressed chunks end in the middle of strings; the offsets are
+    # those of the whole section.
+    payload = b"".join(b"%d\0" % i * (i % 3) + b"\x01" for i in range(300000))
+    chdr = (1).to_bytes(4, "little") + bytes(4) + len(payload).to_bytes(8, "little") + (1).to_bytes(8, "little")
+    data = generate_elf(sections=2, symbols=4, extra=[(".debug_str", SHT_PROGBITS, SHF_COMPRESSED, chdr + zlib.compress(payload))])
+    sh = ELFFile(data).sectionHeader
+    index = sh.find_section(".debug_str")
+    assert len(list(sh.iter_section_data(index, decompress=True))) > 1
+    expected = [(m.start(), m.group().decode()) for m in re.finditer(rb"[\x20-\x7e][^\x00]*", payload)]
+    assert list(sh.iter_strings(index, decompress=True)) == expected
+
+def test_nothing_to_dump(elf_path, capsys):
+    main(["-x", ".bss", "-p", ".empty", "-x", ".nope", str(elf_path)])
+    captured = capsys.readouterr()
+    assert captured.out == "Section '.bss' has no data to dump.\nSection '.empty' has no data to dump.\n"
+    assert captured.err == "readelf: Warning: Section '.nope' was not dumped because it does not exist\n"
@@ -0,0 +1,148 @@
+import json
+
+import pytest
+
+from elfgen import generate_elf
+from readelf_py import ELFFile
+from readelf_py.cli import main
+from readelf_py.depgraph import DependencyGraph
+from readelf_py.dynamicsection import DT_FLAGS, DT_FLAGS_1, DT_NEEDED, DT_RPATH, DT_RUNPATH, DT_SONAME
+
+LAYOUTS = [(1, "<"), (1, ">"), (2, "<"), (2, ">")]
+LAYOUT_IDS = ["32le", "32be", "64le", "64be"]
+
+DYNAMIC = [
+    (DT_NEEDED, "libfoo.so.1"),
+    (DT_NEEDED, "libbar.so.2"),
+    (DT_SONAME, "libtest.so.1"),
+    (DT_RPATH, "/opt/a::/opt/b"),
+    (DT_RUNPATH, "$ORIGIN/../lib"),
+    (DT_FLAGS, 0x8),
+    (DT_FLAGS_1, 0x8000001),
+]
+
+@pytest.mark.parametrize("elf_class,byteorder", LAYOUTS, ids=LAYOUT_IDS)
+def test_dynamic_section(elf_class, byteorder):
+    f = ELFFile(generate_elf(elf_class=elf_class, byteorder=byteorder, sections=2, symbols=4, dynamic=DYNAMIC))
+    dyn = f.dynamicSection
+    assert dyn.needed == ["libfoo.so.1", "libbar.so.2"]
+    assert dyn.soname == "libtest.so.1"
+    assert dyn.rpath == ["/opt/a", "/opt/b"]
+    assert dyn.runpath == ["$ORIGIN/../lib"]
+    assert (dyn.flags, dyn.flags_1) == (0x8, 0x8000001)
+    assert [tmp["Type"] for tmp in dyn.iter_dynamic_section()] == [
+        "NEEDED", "NEEDED", "SONAME", "RPATH", "RUNPATH", "FLAGS", "FLAGS_1", "STRTAB", "STRSZ", "NULL"]
+    values = [tmp["Name/Value"] for tmp in dyn.iter_dynamic_section()]
+    assert values[:7] == [
+        "Shared library: [libfoo.so.1]",
+        "Shared library: [libbar.so.2]",
+        "Library soname: [libtest.so.1]",
+        "Library rpath: [/opt/a::/opt/b]",
+        "Library runpath: [$ORIGIN/../lib]",
+        "BIND_NOW",
+        "Flags: NOW PIE",
+    ]
+
+def test_section_header_fallback():
+    # Without program headers the table is found through SHT_DYNAMIC and
+    # its strings through sh_link.
+    data = bytearray(generate_elf(sections=2, symbols=4, dynamic=DYNAMIC))
+    data[56:58] = bytes(2)
+    dyn = ELFFile(bytes(data)).dynamicSection
+    assert dyn.needed == ["libfoo.so.1", "libbar.so.2"]
+    assert dyn.soname == "libtest.so.1"
+
+def test_no_dynamic_section(capsys):
+    dyn = ELFFile(generate_elf(sections=2, symbols=4)).dynamicSection
+    assert (dyn.entries, dyn.needed, dyn.soname) == ([], [], None)
+    dyn.print_dynamic_section()
+    assert capsys.readouterr().out == "\nThere is no dynamic section in this file.\n"
+
+def write_lib(path, *dynamic, elf_class=2) -> str:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(generate_elf(elf_class=elf_class, sections=2, symbols=4, dynamic=dynamic))
+    return str(path)
+
+@pytest.fixture
+def tree(tmp_path):
+    # liba is in the RPATH directory and on the library path, libb only
+    # on the library path, libc only in the RPATH directory (and needed by
+    # liba), and libd first as a 32-bit file in the RPATH directory.
+    write_lib(tmp_path / "rpath/liba.so", (DT_NEEDED, "libc.so"))
+    write_lib(tmp_path / "rpath/libc.so")
+    write_lib(tmp_path / "rpath/libd.so", elf_class=1)
+    write_lib(tmp_path / "path/liba.so")
+    write_lib(tmp_path / "path/libb.so")
+    write_lib(tmp_path / "path/libd.so")
+    return tmp_path
+
+def rpath(tree, name) -> str:
+    # $ORIGIN/../rpath is not normalised, as with ld.so.
+    return str(tree / "bin/../rpath" / name)
+
+def resolve(tree, *dynamic) -> dict:
+    app = write_lib(tree / "bin/app", *dynamic)
+    graph = DependencyGraph([str(tree / "path")], ld_so_conf=None)
+    return {name: dep and dep.path for name, dep in graph.closure(app)}
+
+NEEDED = [(DT_NEEDED, name) for name in ("liba.so", "libb.so", "libd.so", "libmissing.so")]
+
+def test_rpath_before_library_path(tree):
+    assert resolve(tree, *NEEDED, (DT_RPATH, "$ORIGIN/../rpath")) == {
+        "liba.so": rpath(tree, "liba.so"),
+        "libb.so": str(tree / "path/libb.so"),
+        # The 32-bit libd.so is skipped for the 64-bit one.
+        "libd.so": str(tree / "path/libd.so"),
+        "libmissing.so": None,
+        # Found through the RPATH of the executable that loaded liba.
+        "libc.so": rpath(tree, "libc.so"),
+    }
+
+def test_runpath_after_library_path(tree):
+    closure = resolve(tree, *NEEDED, (DT_RUNPATH, "$ORIGIN/../rpath"))
+    assert closure["liba.so"] == str(tree / "path/liba.so")
+
+def test_runpath_disables_rpath(tree):
+    closure = resolve(tree, (DT_NEEDED, "libc.so"), (DT_RPATH, "$ORIGIN/../rpath"), (DT_RUNPATH, "$ORIGIN/../none"))
+    assert closure == {"libc.so": None}
+
+def test_runpath_is_not_inherited(tree):
+    # libq.so, needed by libp.so, is found through the DT_RPATH of the
+    # executable that loads libp.so, but not through its DT_RUNPATH.
+    write_lib(tree / "lib2/libp.so", (DT_NEEDED, "libq.so"))
+    write_lib(tree / "lib2/libq.so")
+    libp, libq = str(tree / "bin/../lib2/libp.so"), str(tree / "bin/../lib2/libq.so")
+    assert resolve(tree, (DT_NEEDED, "libp.so"), (DT_RPATH, "$ORIGIN/../lib2")) == {"libp.so": libp, "libq.so": libq}
+    assert resolve(tree, (DT_NEEDED, "libp.so"), (DT_RUNPATH, "$ORIGIN/../lib2")) == {"libp.so": libp, "libq.so": None}
+
+def test_files_are_parsed_once(tree, monkeypatch):
+    graph = DependencyGraph([str(tree / "path")], ld_so_conf=None)
+    parsed = []
+    parse = graph._parse
+    monkeypatch.setattr(graph, "_parse", lambda path: parsed.append(path) or parse(path))
+    for name in ("app1", "app2"):
+        app = write_lib(tree / "bin" / name, (DT_NEEDED, "liba.so"), (DT_NEEDED, "libb.so"), (DT_RPATH, "$ORIGIN/../rpath"))
+        graph.closure(app)
+    assert sorted(parsed) == sorted([str(tree / "bin/app1"), str(tree / "bin/app2"), rpath(tree, "liba.so"),
+                                     rpath(tree, "libc.so"), str(tree / "path/libb.so")])
+
+def test_ld_so_conf(tmp_path):
+    (tmp_path / "conf.d").mkdir()
+    (tmp_path / "conf.d/b.conf").write_text("/opt/b1:/opt/b2\n")
+    (tmp_path / "conf.d/a.conf").write_text("# comment\n/opt/a\ninclude ../ld.so.conf\n")
+    (tmp_path / "ld.so.conf").write_text("/usr/local/lib # local\nhwcap 0 nosegneg\ninclude conf.d/*.conf\n/opt/c, /opt/d\n")
+    graph = DependencyGraph(ld_so_conf=str(tmp_path / "ld.so.conf"))
+    assert graph.conf_paths == ["/usr/local/lib", "/opt/a", "/opt/b1", "/opt/b2", "/opt/c", "/opt/d"]
+
+def test_deps_cli(tree, capsys):
+    app = write_lib(tree / "bin/app", (DT_NEEDED, "liba.so"), (DT_NEEDED, "libmissing.so"), (DT_RPATH, "$ORIGIN/../rpath"))
+    main(["--deps", app, "--library-path", str(tree / "path")])
+    assert capsys.readouterr().out == (
+        "File: %s\n\tliba.so => %s\n\tlibmissing.so => not found\n\tlibc.so => %s\n"
+        % (app, rpath(tree, "liba.so"), rpath(tree, "libc.so")))
+    main(["--deps", app, "--export", "-"])
+    assert json.loads(capsys.readouterr().out) == {
+        "File": app,
+        "Needed": ["liba.so", "libmissing.so"],
+        "Closure": {"liba.so": rpath(tree, "liba.so"), "libmissing.so": None, "libc.so": rpath(tree, "libc.so")},
+    }
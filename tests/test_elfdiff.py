@@ -0,0 +1,64 @@
+import json
+import struct
+
+import pytest
+
+from elfgen import generate_elf
+from readelf_py import ELFFile
+from readelf_py.cli import main
+from readelf_py.elfdiff import ELFDiff
+
+OLD = generate_elf(sections=4, symbols=21)
+NEW = generate_elf(sections=5, symbols=31)
+
+def resize_symbol(data, name, size) -> bytes:
+    # data with the st_size of .dynsym entry name (64-bit, little-endian)
+    # set to size.
+    f = ELFFile(data)
+    sh = f.symbolTable.s_header_dic[".dynsym"]
+    offset = sh["sh_offset"] + f.symbolTable.name_index(".dynsym")[name] * sh["sh_entsize"] + 16
+    return data[:offset] + struct.pack("<Q", size) + data[offset + 8:]
+
+def test_identical_files_are_not_decoded():
+    diff = ELFDiff(OLD, bytes(OLD))
+    assert (diff.sections, diff.segments, diff.symbols) == (None, None, None)
+    assert not diff
+    assert diff.a.sectionHeader.string_caches() == {}
+    assert "symbolTable" not in diff.a.__dict__
+
+def test_added_and_removed():
+    diff = ELFDiff(OLD, NEW)
+    assert diff
+    assert diff.sections["Added"] == [(".sec4", 64)]
+    assert diff.sections["Removed"] == []
+    assert {name for name, _, _ in diff.sections["Resized"]} == {".shstrtab", ".symtab", ".strtab", ".dynsym", ".dynstr"}
+    assert diff.symbols == {"Added": [("sym_21", 16)], "Removed": [], "Resized": []}
+    reverse = ELFDiff(NEW, OLD)
+    assert reverse.sections["Removed"] == [(".sec4", 64)]
+    assert reverse.symbols == {"Added": [], "Removed": [("sym_21", 16)], "Resized": []}
+
+def test_resized_symbol():
+    diff = ELFDiff(OLD, resize_symbol(OLD, "sym_11", 48))
+    assert diff.sections is None and diff.segments is None
+    assert diff.symbols == {"Added": [], "Removed": [], "Resized": [("sym_11", 16, 48)]}
+
+def test_diff_cli(tmp_path, capsys):
+    a, b, c = tmp_path / "a", tmp_path / "b", tmp_path / "c"
+    a.write_bytes(OLD)
+    b.write_bytes(resize_symbol(OLD, "sym_1", 8))
+    c.write_bytes(OLD)
+    with pytest.raises(SystemExit) as e:
+        main(["--diff", str(a), str(b)])
+    assert e.value.code == 1
+    assert capsys.readouterr().out == "Sections: identical\nSegments: identical\nSymbols:\n  ~ sym_1 16 -> 8\n"
+    with pytest.raises(SystemExit) as e:
+        main(["--diff", str(a), str(c)])
+    assert e.value.code == 0
+    assert capsys.readouterr().out == "Sections: identical\nSegments: identical\nSymbols: identical\n"
+    with pytest.raises(SystemExit):
+        main(["--diff", str(a), str(b), "--export", "-"])
+    assert json.loads(capsys.readouterr().out) == {
+        "Sections": "identical",
+        "Segments": "identical",
+        "Symbols": {"Added": [], "Removed": [], "Resized": [{"Name": "sym_1", "Old size": 16, "New size": 8}]},
+    }
@@ -0,0 +1,74 @@
+import pytest
+
+from elfgen import generate_elf
+from readelf_py import ELFFile
+from readelf_py.buildid import load_build_id_index, read_build_id
+from readelf_py.cli import main
+from readelf_py.elfreader import ELFReader
+from readelf_py.notes import NT_GNU_BUILD_ID, find_build_id
+
+LAYOUTS = [(1, "<"), (1, ">"), (2, "<"), (2, ">")]
+LAYOUT_IDS = ["32le", "32be", "64le", "64be"]
+
+BUILD_ID = bytes(range(0x10, 0x24))
+
+@pytest.mark.parametrize("elf_class,byteorder", LAYOUTS, ids=LAYOUT_IDS)
+def test_build_id_note(elf_class, byteorder):
+    f = ELFFile(generate_elf(elf_class=elf_class, byteorder=byteorder, sections=4, symbols=10, build_id=BUILD_ID))
+    [(name, _, size, _)] = f.notes.regions
+    assert (name, size) == (".note.gnu.build-id", 16 + len(BUILD_ID))
+    [note] = f.notes.iter_region(0)
+    assert (note.name, note.type, bytes(note.desc)) == ("GNU", NT_GNU_BUILD_ID, BUILD_ID)
+    assert f.notes.export_notes() == {"Notes": [{".note.gnu.build-id": [{
+        "Owner": "GNU",
+        "Data size": len(BUILD_ID),
+        "Type": NT_GNU_BUILD_ID,
+        "Description": "NT_GNU_BUILD_ID (unique build ID bitstring)",
+        "Build ID": BUILD_ID.hex(),
+    }]}]}
+    assert f.build_id() == find_build_id(f.elf) == BUILD_ID.hex()
+
+def test_odd_sized_build_id():
+    # The descriptor is padded to 4 bytes; the padding is not part of it.
+    data = generate_elf(sections=2, symbols=4, build_id=b"\xab" * 5)
+    assert find_build_id(ELFReader(data)) == "ab" * 5
+
+def test_no_build_id():
+    f = ELFFile(generate_elf(sections=2, symbols=4))
+    assert f.notes.regions == []
+    assert f.build_id() is None and find_build_id(f.elf) is None
+
+def test_print_notes(tmp_path, capsys):
+    path = tmp_path / "a.out"
+    path.write_bytes(generate_elf(sections=2, symbols=4, build_id=BUILD_ID))
+    main(["-n", str(path)])
+    assert capsys.readouterr().out == (
+        "\nDisplaying notes found in: .note.gnu.build-id\n"
+        "  Owner                Data size \tDescription\n"
+        "  GNU                  0x00000014\tNT_GNU_BUILD_ID (unique build ID bitstring)\n"
+        "    Build ID: %s\n" % BUILD_ID.hex())
+
+def test_build_id_index(tmp_path, capsys):
+    tree = tmp_path / "tree"
+    (tree / "sub").mkdir(parents=True)
+    ids = {}
+    for i, name in enumerate(["liba.so", "sub/libb.so", "sub/libc.so"]):
+        ids[name] = bytes([0xf0 - i]) * 20
+        (tree / name).write_bytes(generate_elf(sections=2, symbols=4 + i, build_id=ids[name]))
+    (tree / "plain.so").write_bytes(generate_elf(sections=2, symbols=4))
+    (tree / "README").write_text("not an ELF file\n" * 10)
+    assert read_build_id(str(tree / "README")) is None
+    assert read_build_id(str(tree / "plain.so")) is None
+    assert read_build_id(str(tree / "liba.so")) == ids["liba.so"].hex()
+
+    index = tmp_path / "index"
+    main(["--build-id-index", str(tree), "--index-file", str(index)])
+    assert capsys.readouterr().err == "3 build IDs indexed\n"
+    lines = index.read_text().splitlines()
+    assert lines == sorted(lines)
+    with open(index) as f:
+        assert load_build_id_index(f) == {ids[name].hex(): [str(tree / name)] for name in ids}
+
+    wanted = ids["sub/libb.so"].hex().upper()
+    main(["--lookup-build-id", wanted, "--lookup-build-id", "00", "--index-file", str(index)])
+    assert capsys.readouterr().out == "%s %s\n00 not found\n" % (wanted, tree / "sub/libb.so")
@@ -0,0 +1,53 @@
+import pytest
+
+from elfgen import encode_relr, generate_elf
+from readelf_py import ELFFile
+
+LAYOUTS = [(1, "<"), (1, ">"), (2, "<"), (2, ">")]
+LAYOUT_IDS = ["32le", "32be", "64le", "64be"]
+
+@pytest.mark.parametrize("elf_class,byteorder", LAYOUTS, ids=LAYOUT_IDS)
+def test_rela(elf_class, byteorder):
+    # .dynsym 1 and 2 are the imports.
+    relocations = [(0x1000, 6, 1, 0), (0x1008, 1, 2, -8), (0x1010, 8, 0, 0x1234)]
+    f = ELFFile(generate_elf(elf_class=elf_class, byteorder=byteorder, sections=2, symbols=4,
+                             imports=("printf", "malloc"), relocations=relocations))
+    got = list(f.relocations.iter_relocations(".rela.dyn"))
+    prefix, abs_type = ("R_386_", "R_386_32") if elf_class == 1 else ("R_X86_64_", "R_X86_64_64")
+    assert [(r["Offset"], r["Type"], r["Symbol"], r["Addend"]) for r in got] == [
+        (0x1000, prefix + "GLOB_DAT", "printf", 0),
+        (0x1008, abs_type, "malloc", -8),
+        (0x1010, prefix + "RELATIVE", None, 0x1234),
+    ]
+    shift = 8 if elf_class == 1 else 32
+    assert [r["Info"] for r in got] == [1 << shift | 6, 2 << shift | 1, 8]
+
+@pytest.mark.parametrize("elf_class,byteorder", LAYOUTS, ids=LAYOUT_IDS)
+def test_rela_wide_symbol_index(elf_class, byteorder):
+    # 0x123456 needs all 24 bits of an ELF32_R_SYM, so a wrong split of
+    # r_info shows.
+    table = ELFFile(generate_elf(elf_class=elf_class, byteorder=byteorder, sections=2, symbols=4,
+                                 relocations=[(0x2000, 7, 0x123456, 0)])).relocations.get_table(".rela.dyn")
+    assert (table.r_offset[0], table.r_sym[0], table.r_type[0]) == (0x2000, 0x123456, 7)
+
+@pytest.mark.parametrize("elf_class,byteorder", LAYOUTS, ids=LAYOUT_IDS)
+def test_relr(elf_class, byteorder):
+    # A lone address, a short bitmap and a run longer than one bitmap
+    # covers (63 or 31 words), with gaps.
+    w = 4 if elf_class == 1 else 8
+    offsets = [0x2000, 0x2000 + w, 0x2000 + 3 * w] + [0x3000 + k * w for k in range(0, 200, 3)] + [0x9000]
+    entries = encode_relr(offsets, w)
+    assert len(entries) < len(offsets)
+    f = ELFFile(generate_elf(elf_class=elf_class, byteorder=byteorder, sections=2, symbols=4, relr=offsets))
+    table = f.relocations.get_table(".relr.dyn")
+    assert list(table.r_offset) == sorted(offsets)
+    assert set(table.r_type) == {8}
+    assert set(table.r_sym) == {0}
+
+def test_relr_print(capsys):
+    f = ELFFile(generate_elf(sections=2, symbols=4, relr=[0x1000, 0x1008, 0x1018]))
+    f.relocations.print_relocations()
+    out = capsys.readouterr().out
+    assert "Relocation section '.relr.dyn'" in out
+    assert "contains 2 entries" in out
+    assert "  3 offsets\n0000000000001000\n0000000000001008\n0000000000001018\n" in out
@@ -0,0 +1,124 @@
+import asyncio
+import contextlib
+import json
+import os
+import time
+
+import pytest
+
+from elfgen import generate_elf
+from readelf_py import ELFFile
+from readelf_py.server import DEFAULT_MAX_FILES, REQUEST_LIMIT, ELFServer, ServerError, query
+
+def run_server(tmp_path, client, max_files=DEFAULT_MAX_FILES):
+    # Runs the coroutine client(server) against a server listening on a
+    # socket in tmp_path, and returns its result.
+    server = ELFServer(str(tmp_path / "s"), max_files)
+    async def main():
+        task = asyncio.create_task(server.serve_forever())
+        while not os.path.exists(server.socket_path):
+            await asyncio.sleep(0.01)
+        try:
+            return await client(server)
+        finally:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+    return asyncio.run(main())
+
+async def send(server, data, responses=1, closed=False) -> list:
+    # The responses to data, written on one connection; with closed,
+    # the server must then have closed it.
+    reader, writer = await asyncio.open_unix_connection(server.socket_path)
+    writer.write(data)
+    await writer.drain()
+    replies = [json.loads(await reader.readline()) for _ in range(responses)]
+    if closed:
+        assert await reader.read() == b""
+    writer.close()
+    return replies
+
+async def ask(server, **request):
+    # server.query() on the event loop: the server's requests run on
+    # the default executor, which blocking clients would fill up.
+    [response] = await send(server, (json.dumps(request) + "\n").encode())
+    if "error" in response:
+        raise ServerError(response["error"])
+    return response["result"]
+
+@pytest.fixture
+def libs(tmp_path):
+    paths = []
+    for i in range(3):
+        path = tmp_path / ("lib%d.so" % i)
+        path.write_bytes(generate_elf(sections=4, symbols=40 + 10 * i, hash_style="gnu"))
+        paths.append(str(path))
+    return paths
+
+def test_requests_and_errors(tmp_path, libs):
+    async def client(server):
+        replies = await send(server, b'{"id": 1, "op": "ping"}\n{"id": 2, "op": "nope"}\nnot json\n[1]\n'
+                                     b'{"id": 3, "op": "lookup"}\n', responses=5)
+        assert replies == [
+            {"id": 1, "result": "pong"},
+            {"id": 2, "error": "ServerError: unknown op: nope"},
+            {"id": None, "error": replies[2]["error"]},
+            {"id": None, "error": "bad request: request is not an object"},
+            {"id": 3, "error": "missing field: 'path'"},
+        ]
+        assert replies[2]["error"].startswith("bad request: ")
+        (tmp_path / "README").write_text("text\n" * 100)
+        with pytest.raises(ServerError, match="not an ELF file"):
+            await ask(server, op="header", path=str(tmp_path / "README"))
+        assert await asyncio.to_thread(query, server.socket_path, {"op": "ping"}) == "pong"
+        return await ask(server, op="symbolize", path=libs[0], addresses=["0", 0x400000 + 64 * 4 + 16 * 3 + 2])
+    found = run_server(tmp_path, client)
+    expected = ELFFile(open(libs[0], "rb").read()).lookup_address(0x400000 + 64 * 4 + 16 * 3 + 2)
+    assert found == [None, None if expected is None else {"Name": expected[0], "Offset": expected[1]}]
+
+def test_warm_context_is_reused(tmp_path, libs):
+    async def client(server):
+        first = await ask(server, op="lookup", path=libs[0], name="sym_1")
+        second = await ask(server, op="lookup", path=libs[0], name="sym_1")
+        assert first == second and first["Name"] == "sym_1"
+        assert await ask(server, op="stats") == {"Files": 1, "Hits": 1, "Misses": 1}
+        # A rewritten file is parsed again and its old context closed.
+        data = generate_elf(sections=4, symbols=5)
+        with open(libs[0], "wb") as f:
+            f.write(data)
+        os.utime(libs[0], ns=(0, time.time_ns() + 10 ** 9))
+        assert await ask(server, op="lookup", path=libs[0], name="sym_30") is None
+        return await ask(server, op="stats")
+    assert run_server(tmp_path, client) == {"Files": 1, "Hits": 1, "Misses": 2}
+
+def test_concurrent_requests(tmp_path, libs):
+    # max_files=2 with three files evicts contexts while other requests
+    # may be using them.
+    expected = {path: ELFFile(open(path, "rb").read()).symbolTable for path in libs}
+    async def client(server):
+        requests = [(path, "sym_%d" % n) for n in range(1, 40, 3) for path in libs]
+        results = await asyncio.gather(*(ask(server, op="lookup", path=path, name=name) for path, name in requests))
+        for (path, name), result in zip(requests, results):
+            i = expected[path].name_index(".dynsym").get(name)
+            assert (result and result["Num"]) == i
+        symbols = await asyncio.gather(*(ask(server, op="symbols", path=path, table=".symtab") for path in libs))
+        assert [len(result[".symtab"]) for result in symbols] == [40, 50, 60]
+    run_server(tmp_path, client, max_files=2)
+
+def test_slow_request_does_not_block_others(tmp_path, libs):
+    async def client(server):
+        server._ops["slow"] = lambda request: time.sleep(1)
+        slow = asyncio.create_task(ask(server, op="slow"))
+        await asyncio.sleep(0.1)
+        start = time.monotonic()
+        assert await ask(server, op="header", path=libs[1]) is not None
+        assert time.monotonic() - start < 0.5
+        assert not slow.done()
+        await slow
+    run_server(tmp_path, client)
+
+def test_oversized_request(tmp_path):
+    async def client(server):
+        return await send(server, b'{"op": "ping", "pad": "' + b"x" * REQUEST_LIMIT + b'"}\n{"op": "ping"}\n', closed=True)
+    [reply] = run_server(tmp_path, client)
+    assert reply == {"id": None, "error": "bad request: longer than %d bytes" % REQUEST_LIMIT}
@@ -0,0 +1,28 @@
+import json
+
+from elfgen import generate_elf
+from readelf_py.cli import main
+
+def run_stats(tmp_path, capsys, *options) -> dict:
+    path = tmp_path / "a.out"
+    path.write_bytes(generate_elf(sections=4, symbols=200))
+    main(["--stats", "json", *options, str(path)])
+    return {record["Stage"]: record for record in json.loads(capsys.readouterr().err)["Stats"]}
+
+def test_name_resolution_is_counted(tmp_path, capsys):
+    # Names of a mapped file are decoded in place, not read through
+    # ELFReader.read, and still count.
+    stages = run_stats(tmp_path, capsys, "-s")
+    names = stages["name resolution"]
+    assert names["Reads"] >= 200
+    assert names["Bytes read"] >= sum(len("sym_%d" % i) + 1 for i in range(1, 200))
+
+def test_only_requested_stages(tmp_path, capsys):
+    assert list(run_stats(tmp_path, capsys, "-eh")) == ["header parse", "output"]
+    assert list(run_stats(tmp_path, capsys, "-S")) == ["header parse", "section parse", "output"]
+    assert list(run_stats(tmp_path, capsys, "--find-symbol", "sym_1")) == ["header parse", "section parse", "output"]
+    assert list(run_stats(tmp_path, capsys, "-s")) == ["header parse", "section parse", "symbol decode", "name resolution", "output"]
+
+def test_header_stage_reads_only_the_header(tmp_path, capsys):
+    stages = run_stats(tmp_path, capsys, "-eh")
+    assert sum(stage["Bytes read"] for stage in stages.values()) == 64
@@ -0,0 +1,56 @@
+import io
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+from elfgen import generate_elf
+from readelf_py import ELFFile, StreamError, StreamReader
+from readelf_py.cli import main
+
+LAYOUTS = [(1, "<"), (1, ">"), (2, "<"), (2, ">")]
+LAYOUT_IDS = ["32le", "32be", "64le", "64be"]
+
+class Pipe:
+    # A stream that cannot seek and returns at most 1000 bytes a read.
+    def __init__(self, data) -> None:
+        self._data = io.BytesIO(data)
+
+    def seekable(self) -> bool:
+        return False
+
+    def read(self, size=-1) -> bytes:
+        return self._data.read(1000 if size < 0 else min(size, 1000))
+
+@pytest.mark.parametrize("elf_class,byteorder", LAYOUTS, ids=LAYOUT_IDS)
+def test_stream_matches_file(elf_class, byteorder):
+    data = generate_elf(elf_class=elf_class, byteorder=byteorder, sections=4, symbols=50,
+                        imports=("printf",), hash_style="gnu", relocations=[(0x1000, 6, 1, 0)])
+    f = ELFFile(StreamReader(Pipe(data)))
+    assert f.export() == ELFFile(data).export()
+    assert f.find_symbol("sym_11") == ELFFile(data).find_symbol("sym_11")
+
+def test_stream_drops_loaded_segments():
+    data = generate_elf(sections=4, segments=2, symbols=50)
+    reader = StreamReader(Pipe(data), keep_loaded=False)
+    f = ELFFile(reader)
+    assert f.symbolTable.symbol_name(".symtab", 7) == "sym_7"
+    assert f.programHeader.p_headers
+    with pytest.raises(StreamError):
+        f.section_data(".sec0").tobytes()
+    assert reader.kept < len(data)
+
+def test_stream_limit():
+    data = generate_elf(sections=4, symbols=50)
+    with pytest.raises(StreamError):
+        ELFFile(StreamReader(Pipe(data), max_bytes=len(data) // 2)).symbolTable.get_table(".symtab")
+
+def test_cli_stream_limit(monkeypatch, capsys):
+    data = generate_elf(sections=4, symbols=50)
+    monkeypatch.setattr(sys, "stdin", SimpleNamespace(buffer=Pipe(data)))
+    with pytest.raises(SystemExit) as e:
+        main(["--stream-limit", "0", "-s", "-"])
+    assert str(e.value).startswith("Error: -: more than 0 bytes")
+    monkeypatch.setattr(sys, "stdin", SimpleNamespace(buffer=Pipe(data)))
+    main(["-s", "-"])
+    assert "sym_49" in capsys.readouterr().out
@@ -0,0 +1,91 @@
+import pytest
+
+from elfgen import generate_elf
+from readelf_py import ELFFile
+from readelf_py.cli import symbolize
+from readelf_py.hashtable import GnuHashTable, SysvHashTable
+
+# (ELF class, byte order) of every layout the parsers decode.
+LAYOUTS = [(1, "<"), (1, ">"), (2, "<"), (2, ">")]
+LAYOUT_IDS = ["32le", "32be", "64le", "64be"]
+
+def make(elf_class=2, byteorder="<", **kwargs) -> ELFFile:
+    # 4 PROGBITS sections of 64 bytes; symbol i (1..11) is 16 bytes at
+    # .sec0 + 16 * i, and symbols 1, 11, 21, ... are also in .dynsym.
+    kwargs = {"sections": 4, "segments": 2, "symbols": 12} | kwargs
+    return ELFFile(generate_elf(elf_class=elf_class, byteorder=byteorder, **kwargs))
+
+def text_address(f) -> int:
+    sections = f.sectionHeader
+    return sections.s_headers[sections.find_section(".sec0")]["sh_addr"]
+
+@pytest.mark.parametrize("elf_class,byteorder", LAYOUTS, ids=LAYOUT_IDS)
+def test_symbol_columns(elf_class, byteorder):
+    f = make(elf_class, byteorder)
+    st = f.symbolTable
+    table = st.get_table(".symtab")
+    text = text_address(f)
+    assert len(table) == 12
+    for i in range(1, 12):
+        sym = table[i]
+        assert st.symbol_name(".symtab", i) == "sym_%d" % i
+        assert (sym.st_value, sym.st_size, sym.st_info, sym.st_other, sym.st_shndx) == (text + 16 * i, 16, 0x12 if i & 1 else 0x11, 0, 1 + 16 * i // 64)
+
+@pytest.mark.parametrize("elf_class,byteorder", LAYOUTS, ids=LAYOUT_IDS)
+def test_symbol_columns_match_records(elf_class, byteorder):
+    # The strided column decoding agrees with struct.unpack of each entry.
+    f = make(elf_class, byteorder, symbols=40)
+    st = f.symbolTable
+    for k in st.sym_sections:
+        columns = st.get_table(k)
+        records = list(ELFFile(f.elf.data).symbolTable.iter_symbols(k))
+        fields = ("st_name", "st_value", "st_size", "st_info", "st_other", "st_shndx")
+        assert [tuple(s[x] for x in fields) for s in columns] == [tuple(s[x] for x in fields) for s in records]
+
+@pytest.mark.parametrize("hash_style,table_type", [(None, type(None)), ("gnu", GnuHashTable), ("sysv", SysvHashTable), ("both", GnuHashTable)])
+@pytest.mark.parametrize("elf_class,byteorder", LAYOUTS, ids=LAYOUT_IDS)
+def test_find_symbol(elf_class, byteorder, hash_style, table_type):
+    # "sym_11" is both imported and defined: only the definition counts.
+    f = make(elf_class, byteorder, symbols=60, imports=("printf", "sym_11"), hash_style=hash_style)
+    st = f.symbolTable
+    assert isinstance(st.hash_table(".dynsym"), table_type)
+    for n in range(1, 60, 10):
+        i = f.find_symbol("sym_%d" % n)
+        assert i is not None
+        assert st.symbol_name(".dynsym", i) == "sym_%d" % n
+        assert st.get_symbol(".dynsym", i).st_shndx != 0
+    assert f.find_symbol("sym_11") not in (None, 2)
+    assert f.find_symbol("printf") is None
+    assert f.find_symbol("sym_2") is None
+    assert f.find_symbol("missing") is None
+    assert f.find_symbol("sym_2", ".symtab") == 2
+
+def test_find_symbol_agrees_with_name_index():
+    f = make(symbols=200, imports=("printf",), hash_style="sysv")
+    st = f.symbolTable
+    index = st.name_index(".dynsym")
+    assert "printf" not in index
+    for name, i in index.items():
+        if name:
+            assert f.find_symbol(name) == i
+
+def test_lookup_address():
+    f = make()
+    text = text_address(f)
+    assert f.lookup_address(text + 16 * 5 + 3) == ("sym_5", 3, 5)
+    assert f.lookup_addresses([text + 16 * 11, text + 16 * 2]) == [("sym_11", 0, 11), ("sym_2", 0, 2)]
+    assert f.lookup_address(text + 16 * 12) is None
+
+def test_section_and_segment_for_address():
+    f = make()
+    text = text_address(f)
+    assert f.section_for_address(text + 70) == f.sectionHeader.find_section(".sec1")
+    assert f.section_for_address(text + 4 * 64) is None
+    assert f.segments_for_address(text) == [0]
+    assert f.segments_for_address(text + 3 * 64) == [1]
+
+def test_symbolize_skips_bad_words(capsys):
+    f = make()
+    text = text_address(f)
+    symbolize(f, ["%x zzz\n" % (text + 16 * 5 + 3), "0x%x 12g\n" % (text + 16 * 12)])
+    assert capsys.readouterr().out == "0x%x sym_5+0x3\n?? zzz\n0x%x ??\n?? 12g\n" % (text + 16 * 5 + 3, text + 16 * 12)